@@ -0,0 +1 @@
+# agent_outreach benchmarks
@@ -0,0 +1,73 @@
+"""
+Prompt Profile Benchmark
+
+Runs the workflow once per prompt profile against the live model and compares
+completion tokens and wall-clock time of the verbose REASONING profile with
+the lean JSON-decision profile. The LLM response cache is disabled so every
+call reaches the model. Needs OPENAI_API_KEY.
+
+Usage:
+    python -m agent_outreach.benchmarks.prompt_profiles [mode] [repeats]
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+from ..config.llm_cache import set_llm_cache
+from ..executor.workflow_executor import WorkflowExecutor
+from ..prompts.prompt_templates import PROMPT_PROFILES
+
+
+def run_benchmark(mode: str = "standard", repeats: int = 1) -> dict:
+    """
+    Run the workflow under each prompt profile.
+
+    Args:
+        mode: Graph mode to run (see GRAPH_MODES)
+        repeats: Runs per profile; totals are averaged per run
+
+    Returns:
+        dict: Profile to {"llm_calls", "completion_tokens", "prompt_tokens", "llm_seconds", "wall_seconds"}
+    """
+    set_llm_cache(None)
+    results = {}
+    for profile in PROMPT_PROFILES:
+        totals = {"llm_calls": 0, "completion_tokens": 0, "prompt_tokens": 0, "llm_ms": 0, "wall_seconds": 0.0}
+        for _ in range(repeats):
+            executor = WorkflowExecutor(mode=mode, prompt_profile=profile)
+            with contextlib.redirect_stdout(io.StringIO()):
+                executor.initialize()
+                started = time.perf_counter()
+                result = executor.execute_workflow()
+                totals["wall_seconds"] += time.perf_counter() - started
+            for key, value in (result or {}).get("llm_usage", {}).items():
+                totals[key] = totals.get(key, 0) + value
+        results[profile] = {
+            "llm_calls": totals["llm_calls"] / repeats,
+            "completion_tokens": totals["completion_tokens"] / repeats,
+            "prompt_tokens": totals["prompt_tokens"] / repeats,
+            "llm_seconds": round(totals["llm_ms"] / 1000 / repeats, 2),
+            "wall_seconds": round(totals["wall_seconds"] / repeats, 2)
+        }
+    return results
+
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else "standard"
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    results = run_benchmark(mode, repeats)
+    baseline = results["verbose"]
+
+    print(f"Prompt profiles, {mode} mode, {repeats} run(s) each (planning + reasoning LLM calls):")
+    print(f"{'profile':<10}{'calls':>7}{'prompt tok':>12}{'completion tok':>16}{'LLM s':>8}{'wall s':>8}{'vs verbose':>12}")
+    for profile, row in results.items():
+        change = (f"{(row['completion_tokens'] - baseline['completion_tokens']) / baseline['completion_tokens']:+.0%}"
+                  if baseline["completion_tokens"] else "n/a")
+        print(f"{profile:<10}{row['llm_calls']:>7.1f}{row['prompt_tokens']:>12.0f}{row['completion_tokens']:>16.0f}"
+              f"{row['llm_seconds']:>8}{row['wall_seconds']:>8}{change:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Tool Result Token Benchmark
+
+Compares the approximate tokens per patient that a get_all_patients result
+costs in a ToolMessage under the legacy str() encoding and the compact encoders,
+plus the size of a find_patient result.
+
+Usage:
+    python -m agent_outreach.benchmarks.tool_result_tokens
+"""
+
+import contextlib
+import io
+
+from ..nodes.context_budget import estimate_text_tokens
+from ..tools.access_patient_data import find_patient
+from ..tools.patient_repository import get_patient_repository
+from ..tools.result_encoding import ResultEncoder
+
+
+def run_benchmark(patients: list = None) -> dict:
+    """
+    Measure tokens per patient for each encoding.
+
+    Args:
+        patients: Patient records (defaults to the repository contents)
+
+    Returns:
+        dict: Encoding name to {"chars", "tokens", "tokens_per_patient"}
+    """
+    patients = patients if patients is not None else get_patient_repository().all()
+    # No size guard, so every encoding carries the whole panel
+    encodings = {
+        "str() (before)": str(patients),
+        "compact json": ResultEncoder("json", max_chars=10 ** 9).encode(patients),
+        "table": ResultEncoder("table", max_chars=10 ** 9).encode(patients)
+    }
+
+    results = {}
+    for name, text in encodings.items():
+        tokens = estimate_text_tokens(text)
+        results[name] = {
+            "chars": len(text),
+            "tokens": tokens,
+            "tokens_per_patient": round(tokens / max(1, len(patients)), 1)
+        }
+    return results
+
+
+def main():
+    patients = get_patient_repository().all()
+    results = run_benchmark(patients)
+    baseline = results["str() (before)"]["tokens"]
+
+    print(f"get_all_patients result size for {len(patients)} patient(s) (~4 chars/token):")
+    print(f"{'encoding':<16}{'chars':>8}{'tokens':>8}{'tokens/patient':>16}{'vs before':>11}")
+    for name, row in results.items():
+        change = f"{(row['tokens'] - baseline) / baseline:+.0%}" if baseline else "n/a"
+        print(f"{name:<16}{row['chars']:>8}{row['tokens']:>8}{row['tokens_per_patient']:>16}{change:>11}")
+    
+    encoder = ResultEncoder("json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        lookups = [encoder.encode(find_patient(patient["patient_id"])) for patient in patients]
+    tokens = sum(estimate_text_tokens(text) for text in lookups)
+    print(f"\nfind_patient: {round(tokens / max(1, len(lookups)), 1)} tokens per patient (compact json)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+LLM Response Cache
+
+Exact-match response caches for the chat models built by ToolRegistry.
+
+LangChain hands every cache lookup the serialized message history and an
+"llm string" describing the model and its invocation parameters, which for
+models from bind_tools() includes the bound tool schemas. Entries are keyed by
+a SHA-256 of both, after dropping per-response metadata (message ids, token
+usage, system fingerprints) that would otherwise make identical conversations
+hash differently.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+# Message fields that vary between otherwise identical responses
+_VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+CACHE_BACKENDS = ("off", "memory", "sqlite")
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """Strip volatile per-response fields from a serialized message list."""
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+
+    for message in messages:
+        kwargs = message.get("kwargs") if isinstance(message, dict) else None
+        if isinstance(kwargs, dict):
+            for field in _VOLATILE_MESSAGE_FIELDS:
+                kwargs.pop(field, None)
+    return json.dumps(messages, sort_keys=True)
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Stable hash of the model configuration (incl. bound tools) and normalized messages."""
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(_normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMResponseCache(BaseCache, ABC):
+    """
+    Base class for the response caches, tracking hit/miss/eviction counters.
+
+    Args:
+        max_entries: Entries kept before the least recently used ones are evicted
+        ttl_seconds: Age after which an entry is treated as a miss (None = never expires)
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Return cached generations for the prompt, or None on a miss."""
+        with self._lock:
+            value = self._get(cache_key(prompt, llm_string))
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store generations for the prompt, evicting old entries past max_entries."""
+        with self._lock:
+            self._put(cache_key(prompt, llm_string), return_val)
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def get_stats(self) -> dict:
+        """Return cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        """Stored value for a key, or None on a miss (expired entries count as misses)."""
+
+    @abstractmethod
+    def _put(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        """Store a value under a key, evicting entries beyond max_entries."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+
+class InMemoryLLMCache(LLMResponseCache):
+    """In-process LRU response cache."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        super().__init__(max_entries, ttl_seconds)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, value = entry
+        if self._expired(created_at):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteLLMCache(LLMResponseCache):
+    """
+    On-disk response cache shared across runs.
+
+    Generations are stored with LangChain's serializer; the least recently
+    accessed entries are evicted once max_entries is exceeded.
+
+    Args:
+        path: SQLite database file
+        max_entries: Entries kept before eviction
+        ttl_seconds: Age after which an entry is treated as a miss (None = never expires)
+    """
+
+    def __init__(self, path: str = ".llm_cache.sqlite", max_entries: int = 10000,
+                 ttl_seconds: Optional[float] = None):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self._expired(created_at):
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        # loads() warns that it is a beta API; entries were written by this cache
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return loads(value)
+
+    def _put(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, dumps(value), now, now)
+        )
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+        self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def create_llm_cache(backend: str = "memory", path: str = ".llm_cache.sqlite", max_entries: int = None,
+                     ttl_seconds: Optional[float] = None) -> Optional[LLMResponseCache]:
+    """
+    Create a response cache for one of CACHE_BACKENDS ("off" returns None).
+
+    Args:
+        backend: "off", "memory" or "sqlite"
+        path: Database file for the sqlite backend
+        max_entries: Entries kept before eviction (backend default if omitted)
+        ttl_seconds: Entry lifetime in seconds (None = never expires)
+    """
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown LLM cache backend '{backend}'. Expected one of: {', '.join(CACHE_BACKENDS)}")
+    if backend == "off":
+        return None
+    if backend == "sqlite":
+        return SQLiteLLMCache(path, max_entries or 10000, ttl_seconds)
+    return InMemoryLLMCache(max_entries or 1024, ttl_seconds)
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_configured = False
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the shared response cache, configured from the environment on first use.
+
+    LLM_CACHE selects the backend (default "memory"), LLM_CACHE_PATH the sqlite
+    file, LLM_CACHE_MAX_ENTRIES the size bound and LLM_CACHE_TTL the lifetime
+    in seconds.
+    """
+    global _cache, _cache_configured
+    if not _cache_configured:
+        max_entries = os.getenv("LLM_CACHE_MAX_ENTRIES")
+        ttl_seconds = os.getenv("LLM_CACHE_TTL")
+        _cache = create_llm_cache(
+            backend=os.getenv("LLM_CACHE", "memory").lower(),
+            path=os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite"),
+            max_entries=int(max_entries) if max_entries else None,
+            ttl_seconds=float(ttl_seconds) if ttl_seconds else None
+        )
+        _cache_configured = True
+    return _cache
+
+def set_llm_cache(cache: Optional[LLMResponseCache]):
+    """Replace the shared response cache (None disables caching)."""
+    global _cache, _cache_configured
+    _cache, _cache_configured = cache, True
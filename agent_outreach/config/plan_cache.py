@@ -0,0 +1,100 @@
+"""
+Plan Cache
+
+Stores execution plans for the "cached" planning strategy, keyed by a hash
+of the planning prompt (the conversation plus planning instructions), the
+tool schemas the LLM will work with and the model. A plan is only reused
+when all three are unchanged, so editing a prompt or a tool signature
+produces a fresh plan.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ..tools.content_hash import stable_hash
+
+
+def plan_key(messages: list, tool_schemas: list, model: str) -> str:
+    """Stable hash of the planning prompt, the tool schemas and the model."""
+    return stable_hash({
+        "messages": [[message.type, message.content] for message in messages],
+        "tools": tool_schemas,
+        "model": model
+    })
+
+
+class PlanCache:
+    """
+    In-memory LRU of plans, optionally backed by a SQLite file so plans survive restarts.
+
+    Args:
+        max_entries: In-memory plans kept before the least recently used are evicted
+        path: Optional SQLite file persisting plans across processes
+    """
+
+    def __init__(self, max_entries: int = 256, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS plans (key TEXT PRIMARY KEY, plan TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """The stored plan for a key, or None."""
+        with self._lock:
+            plan = self._entries.get(key)
+            if plan is None and self._conn is not None:
+                row = self._conn.execute("SELECT plan FROM plans WHERE key = ?", (key,)).fetchone()
+                plan = row[0] if row else None
+            if plan is None:
+                self.misses += 1
+                return None
+            self._remember(key, plan)
+            self.hits += 1
+            return plan
+
+    def put(self, key: str, plan: str) -> None:
+        with self._lock:
+            self._remember(key, plan)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO plans (key, plan, created_at) VALUES (?, ?, ?)", (key, plan, time.time())
+                )
+                self._conn.commit()
+
+    def _remember(self, key: str, plan: str) -> None:
+        self._entries[key] = plan
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_plan_cache: Optional[PlanCache] = None
+
+def get_plan_cache() -> PlanCache:
+    """Get the shared plan cache, persisted to PLAN_CACHE_PATH when that is set."""
+    global _plan_cache
+    if _plan_cache is None:
+        _plan_cache = PlanCache(path=os.getenv("PLAN_CACHE_PATH"))
+    return _plan_cache
+
+def set_plan_cache(cache: PlanCache) -> None:
+    """Replace the shared plan cache (e.g. with an empty one)."""
+    global _plan_cache
+    _plan_cache = cache
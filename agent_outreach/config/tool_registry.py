@@ -8,10 +8,15 @@ from langchain_openai import ChatOpenAI
 from langchain_core.tools import StructuredTool
 from dotenv import load_dotenv
 
-from ..tools.find_unmet_patients import find_unmet_patients, FindUnmetPatientsInput
-from ..tools.fire_reminder import fire_reminder, FireReminderInput
-from ..tools.access_patient_data import get_all_patients, find_patient
-from ..tools.cohort_tools import get_all_cohorts, get_cohort_info, get_cohort_summary
+from .llm_cache import get_llm_cache
+
+from ..tools.fire_reminder import fire_reminder, afire_reminder, FireReminderInput
+from ..tools.access_patient_data import (
+    get_all_patients, find_patient, list_patients, ListPatientsInput,
+    search_patients_by_supporting_facts, SearchPatientsInput
+)
+from ..tools.cohort_tools import get_all_cohorts, get_cohort_info, get_cohort_summary, query_cohorts
+from ..tools.result_encoding import ResultEncoder
 
 # Load environment variables
 load_dotenv()
@@ -19,10 +24,34 @@ load_dotenv()
 class ToolRegistry:
     """Centralized tool registry and LLM configuration."""
     
+    # Maximum concurrent executions per tool; tools not listed are only bounded by the pool size
+    TOOL_CONCURRENCY_LIMITS = {
+        "fire_reminder": 2
+    }
+    
+    # ToolMessage encoding per tool; record lists are cheapest as a table (see benchmarks/tool_result_tokens.py)
+    TOOL_RESULT_FORMATS = {
+        "get_all_patients": "table"
+    }
+    TOOL_RESULT_MAX_CHARS = 12000
+    
+    # Repeated identical calls within one conversation: read-only tools answer with a reference
+    # to the earlier result, deduplicated (side-effecting) tools are not executed again
+    READ_ONLY_TOOLS = frozenset({
+        "get_all_patients", "list_patients", "search_patients_by_supporting_facts", "find_patient",
+        "get_all_cohorts", "get_cohort_info", "get_cohort_summary", "query_cohorts"
+    })
+    DEDUPLICATED_TOOLS = frozenset({"fire_reminder"})
+    
     @staticmethod
-    def get_llm(model: str = "gpt-3.5-turbo", timeout: int = 30, max_retries: int = 2):
-        """Get configured LLM instance."""
-        return ChatOpenAI(model=model, timeout=timeout, max_retries=max_retries)
+    def get_llm(model: str = "gpt-3.5-turbo", timeout: int = 30, max_retries: int = 2, cache=None):
+        """
+        Get configured LLM instance.
+        
+        Responses are served from the shared exact-match cache (see config/llm_cache.py)
+        unless another cache is passed; set LLM_CACHE=off to disable caching.
+        """
+        return ChatOpenAI(model=model, timeout=timeout, max_retries=max_retries, cache=cache if cache is not None else get_llm_cache())
     
     @staticmethod
     def get_tools():
@@ -30,6 +59,7 @@ class ToolRegistry:
         return [
             StructuredTool.from_function(
                 func=fire_reminder, 
+                coroutine=afire_reminder,
                 name="fire_reminder", 
                 description="Send a reminder to a specific patient.", 
                 args_schema=FireReminderInput
@@ -39,6 +69,21 @@ class ToolRegistry:
                 name="get_all_patients", 
                 description="Get complete list of all patients for analysis and cohort classification."
             ),
+            StructuredTool.from_function(
+                func=list_patients, 
+                name="list_patients", 
+                description="Page through patients ordered by ID, filtered by cohort, age range or rule-based "
+                            "intervention status, returning only the requested fields. Pass next_cursor back "
+                            "to get the following page; prefer this over get_all_patients for large panels.",
+                args_schema=ListPatientsInput
+            ),
+            StructuredTool.from_function(
+                func=search_patients_by_supporting_facts, 
+                name="search_patients_by_supporting_facts", 
+                description="Find patients whose supporting facts, medications or family history mention "
+                            "any (or, with match_all, all) of the given terms, best matches first.",
+                args_schema=SearchPatientsInput
+            ),
             StructuredTool.from_function(
                 func=find_patient, 
                 name="find_patient", 
@@ -58,9 +103,32 @@ class ToolRegistry:
                 func=get_cohort_summary, 
                 name="get_cohort_summary", 
                 description="Generate a summary overview of all available cohorts for quick reference."
+            ),
+            StructuredTool.from_function(
+                func=query_cohorts, 
+                name="query_cohorts", 
+                description="Count and list patients matching a set expression over cohorts and flags, "
+                            "e.g. 'diabetic AND NOT contacted_in_30_days'. Names: cohort names, "
+                            "<cohort>:needs_intervention, <cohort>:undetermined, needs_intervention, "
+                            "undetermined, contacted_in_30_days; operators AND, OR, ANDNOT, NOT, parentheses."
             )
         ]
     
+    @staticmethod
+    def get_tool_concurrency_limits():
+        """Get per-tool concurrency limits."""
+        return dict(ToolRegistry.TOOL_CONCURRENCY_LIMITS)
+    
+    @staticmethod
+    def get_result_encoders():
+        """Get the result encoder for each tool, plus a JSON default under None."""
+        encoders = {
+            name: ResultEncoder(format, max_chars=ToolRegistry.TOOL_RESULT_MAX_CHARS)
+            for name, format in ToolRegistry.TOOL_RESULT_FORMATS.items()
+        }
+        encoders[None] = ResultEncoder("json", max_chars=ToolRegistry.TOOL_RESULT_MAX_CHARS)
+        return encoders
+    
     @staticmethod
     def get_llm_with_tools():
         """Get LLM bound with all tools."""
@@ -5,26 +5,55 @@ Handles the execution and management of the clinical outreach workflow.
 """
 
 import time
-from langchain_core.messages import HumanMessage, SystemMessage
+import uuid
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
 
+from ..config.llm_cache import get_llm_cache
 from ..graph.graph_builder import GraphBuilder
 from ..prompts.prompt_templates import PromptTemplates
+from ..tools.cohort_catalog import pinned_cohort_catalog
+from ..tools.cohort_source import get_cohort_source
+from ..tools.result_memo import get_result_memo
 from ..utils.logging_utils import WorkflowLogger, ProgressTracker
 from ..utils.exception_handler import ErrorHandlingContext  # Updated import
 
+# Parallel patient reviews in fan_out mode when no max_concurrency is given
+DEFAULT_FAN_OUT_CONCURRENCY = 8
+
 class WorkflowExecutor:
     """Executes the clinical outreach workflow."""
     
-    def __init__(self):
+    def __init__(self, mode: str = "standard", max_concurrency: int = None, batch_size: int = 1,
+                 max_tool_workers: int = 4, context_token_budget: int = 12000, max_classification_batch: int = 25,
+                 prompt_profile: str = "verbose", planning: str = "always", prefetch: str = "off",
+                 auto_send_rule_reminders: bool = False):
         # Initialize workflow executor with graph builder and empty app state
-        self.graph_builder = GraphBuilder()
+        # max_concurrency caps parallel node executions (e.g. fan-out patient reviews, sync and async);
+        # fan_out mode defaults to DEFAULT_FAN_OUT_CONCURRENCY
+        # max_tool_workers caps concurrent tool calls from a single LLM turn
+        # context_token_budget bounds the prompt size of each LLM call (None disables trimming)
+        # max_classification_batch caps patients per structured-output request in batch mode
+        # prompt_profile "lean" swaps free-text reasoning for compact JSON decisions (see PROMPT_PROFILES)
+        # planning selects how the plan before the first LLM turn is made (see PLANNING_STRATEGIES)
+        # prefetch injects the first list_patients page and get_all_cohorts results before the first LLM turn (see PREFETCH_MODES)
+        # auto_send_rule_reminders lets pre-classification send rule-decided reminders without LLM review (opt-in;
+        # with it off, the hybrid/incremental/batch fast path only saves LLM work for fully rule-covered cohorts)
+        self.graph_builder = GraphBuilder(max_tool_workers=max_tool_workers, context_token_budget=context_token_budget,
+                                          max_classification_batch=max_classification_batch,
+                                          prompt_profile=prompt_profile, planning=planning, prefetch=prefetch,
+                                          auto_send_rule_reminders=auto_send_rule_reminders)
+        self.mode = mode
+        if max_concurrency is None and mode == "fan_out":
+            max_concurrency = DEFAULT_FAN_OUT_CONCURRENCY
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
         self.app = None
     
     def initialize(self):
         # Create and compile the LangGraph workflow application
         """Initialize the workflow application."""
         WorkflowLogger.print_info("Initializing enhanced agent...")
-        self.app = self.graph_builder.create_graph()
+        self.app = self.graph_builder.create_graph(self.mode, batch_size=self.batch_size)
         WorkflowLogger.print_success("Enhanced agent ready!")
     
     def execute_workflow(self):
@@ -36,31 +65,84 @@ class WorkflowExecutor:
         WorkflowLogger.print_info("Starting enhanced clinical outreach workflow...")
         ProgressTracker.print_progress_steps()
         
-        # Generate unique thread ID for this workflow execution
-        thread_id = f"enhanced-test-{int(time.time())}"
+        # Invoke the workflow with system and workflow start prompts, pinned to the current cohort definitions
+        self._reload_cohort_definitions()
+        with pinned_cohort_catalog() as catalog:
+            return self.app.invoke(self._initial_state(catalog), config=self._run_config())
+    
+    async def aexecute_workflow(self):
+        """Execute the complete clinical outreach workflow on the running event loop."""
+        if not self.app:
+            raise ValueError("Workflow not initialized. Call initialize() first.")
         
-        # Invoke the workflow with system and workflow start prompts
-        result = self.app.invoke({
+        WorkflowLogger.print_info("Starting enhanced clinical outreach workflow (async)...")
+        ProgressTracker.print_progress_steps()
+        
+        self._reload_cohort_definitions()
+        with pinned_cohort_catalog() as catalog:
+            return await self.app.ainvoke(self._initial_state(catalog), config=self._run_config())
+    
+    def _reload_cohort_definitions(self):
+        """Swap in the cohort definitions file if it changed; runs already in flight keep their version."""
+        source = get_cohort_source()
+        if source is not None:
+            source.reload_if_changed()
+    
+    def _initial_state(self, catalog):
+        """System and workflow start prompts every run begins with, stamped with the cohort definitions version."""
+        return {
             "messages": [
                 SystemMessage(content=PromptTemplates.SYSTEM_PROMPT),
                 HumanMessage(content=PromptTemplates.WORKFLOW_START_PROMPT)
-            ]
-        }, config={"configurable": {"thread_id": thread_id}})
-        
-        return result
+            ],
+            "cohort_definitions_version": catalog.version
+        }
+    
+    def _run_config(self):
+        """Run config with a unique thread ID, so concurrent runs never share a checkpoint."""
+        thread_id = f"enhanced-test-{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        config = {"configurable": {"thread_id": thread_id}}
+        if self.max_concurrency:
+            config["max_concurrency"] = self.max_concurrency
+        return config
     
     def analyze_results(self, result):
         # Analyze workflow output and check if reminders were successfully fired
         """Analyze and report workflow results."""
         WorkflowLogger.print_section("🎯 WORKFLOW COMPLETED SUCCESSFULLY!")
         
+        if result and result.get('cohort_definitions_version'):
+            WorkflowLogger.print_info(f"Cohort definitions version: {result['cohort_definitions_version']}")
+        
+        if result and result.get('path_counts'):
+            WorkflowLogger.print_path_counts(result['path_counts'])
+        
+        if result and result.get('llm_usage'):
+            WorkflowLogger.print_llm_usage(result['llm_usage'])
+        
+        if result and result.get('tool_call_dedup'):
+            WorkflowLogger.print_tool_call_dedup(result['tool_call_dedup'])
+        
+        llm_cache = get_llm_cache()
+        if llm_cache is not None:
+            WorkflowLogger.print_cache_stats("LLM response", llm_cache.get_stats())
+        
+        result_memo = get_result_memo()
+        if result_memo is not None:
+            WorkflowLogger.print_cache_stats("Cohort tool result", result_memo.get_stats())
+        
         if result and 'messages' in result and result['messages']:
             # Print the final message content from the workflow
             print(result['messages'][-1].content)
             
-            # Check if reminders were fired based on final message content
+            # Check if reminders were fired based on final message content or fire_reminder results
+            # (lean decisions name the reminder type, not the tool)
             final_content = result['messages'][-1].content.lower()
-            if 'reminder sent' in final_content or 'fire_reminder' in final_content:
+            reminder_results = result.get('reminders_sent') or [
+                message for message in result['messages']
+                if isinstance(message, ToolMessage) and 'reminder sent' in str(message.content).lower()
+            ]
+            if 'reminder sent' in final_content or 'fire_reminder' in final_content or reminder_results:
                 WorkflowLogger.print_success("Reminders were fired successfully!")
             else:
                 WorkflowLogger.print_warning("No reminders appear to have been fired")
@@ -80,3 +162,14 @@ class WorkflowExecutor:
             self.analyze_results(result)
             
             return result
+    
+    async def arun(self):
+        """Async variant of run(), e.g. for hosting several workflows on one event loop."""
+        with ErrorHandlingContext("Clinical Outreach Agent v2.0"):
+            WorkflowLogger.print_header("Clinical Outreach Agent v2.0", "Enhanced with Reasoning & Validation")
+            
+            self.initialize()
+            result = await self.aexecute_workflow()
+            self.analyze_results(result)
+            
+            return result
@@ -4,39 +4,142 @@ Graph Builder for Clinical Outreach Workflow
 Handles the construction and configuration of the LangGraph workflow.
 """
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END, START
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Send
 
 from ..state import OutreachState
 from ..nodes.workflow_nodes import WorkflowNodes
 from ..utils.logging_utils import WorkflowLogger
 from ..utils.exception_handler import ExceptionHandler, GraphBuildError
+from ..tools.patient_repository import get_patient_repository
+from ..tools.triage import REVIEW_PATHS
+
+# standard: every patient goes through the LLM
+# hybrid:   deterministic pre-classification first, LLM only for ambiguous patients. Rule-decided
+#           reminders are still validated by the LLM unless auto_send_rule_reminders is enabled, and
+#           "no action" needs every intervention criterion of a cohort covered by a rule, which the
+#           built-in definitions do not do, so with the defaults every cohort member reaches the LLM
+# fan_out:  one small llm ⇄ tools subgraph per patient batch, merged into state.cohorts
+# incremental: like hybrid, but only patients changed since the last committed run are re-evaluated
+# batch:    like hybrid, but ambiguous patients are classified in packed structured-output LLM calls
+GRAPH_MODES = ("standard", "hybrid", "fan_out", "incremental", "batch")
+
+# Planning before the first LLM turn (standard, hybrid and incremental modes)
+# always:   one planning LLM call per run
+# off:      no planning; runs start at the LLM node
+# cached:   reuse the plan stored for the same planning prompt and tool schemas
+# parallel: plan while patient and cohort data are prefetched for the LLM node
+PLANNING_STRATEGIES = ("always", "off", "cached", "parallel")
+# Tool data every run needs (the first list_patients page, get_all_cohorts), fetched before the first LLM turn
+# off:           the LLM fetches it with tool calls
+# tool_messages: injected as a synthetic tool-call/tool-result exchange
+# context:       injected as one compact context block
+# The parallel planning strategy always prefetches (as tool messages unless "context" is chosen).
+PREFETCH_MODES = ("off", "tool_messages", "context")
+_PLANNING_NODES = {"always": "planning_node", "cached": "cached_planning_node", "parallel": "parallel_planning_node"}
 
 class GraphBuilder:
     """Builder for the clinical outreach workflow graph."""
     
-    def __init__(self):
-        self.nodes = WorkflowNodes()
+    def __init__(self, max_tool_workers: int = 4, context_token_budget: int = 12000,
+                 max_classification_batch: int = 25, prompt_profile: str = "verbose", planning: str = "always", prefetch: str = "off",
+                 auto_send_rule_reminders: bool = False):
+        if planning not in PLANNING_STRATEGIES:
+            raise ValueError(
+                f"Unknown planning strategy '{planning}'. Expected one of: {', '.join(PLANNING_STRATEGIES)}"
+            )
+        if prefetch not in PREFETCH_MODES:
+            raise ValueError(f"Unknown prefetch mode '{prefetch}'. Expected one of: {', '.join(PREFETCH_MODES)}")
+        self.planning = planning
+        self.prefetch = prefetch
+        self.nodes = WorkflowNodes(max_tool_workers=max_tool_workers, context_token_budget=context_token_budget,
+                                   max_classification_batch=max_classification_batch, prompt_profile=prompt_profile,
+                                   prefetch_format="context" if prefetch == "context" else "tool_messages",
+                                   auto_send_rule_reminders=auto_send_rule_reminders)
+        self.batch_size = 1
     
-    def create_graph(self):
-        """Create and configure the clinical outreach graph."""
-        WorkflowLogger.print_info("Building Clinical Outreach Graph with Reasoning...")
+    def create_graph(self, mode: str = "standard", batch_size: int = 1):
+        """
+        Create and configure the clinical outreach graph.
+        
+        Args:
+            mode: One of GRAPH_MODES
+            batch_size: Patients per review subgraph in fan_out mode
+        """
+        if mode not in GRAPH_MODES:
+            raise ValueError(f"Unknown graph mode '{mode}'. Expected one of: {', '.join(GRAPH_MODES)}")
+        
+        WorkflowLogger.print_info(f"Building Clinical Outreach Graph with Reasoning ({mode} mode)...")
         
         builder = StateGraph(OutreachState, name="ClinicalOutreachGraph")
         
+        if mode == "fan_out":
+            self.batch_size = max(1, batch_size)
+            self.nodes.patient_review_graph = self._build_patient_review_graph()
+            builder.add_node("review_patients", self._node("review_patient_batch_node"))
+            builder.add_node("summarize", self._node("summarize_cohorts_node"))
+            builder.add_conditional_edges(START, self._dispatch_patient_batches, ["review_patients"])
+            builder.add_edge("review_patients", "summarize")
+            builder.add_edge("summarize", END)
+            return self._compile(builder, mode)
+        
+        if mode == "batch":
+            builder.add_node("pre_classification", self._node("pre_classification_node"))
+            builder.add_node("batch_classification", self._node("batch_classification_node"))
+            builder.add_edge(START, "pre_classification")
+            builder.add_conditional_edges("pre_classification", self._route_after_pre_classification,
+                                          {"planning": "batch_classification", END: END})
+            builder.add_edge("batch_classification", END)
+            return self._compile(builder, mode)
+        
         # Add nodes
-        builder.add_node("planning", self.nodes.planning_node)
-        builder.add_node("llm", self.nodes.call_llm)
-        builder.add_node("tools", self.nodes.enhanced_tool_node)
+        builder.add_node("llm", self._node("call_llm"))
+        builder.add_node("tools", self._node("enhanced_tool_node"))
+        if self.planning == "off":
+            first_step = "llm"
+        else:
+            first_step = "planning"
+            builder.add_node("planning", self._node(_PLANNING_NODES[self.planning]))
+            builder.add_edge("planning", "llm")
+        if self.prefetch != "off" and self.planning != "parallel":
+            builder.add_node("prefetch", self._node("prefetch_node"))
+            builder.add_edge("prefetch", first_step)
+            first_step = "prefetch"
         
         # Add edges
-        builder.add_edge(START, "planning")
-        builder.add_edge("planning", "llm")
+        if mode == "hybrid":
+            builder.add_node("pre_classification", self._node("pre_classification_node"))
+            builder.add_edge(START, "pre_classification")
+            builder.add_conditional_edges("pre_classification", self._route_after_pre_classification,
+                                          {"planning": first_step, END: END})
+        elif mode == "incremental":
+            # Results are committed only once the LLM (if needed) has finished
+            builder.add_node("pre_classification", self._node("incremental_classification_node"))
+            builder.add_node("commit_results", self._node("commit_results_node"))
+            builder.add_edge(START, "pre_classification")
+            builder.add_conditional_edges("pre_classification", self._route_after_pre_classification,
+                                          {"planning": first_step, END: "commit_results"})
+            builder.add_edge("commit_results", END)
+        else:
+            builder.add_edge(START, first_step)
         builder.add_edge("tools", "llm")
         
         # Add conditional routing
-        builder.add_conditional_edges("llm", self._routing_with_validation)
+        if mode == "incremental":
+            builder.add_conditional_edges("llm", self._routing_with_validation, {"tools": "tools", END: "commit_results"})
+        else:
+            builder.add_conditional_edges("llm", self._routing_with_validation)
         
+        return self._compile(builder, mode)
+    
+    def _node(self, name: str):
+        """Wrap a node method and its async variant so the graph supports invoke() and ainvoke()."""
+        return RunnableLambda(getattr(self.nodes, name), afunc=getattr(self.nodes, f"a{name}"), name=name)
+    
+    def _compile(self, builder, mode: str):
+        """Compile a graph builder with checkpointing, falling back to no memory."""
         # Compile graph with safe error handling
         try:
             memory = MemorySaver()
@@ -51,9 +154,45 @@ class GraphBuilder:
                 graph = builder.compile()
                 WorkflowLogger.print_success("Graph built successfully (without memory)!")
         
-        WorkflowLogger.print_graph_architecture()
+        WorkflowLogger.print_graph_architecture(mode, self.planning, self.prefetch)
         return graph
     
+    def _route_after_pre_classification(self, state):
+        """Skip the LLM entirely when the rules decided every patient."""
+        path_counts = state.get("path_counts", {})
+        residual = sum(path_counts.get(path, 0) for path in REVIEW_PATHS)
+        return "planning" if residual else END
+    
+    def _build_patient_review_graph(self):
+        """Small llm ⇄ tools subgraph run once per patient batch in fan_out mode."""
+        builder = StateGraph(OutreachState, name="PatientReviewGraph")
+        builder.add_node("llm", self._node("call_llm"))
+        builder.add_node("tools", self._node("enhanced_tool_node"))
+        builder.add_edge(START, "llm")
+        builder.add_edge("tools", "llm")
+        builder.add_conditional_edges("llm", self._routing_with_validation)
+        return builder.compile()
+    
+    def _dispatch_patient_batches(self, state):
+        """
+        Fan out one review per batch of patient IDs, walking the repository with its keyset scan.
+        
+        Only IDs are collected here; each review loads and triages its own patients,
+        so that work runs inside the (concurrency-capped) review nodes.
+        """
+        sends, batch, total = [], [], 0
+        for patient in get_patient_repository().scan():
+            batch.append(patient["patient_id"])
+            total += 1
+            if len(batch) == self.batch_size:
+                sends.append(Send("review_patients", {"patient_ids": batch}))
+                batch = []
+        if batch:
+            sends.append(Send("review_patients", {"patient_ids": batch}))
+        
+        WorkflowLogger.print_info(f"Fanning out {total} patient(s) into {len(sends)} review batch(es)")
+        return sends
+    
     def _routing_with_validation(self, state):
         """Enhanced routing logic with validation."""
         last_message = state["messages"][-1]
@@ -0,0 +1,127 @@
+"""
+Batch Classification
+
+Packs the patients the rules could not decide into as few structured-output
+LLM requests as fit the model's context window, and validates the per-patient
+decisions that come back so only the items that failed are sent again.
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+from .context_budget import estimate_text_tokens
+from ..tools.result_encoding import compact_record
+
+# Context window (tokens) per model name prefix; the longest matching prefix wins
+MODEL_CONTEXT_LIMITS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576
+}
+DEFAULT_CONTEXT_LIMIT = 16385
+# Share of the context window a request may fill; leaves headroom for the chars/4 estimate
+CONTEXT_FILL_RATIO = 0.6
+# Expected completion tokens per patient decision
+OUTPUT_TOKENS_PER_PATIENT = 60
+# Attempts per item after the first request before falling back to the rule suggestion
+MAX_RETRIES = 2
+# Contact details the model does not need to classify a patient
+CONTACT_FIELDS = ("name", "phone", "email")
+
+
+class PatientDecision(BaseModel):
+    """One patient's decision in a batch classification response."""
+    patient_id: int
+    cohort: Optional[str] = None
+    needs_intervention: bool
+    intervention_type: Optional[str] = None
+    rationale: str = ""
+
+
+def context_limit(llm) -> int:
+    """Context window of the model behind an LLM client (DEFAULT_CONTEXT_LIMIT if unknown)."""
+    model = str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or "")
+    matches = [prefix for prefix in MODEL_CONTEXT_LIMITS if model.startswith(prefix)]
+    return MODEL_CONTEXT_LIMITS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_LIMIT
+
+def patient_summary(patient: dict, evidence: dict) -> dict:
+    """Compact record plus rule evidence for one patient, without contact details."""
+    record = compact_record({field: value for field, value in patient.items() if field not in CONTACT_FIELDS})
+    rules = {}
+    for cohort_name, decision in evidence.get("rule_decisions", {}).items():
+        rules[cohort_name] = decision["decision"]
+        if decision.get("missing_metrics"):
+            rules[cohort_name] += f" (missing {', '.join(decision['missing_metrics'])})"
+        if decision.get("unchecked_criteria"):
+            rules[cohort_name] += f" (not rule-checked: {'; '.join(decision['unchecked_criteria'])})"
+    summary = {"patient": record, "suggested_cohorts": evidence.get("suggested_cohorts", []), "rules": rules}
+    if evidence.get("rule_recommendation"):
+        summary["rule_recommendation"] = evidence["rule_recommendation"]
+    return summary
+
+def plan_batches(summaries: List[dict], context_tokens: int, prompt_tokens: int,
+                 max_batch_size: int = 25) -> List[List[dict]]:
+    """
+    Greedily pack patient summaries into batches that fit one request each.
+
+    Args:
+        summaries: Output of patient_summary()
+        context_tokens: Context window of the model
+        prompt_tokens: Tokens of the fixed instructions sent with every batch
+        max_batch_size: Upper bound on patients per request
+
+    Returns:
+        list: Batches of summaries; a summary too large for any batch gets its own
+    """
+    budget = int(context_tokens * CONTEXT_FILL_RATIO) - prompt_tokens
+    batches, batch, used = [], [], 0
+    for summary in summaries:
+        cost = estimate_text_tokens(json.dumps(summary, default=str)) + OUTPUT_TOKENS_PER_PATIENT
+        if batch and (used + cost > budget or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(summary)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+def parse_decisions(content: str, expected_ids: List[int], catalog) -> Tuple[Dict[int, PatientDecision], List[int]]:
+    """
+    Validate a batch response item by item.
+
+    An item is accepted when it parses as a PatientDecision for a patient of the
+    batch, names a known cohort (or none), and, when it asks for an intervention,
+    names one the cohort offers.
+
+    Returns:
+        tuple: (accepted decisions by patient ID, IDs to retry)
+    """
+    try:
+        data = json.loads(content or "")
+    except ValueError:
+        return {}, list(expected_ids)
+    items = data.get("decisions", []) if isinstance(data, dict) else data if isinstance(data, list) else []
+
+    expected = set(expected_ids)
+    accepted = {}
+    for item in items:
+        try:
+            decision = PatientDecision.model_validate(item)
+        except ValidationError:
+            continue
+        if decision.patient_id not in expected or decision.patient_id in accepted:
+            continue
+        if decision.cohort is not None and str(decision.cohort).lower() == "none":
+            decision.cohort = None
+        if decision.cohort is not None and decision.cohort not in catalog:
+            continue
+        if decision.needs_intervention and (
+                decision.cohort is None or catalog.intervention(decision.cohort, decision.intervention_type) is None):
+            continue
+        accepted[decision.patient_id] = decision
+    return accepted, [patient_id for patient_id in expected_ids if patient_id not in accepted]
@@ -0,0 +1,146 @@
+"""
+Context Budget
+
+Keeps the message history sent to the LLM within a token budget.
+
+Tool results the model has already responded to are "stale": first their
+payloads are replaced by a short summary, oldest first, and if that is not
+enough whole tool turns (the AI message with tool_calls together with all of
+its ToolMessages) are dropped, so every tool result still follows the call that
+produced it. System and human messages and the latest tool turn are never
+touched, and the state itself is never modified.
+"""
+
+import math
+from typing import Dict, List, NamedTuple, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+# Rough characters-per-token ratio for English text and JSON
+CHARS_PER_TOKEN = 4
+# Characters of an elided tool result kept as a preview
+PREVIEW_CHARS = 160
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Approximate token count of a piece of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Approximate token count of a message, including its tool calls."""
+    text = message.content if isinstance(message.content, str) else str(message.content)
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        text += tool_call.get("name", "") + str(tool_call.get("args", {}))
+    # Per-message overhead for role and separators
+    return estimate_text_tokens(text) + 4
+
+
+class ContextReport(NamedTuple):
+    """What the budget did to one LLM request."""
+    tokens_before: int
+    tokens_after: int
+    elided_results: int
+    dropped_turns: int
+    # tool_call_ids whose results were summarized or dropped
+    affected_call_ids: Tuple[str, ...] = ()
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class ContextBudget:
+    """
+    Token budget applied to the messages of every LLM call.
+
+    Args:
+        max_tokens: Approximate prompt token budget
+    """
+
+    def __init__(self, max_tokens: int = 12000):
+        self.max_tokens = max_tokens
+        self.total_tokens_saved = 0
+
+    def apply(self, messages: List[BaseMessage]) -> Tuple[List[BaseMessage], ContextReport]:
+        """
+        Fit messages into the budget.
+
+        Args:
+            messages: Messages about to be sent to the LLM
+
+        Returns:
+            tuple: (messages to send, ContextReport)
+        """
+        messages = list(messages)
+        sizes = [estimate_tokens(message) for message in messages]
+        tokens_before = total = sum(sizes)
+        elided = dropped = 0
+        affected = []
+
+        turns = self._stale_tool_turns(messages)
+
+        # 1. Summarize stale tool results, oldest first
+        tool_names = self._tool_names(messages)
+        for _, result_indexes in turns:
+            for index in result_indexes:
+                if total <= self.max_tokens:
+                    break
+                summary = messages[index].model_copy(
+                    update={"content": self._summarize(messages[index], tool_names)}
+                )
+                new_size = estimate_tokens(summary)
+                if new_size < sizes[index]:
+                    total -= sizes[index] - new_size
+                    messages[index], sizes[index] = summary, new_size
+                    elided += 1
+                    affected.append(messages[index].tool_call_id)
+
+        # 2. Drop whole stale tool turns, oldest first
+        removed = set()
+        for call_index, result_indexes in turns:
+            if total <= self.max_tokens:
+                break
+            for index in (call_index, *result_indexes):
+                removed.add(index)
+                total -= sizes[index]
+            affected.extend(messages[index].tool_call_id for index in result_indexes)
+            dropped += 1
+
+        if removed:
+            messages = [message for index, message in enumerate(messages) if index not in removed]
+
+        report = ContextReport(tokens_before, total, elided, dropped, tuple(dict.fromkeys(affected)))
+        self.total_tokens_saved += report.tokens_saved
+        return messages, report
+
+    def _stale_tool_turns(self, messages: List[BaseMessage]) -> List[Tuple[int, List[int]]]:
+        """(AI message index, tool result indexes) for every tool turn except the latest."""
+        turns = []
+        for index, message in enumerate(messages):
+            if isinstance(message, AIMessage) and message.tool_calls:
+                call_ids = {tool_call.get("id") for tool_call in message.tool_calls}
+                results = [
+                    result_index for result_index in range(index + 1, len(messages))
+                    if isinstance(messages[result_index], ToolMessage)
+                    and messages[result_index].tool_call_id in call_ids
+                ]
+                turns.append((index, results))
+        return turns[:-1]
+
+    def _tool_names(self, messages: List[BaseMessage]) -> Dict[str, str]:
+        """Tool name for every tool_call_id in the history."""
+        return {
+            tool_call.get("id"): tool_call.get("name", "tool")
+            for message in messages if isinstance(message, AIMessage)
+            for tool_call in message.tool_calls
+        }
+
+    def _summarize(self, message: ToolMessage, tool_names: Dict[str, str]) -> str:
+        """Short stand-in for a stale tool result."""
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        name = tool_names.get(message.tool_call_id, "tool")
+        preview = " ".join(content[:PREVIEW_CHARS].split())
+        return (
+            f"[{name} result ({len(content)} chars) elided to stay within the context budget; "
+            f"call {name} again if you need it. Preview: {preview}...]"
+        )
@@ -0,0 +1,106 @@
+"""
+Tool Call Log
+
+Remembers which tool calls already succeeded in one conversation, by tool
+name and canonical arguments, so repeated calls can be coalesced:
+read-only tools answer with a reference to the earlier result, and
+side-effecting tools (fire_reminder) are not executed twice.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Conversations remembered per WorkflowNodes before the least recently used are dropped
+MAX_CONVERSATIONS = 256
+
+
+def call_key(tool_name: str, args: dict) -> str:
+    """Tool name plus arguments serialized with sorted keys."""
+    return f"{tool_name}:{json.dumps(args, sort_keys=True, default=str)}"
+
+def conversation_key(config: dict) -> Optional[str]:
+    """
+    Identify the conversation a node runs in from its runnable config.
+
+    The thread ID names the run; inside a subgraph (a fan-out review) the
+    parent segments of the checkpoint namespace name the review, since each
+    review has its own message history.
+    """
+    configurable = (config or {}).get("configurable", {})
+    thread_id = configurable.get("thread_id")
+    if thread_id is None:
+        return None
+    namespace = configurable.get("checkpoint_ns", "")
+    return f"{thread_id}|{namespace.rsplit('|', 1)[0] if '|' in namespace else ''}"
+
+
+class ToolCallLog:
+    """
+    Successful tool calls of one conversation, keyed by call_key().
+
+    Calls are recorded only once they succeeded. Read-only entries are
+    forgotten when a side-effecting call succeeds (query_cohorts answers
+    differently after fire_reminder), and any entry is released when the
+    model can no longer see its result (see release_ids()).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def earlier(self, key: str) -> Optional[str]:
+        """ID of the earlier successful identical call, or None if this call should run."""
+        with self._lock:
+            entry = self._calls.get(key)
+            return entry[0] if entry else None
+
+    def record(self, key: str, tool_call_id: str, read_only: bool = True) -> None:
+        """Remember a call that succeeded."""
+        with self._lock:
+            self._calls[key] = (tool_call_id, read_only)
+
+    def invalidate_reads(self) -> int:
+        """Forget every read-only call after a side effect; returns how many were forgotten."""
+        with self._lock:
+            stale = [key for key, (_, read_only) in self._calls.items() if read_only]
+            for key in stale:
+                del self._calls[key]
+            return len(stale)
+
+    def release_ids(self, tool_call_ids) -> int:
+        """
+        Forget calls whose results were elided or dropped from the conversation,
+        so an identical call runs again instead of pointing at a result the
+        model cannot see. Returns how many were forgotten.
+        """
+        tool_call_ids = set(tool_call_ids)
+        with self._lock:
+            released = [key for key, (tool_call_id, _) in self._calls.items() if tool_call_id in tool_call_ids]
+            for key in released:
+                del self._calls[key]
+            return len(released)
+
+
+class ToolCallLogs:
+    """Bounded ToolCallLog per conversation."""
+
+    def __init__(self, max_conversations: int = MAX_CONVERSATIONS):
+        self.max_conversations = max_conversations
+        self._logs: "OrderedDict[str, ToolCallLog]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def for_config(self, config: dict) -> ToolCallLog:
+        """The log of the conversation a node runs in (a throwaway log outside a thread)."""
+        key = conversation_key(config)
+        if key is None:
+            return ToolCallLog()
+        with self._lock:
+            log = self._logs.get(key)
+            if log is None:
+                log = self._logs[key] = ToolCallLog()
+                while len(self._logs) > self.max_conversations:
+                    self._logs.popitem(last=False)
+            self._logs.move_to_end(key)
+            return log
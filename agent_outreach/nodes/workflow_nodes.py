@@ -4,82 +4,848 @@ Workflow Node Definitions
 Individual node functions for the LangGraph workflow.
 """
 
+import asyncio
+import contextlib
+import contextvars
+import json
+import re
+import threading
 import time
-from langchain_core.messages import AIMessage, SystemMessage, ToolMessage
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, ValidationError
 
+from ..config.plan_cache import get_plan_cache, plan_key
 from ..config.tool_registry import ToolRegistry
-from ..prompts.prompt_templates import PromptTemplates
+from .batch_classification import MAX_RETRIES, context_limit, parse_decisions, patient_summary, plan_batches
+from .context_budget import ContextBudget, estimate_text_tokens
+from .tool_call_log import ToolCallLogs, call_key
+from ..prompts.prompt_templates import PROMPT_PROFILES, PromptTemplates
+from ..state import PatientBatchState
+from ..tools.cohort_bitmaps import REMOVE_PREFIX, Bitmap, get_cohort_bitmap_index, get_patient_ordinals
+from ..tools.cohort_catalog import get_cohort_catalog
+from ..tools.patient_repository import get_patient_repository
+from ..tools.results_store import get_results_store
+from ..tools.intervention_rules import get_rule_engine
+from ..tools.triage import (
+    LLM_REVIEW, REUSED_RESULT, REVIEW_PATHS, RULES_NO_ACTION, RULES_REMINDER, RULES_REMINDER_REVIEW, triage_patient
+)
 from ..utils.logging_utils import WorkflowLogger
-from ..utils.exception_handler import safe_execute, safe_tool_execution, ExceptionHandler
+from ..utils.exception_handler import (
+    safe_execute, async_safe_execute, safe_tool_execution, async_safe_tool_execution, ExceptionHandler
+)
+
+# Confirmation returned by fire_reminder
+_REMINDER_SENT = re.compile(r"^Reminder sent to Patient (\d+): (.+)$")
 
 class WorkflowNodes:
-    """Collection of workflow node functions."""
+    """
+    Collection of workflow node functions.
+    
+    Every node has an async counterpart prefixed with "a" (e.g. acall_llm) so the
+    same graph can be driven with invoke() or ainvoke().
+    """
     
-    def __init__(self):
+    def __init__(self, max_tool_workers: int = 4, tool_concurrency_limits: dict = None,
+                 context_token_budget: int = 12000, max_classification_batch: int = 25,
+                 prompt_profile: str = "verbose", prefetch_format: str = "tool_messages",
+                 auto_send_rule_reminders: bool = False):
+        if prompt_profile not in PROMPT_PROFILES:
+            raise ValueError(f"Unknown prompt profile '{prompt_profile}'. Expected one of: {', '.join(PROMPT_PROFILES)}")
+        self.prompt_profile = prompt_profile
+        # Send reminders the rules alone decided on; off hands them to the LLM to validate first
+        self.auto_send_rule_reminders = auto_send_rule_reminders
+        # How prefetched tool results are injected: "tool_messages" or "context" (see PREFETCH_MODES)
+        self.prefetch_format = prefetch_format
         self.llm = ToolRegistry.get_llm()
         self.llm_with_tools = ToolRegistry.get_llm_with_tools()
         self.tools = ToolRegistry.get_tools()
+        # OpenAI schemas of self.tools, part of the plan cache key (built on first use)
+        self._tool_schemas = None
+        self.result_encoders = ToolRegistry.get_result_encoders()
+        # Calls already answered per conversation, for coalescing repeated identical tool calls
+        self._tool_call_logs = ToolCallLogs()
+        # Thread pool size for tool calls from one AI message, plus per-tool caps shared across nodes
+        self.max_tool_workers = max_tool_workers
+        limits = ToolRegistry.get_tool_concurrency_limits() if tool_concurrency_limits is None else tool_concurrency_limits
+        self._tool_limits = dict(limits)
+        self._tool_semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in limits.items()}
+        # asyncio semaphores are bound to an event loop, so they are created lazily per loop
+        self._async_tool_semaphores = {}
+        # Prompt token budget for LLM calls (None sends the full history)
+        self.context_budget = ContextBudget(context_token_budget) if context_token_budget else None
+        # Compiled per-batch llm ⇄ tools subgraph, attached by GraphBuilder in fan-out mode
+        self.patient_review_graph = None
+        # Upper bound on patients per structured-output request in batch mode
+        self.max_classification_batch = max_classification_batch
     
     @safe_execute("LLM call")
-    def call_llm(self, state):
+    def call_llm(self, state, config=None):
         """Call the LLM with explicit reasoning requirement."""
         WorkflowLogger.print_info("Calling LLM with reasoning...")
+        enhanced_messages = self._build_llm_messages(state, config)
+        
+        try:
+            WorkflowLogger.print_info("Sending request to OpenAI...")
+            started = time.perf_counter()
+            response = self._reasoning_llm().invoke(enhanced_messages)
+            WorkflowLogger.print_success("Received response from OpenAI")
+            return self._process_llm_response(response, started)
+            
+        except Exception as e:
+            ExceptionHandler.handle_llm_call_error(e, "reasoning workflow")
+    
+    @async_safe_execute("LLM call")
+    async def acall_llm(self, state, config=None):
+        """Async variant of call_llm."""
+        WorkflowLogger.print_info("Calling LLM with reasoning...")
+        enhanced_messages = self._build_llm_messages(state, config)
+        
+        try:
+            WorkflowLogger.print_info("Sending request to OpenAI...")
+            started = time.perf_counter()
+            response = await self._reasoning_llm().ainvoke(enhanced_messages)
+            WorkflowLogger.print_success("Received response from OpenAI")
+            return self._process_llm_response(response, started, interactive=False)
+            
+        except Exception as e:
+            ExceptionHandler.handle_llm_call_error(e, "reasoning workflow")
+    
+    def _reasoning_llm(self):
+        """The tool-calling model; JSON output mode under the lean prompt profile."""
+        if self.prompt_profile == "lean":
+            return self.llm_with_tools.bind(response_format={"type": "json_object"})
+        return self.llm_with_tools
+    
+    def _planning_llm(self):
+        """The planning model; JSON output mode under the lean prompt profile."""
+        if self.prompt_profile == "lean":
+            return self._structured_llm()
+        return self.llm
+    
+    def _build_llm_messages(self, state, config=None):
+        """
+        Enhance system messages with the profile's output prompt and fit the history into the token budget.
         
-        # Enhance messages with reasoning prompt
+        Calls whose results the budget summarized or dropped are released from
+        the conversation's tool call log, so repeating them runs them again.
+        """
+        output_prompt = PromptTemplates.get_output_prompt(self.prompt_profile)
         enhanced_messages = []
         for msg in state["messages"]:
             if isinstance(msg, SystemMessage):
-                enhanced_content = PromptTemplates.get_enhanced_system_message(msg.content)
+                enhanced_content = PromptTemplates.get_enhanced_system_message(msg.content, output_prompt)
                 enhanced_messages.append(SystemMessage(content=enhanced_content))
             else:
                 enhanced_messages.append(msg)
         
-        try:
-            WorkflowLogger.print_info("Sending request to OpenAI...")
-            response = self.llm_with_tools.invoke(enhanced_messages)
-            WorkflowLogger.print_success("Received response from OpenAI")
-            
-            # Display LLM reasoning
+        if self.context_budget is None:
+            return enhanced_messages
+        
+        enhanced_messages, report = self.context_budget.apply(enhanced_messages)
+        if report.tokens_saved:
+            WorkflowLogger.print_info(
+                f"Context budget: ~{report.tokens_before} → ~{report.tokens_after} tokens "
+                f"(saved ~{report.tokens_saved}; {report.elided_results} result(s) summarized, "
+                f"{report.dropped_turns} turn(s) dropped)"
+            )
+        if report.affected_call_ids:
+            self._tool_call_logs.for_config(config).release_ids(report.affected_call_ids)
+        return enhanced_messages
+    
+    def _process_llm_response(self, response, started, interactive=True):
+        """Log the LLM reasoning and validate any requested tool calls (prompting only when interactive)."""
+        # Display LLM reasoning (lean profile: compact decisions)
+        if self.prompt_profile == "lean":
+            WorkflowLogger.print_llm_decisions(response.content)
+        else:
             WorkflowLogger.print_llm_reasoning(response.content)
-            
-            # Analyze tool calls
-            if hasattr(response, 'tool_calls') and response.tool_calls:
-                WorkflowLogger.print_tool_calls(response.tool_calls)
-                self._validate_tool_calls(response.tool_calls)
-            else:
-                WorkflowLogger.print_info("LLM provided final response (no tool calls)")
-            
-            return {"messages": [response]}
-            
-        except Exception as e:
-            ExceptionHandler.handle_llm_call_error(e, "reasoning workflow")
+        
+        # Analyze tool calls
+        if hasattr(response, 'tool_calls') and response.tool_calls:
+            WorkflowLogger.print_tool_calls(response.tool_calls)
+            self._validate_tool_calls(response.tool_calls, interactive)
+        else:
+            WorkflowLogger.print_info("LLM provided final response (no tool calls)")
+        
+        return {"messages": [response], "llm_usage": self._llm_usage(response, started)}
+    
+    @staticmethod
+    def _llm_usage(response, started):
+        """Usage counters of one LLM call for the run's llm_usage totals."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        return {
+            "llm_calls": 1,
+            "prompt_tokens": usage.get("input_tokens", 0),
+            "completion_tokens": usage.get("output_tokens", 0),
+            "llm_ms": round((time.perf_counter() - started) * 1000)
+        }
     
     @safe_execute("planning")
     def planning_node(self, state):
         """Generate execution plan with detailed reasoning requirements."""
         WorkflowLogger.print_info("Generating detailed execution plan...")
         
-        planning_messages = state["messages"] + [SystemMessage(content=PromptTemplates.PLANNING_PROMPT)]
+        planning_messages = self._planning_messages(state)
         
         try:
-            plan_response = self.llm.invoke(planning_messages)
-            
-            WorkflowLogger.print_section("�� DETAILED EXECUTION PLAN:")
-            print(plan_response.content)
-            WorkflowLogger.print_section("")
-            
-            # Validation check
+            started = time.perf_counter()
+            plan_response = self._planning_llm().invoke(planning_messages)
+            return self._process_plan(state, plan_response, started)
+        
+        except Exception as e:
+            ExceptionHandler.handle_llm_call_error(e, "planning phase")
+    
+    @async_safe_execute("planning")
+    async def aplanning_node(self, state):
+        """Async variant of planning_node."""
+        WorkflowLogger.print_info("Generating detailed execution plan...")
+        
+        planning_messages = self._planning_messages(state)
+        
+        try:
+            started = time.perf_counter()
+            plan_response = await self._planning_llm().ainvoke(planning_messages)
+            return self._process_plan(state, plan_response, started)
+        
+        except Exception as e:
+            ExceptionHandler.handle_llm_call_error(e, "planning phase")
+    
+    def _process_plan(self, state, plan_response, started):
+        """Log and validate the generated plan, then append it to the conversation."""
+        WorkflowLogger.print_section("�� DETAILED EXECUTION PLAN:")
+        print(plan_response.content)
+        WorkflowLogger.print_section("")
+        
+        # Validation check (the lean plan lists the patients to validate instead of discussing them)
+        if self.prompt_profile == "verbose":
             if "patient 5" in plan_response.content.lower():
                 WorkflowLogger.print_success("Plan includes Patient 5 validation!")
             else:
                 WorkflowLogger.print_warning("Plan should mention Patient 5 validation!")
+        
+        return {
+            "messages": state["messages"] + [AIMessage(content=f"ENHANCED PLAN:\n{plan_response.content}")],
+            "llm_usage": self._llm_usage(plan_response, started)
+        }
+    
+    def _planning_messages(self, state):
+        """The conversation so far plus the profile's planning instructions."""
+        return state["messages"] + [SystemMessage(content=PromptTemplates.get_planning_prompt(self.prompt_profile))]
+    
+    @safe_execute("cached planning")
+    def cached_planning_node(self, state):
+        """Reuse the stored plan when the planning prompt and tool schemas are unchanged; plan otherwise."""
+        key = self._plan_key(state)
+        plan = get_plan_cache().get(key)
+        if plan is not None:
+            return self._reuse_plan(plan)
+        update = self.planning_node(state)
+        get_plan_cache().put(key, update["messages"][-1].content)
+        return update
+    
+    @async_safe_execute("cached planning")
+    async def acached_planning_node(self, state):
+        """Async variant of cached_planning_node."""
+        key = self._plan_key(state)
+        plan = get_plan_cache().get(key)
+        if plan is not None:
+            return self._reuse_plan(plan)
+        update = await self.aplanning_node(state)
+        get_plan_cache().put(key, update["messages"][-1].content)
+        return update
+    
+    def _plan_key(self, state):
+        """Plan cache key: planning prompt, tool schemas and model."""
+        if self._tool_schemas is None:
+            self._tool_schemas = [convert_to_openai_tool(tool) for tool in self.tools]
+        model = str(getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or "")
+        return plan_key(self._planning_messages(state), self._tool_schemas, model)
+    
+    def _reuse_plan(self, plan):
+        WorkflowLogger.print_success("Reusing cached execution plan (planning LLM call skipped)")
+        return {"messages": [AIMessage(content=plan)]}
+    
+    @safe_execute("parallel planning")
+    def parallel_planning_node(self, state, config=None):
+        """Plan with the LLM while patient and cohort data are prefetched, so the LLM node starts with both."""
+        prefetch_calls = self._prefetch_calls(state)
+        with ThreadPoolExecutor(max_workers=len(prefetch_calls)) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._execute_tool_call, tool_call)
+                for tool_call in prefetch_calls
+            ]
+            update = self.planning_node(state)
+            outcomes = [future.result() for future in futures]
+        update["messages"] = update["messages"] + self._prefetched_messages(prefetch_calls, outcomes, config)
+        return update
+    
+    @async_safe_execute("parallel planning")
+    async def aparallel_planning_node(self, state, config=None):
+        """Async variant of parallel_planning_node."""
+        prefetch_calls = self._prefetch_calls(state)
+        update, *outcomes = await asyncio.gather(
+            self.aplanning_node(state), *(self._aexecute_tool_call(tool_call) for tool_call in prefetch_calls)
+        )
+        update["messages"] = update["messages"] + self._prefetched_messages(prefetch_calls, outcomes, config)
+        return update
+    
+    @safe_execute("prefetch")
+    def prefetch_node(self, state, config=None):
+        """Run the tools every run starts with before the first LLM turn, so the model need not ask for them."""
+        prefetch_calls = self._prefetch_calls(state)
+        with ThreadPoolExecutor(max_workers=len(prefetch_calls)) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._execute_tool_call, tool_call)
+                for tool_call in prefetch_calls
+            ]
+            outcomes = [future.result() for future in futures]
+        return {"messages": self._prefetched_messages(prefetch_calls, outcomes, config)}
+    
+    @async_safe_execute("prefetch")
+    async def aprefetch_node(self, state, config=None):
+        """Async variant of prefetch_node."""
+        prefetch_calls = self._prefetch_calls(state)
+        outcomes = await asyncio.gather(*(self._aexecute_tool_call(tool_call) for tool_call in prefetch_calls))
+        return {"messages": self._prefetched_messages(prefetch_calls, outcomes, config)}
+    
+    def _prefetch_calls(self, state):
+        """
+        Tool calls every run starts with, issued on the LLM's behalf.
+        
+        The patients are fetched as the first list_patients page (the model
+        continues from its next_cursor). After pre-classification the hand-off
+        already carries the patients to review, so only the cohort definitions
+        are fetched.
+        """
+        names = ("get_all_cohorts",) if "review_queue" in state else ("list_patients", "get_all_cohorts")
+        return [{"name": name, "args": {}, "id": f"prefetch-{name}"} for name in names]
+    
+    def _prefetched_messages(self, tool_calls, outcomes, config):
+        """
+        Prefetched results as messages: a synthetic tool-call/tool-result exchange,
+        or with the "context" prefetch format one compact context block.
+        
+        Successful calls are logged, so the model asking for the same data again
+        gets a reference to the call ID, which both formats show.
+        """
+        log = self._tool_call_logs.for_config(config)
+        for tool_call, (success, _, _) in zip(tool_calls, outcomes):
+            if success:
+                log.record(self._call_key(tool_call), tool_call["id"])
+        results = [
+            (tool_call["name"], tool_call["id"],
+             self._encode_result(tool_call["name"], result) if success else str(result))
+            for tool_call, (success, result, _) in zip(tool_calls, outcomes)
+        ]
+        WorkflowLogger.print_info(f"Prefetched {', '.join(name for name, _, _ in results)} ({self.prefetch_format} format)")
+        if self.prefetch_format == "context":
+            return [HumanMessage(content=PromptTemplates.get_prefetched_context(results))]
+        return [AIMessage(content="", tool_calls=tool_calls)] + [
+            ToolMessage(content=content, tool_call_id=tool_call["id"])
+            for tool_call, (_, _, content) in zip(tool_calls, results)
+        ]
+    
+    @safe_execute("pre-classification")
+    def pre_classification_node(self, state):
+        """Triage every patient with deterministic rules so only ambiguous ones reach the LLM."""
+        WorkflowLogger.print_section("⚡ DETERMINISTIC PRE-CLASSIFICATION")
+        
+        triaged = self._triage_panel()
+        reminder_calls = self._fast_path_reminder_calls(triaged)
+        outcomes = [self._execute_tool_call(tool_call) for tool_call in reminder_calls]
+        return self._pre_classification_update(triaged, outcomes)
+    
+    @async_safe_execute("pre-classification")
+    async def apre_classification_node(self, state):
+        """Async variant of pre_classification_node; fast-path reminders are sent concurrently."""
+        WorkflowLogger.print_section("⚡ DETERMINISTIC PRE-CLASSIFICATION")
+        
+        triaged = self._triage_panel()
+        reminder_calls = self._fast_path_reminder_calls(triaged)
+        outcomes = await asyncio.gather(*(self._aexecute_tool_call(tool_call) for tool_call in reminder_calls))
+        return self._pre_classification_update(triaged, outcomes)
+    
+    @safe_execute("incremental classification")
+    def incremental_classification_node(self, state):
+        """Triage only patients whose record, cohort definitions or evaluation date changed since the last committed run."""
+        WorkflowLogger.print_section("♻️ INCREMENTAL PRE-CLASSIFICATION")
+        
+        changed, run = self._plan_incremental_run()
+        triaged = self._triage_panel(changed, date.fromisoformat(run["as_of"]))
+        reminder_calls = self._fast_path_reminder_calls(triaged)
+        outcomes = [self._execute_tool_call(tool_call) for tool_call in reminder_calls]
+        return self._incremental_update(triaged, outcomes, run)
+    
+    @async_safe_execute("incremental classification")
+    async def aincremental_classification_node(self, state):
+        """Async variant of incremental_classification_node."""
+        WorkflowLogger.print_section("♻️ INCREMENTAL PRE-CLASSIFICATION")
+        
+        changed, run = self._plan_incremental_run()
+        triaged = self._triage_panel(changed, date.fromisoformat(run["as_of"]))
+        reminder_calls = self._fast_path_reminder_calls(triaged)
+        outcomes = await asyncio.gather(*(self._aexecute_tool_call(tool_call) for tool_call in reminder_calls))
+        return self._incremental_update(triaged, outcomes, run)
+    
+    def _plan_incremental_run(self):
+        """
+        Compare content hashes, definitions version and validity dates against the results table.
+        
+        Triage depends on today's date only through the days-since metrics, so a
+        result is reused until the valid_until date on which one of them may
+        cross a rule threshold.
+        """
+        repository = get_patient_repository()
+        store = get_results_store()
+        definitions_version = get_cohort_catalog().version
+        as_of = date.today().isoformat()
+        previous = store.load_results()
+        
+        changed, current_ids = [], set()
+        for patient in repository.all():
+            key = str(patient["patient_id"])
+            current_ids.add(key)
+            row = previous.get(key)
+            if (row is None or row["definitions_version"] != definitions_version
+                    or row["content_hash"] != repository.get_content_hash(patient["patient_id"])
+                    or not self._result_valid(row, as_of)):
+                changed.append(patient)
+        
+        run = {
+            "run_id": store.new_run_id(),
+            "definitions_version": definitions_version,
+            "as_of": as_of,
+            "removed": sorted(set(previous) - current_ids),
+            "reused": len(current_ids) - len(changed)
+        }
+        watermark = store.last_committed_run()
+        since = f"run {watermark['run_id']}" if watermark else "no committed run"
+        WorkflowLogger.print_info(
+            f"{len(changed)} changed or expired patient(s) to re-evaluate, {run['reused']} reused (since {since}, "
+            f"definitions {definitions_version})"
+        )
+        return changed, run
+    
+    @staticmethod
+    def _result_valid(row, as_of: str) -> bool:
+        """Whether a committed result still holds on the given date (rows without as_of predate validity tracking)."""
+        return (row["as_of"] is not None and row["as_of"] <= as_of
+                and (row["valid_until"] is None or as_of < row["valid_until"]))
+    
+    def _incremental_update(self, triaged, reminder_outcomes, run):
+        """
+        Pre-classification update plus the staged results to commit at the end of the run.
+        
+        Every re-evaluated patient is staged with the path it took; for patients
+        handed to the LLM, commit_results_node adds what the review did.
+        """
+        notes = [f"{run['reused']} unchanged patient(s): previous results reused"] if run["reused"] else []
+        update = self._pre_classification_update(triaged, reminder_outcomes, notes, {REUSED_RESULT: run["reused"]})
+        
+        repository = get_patient_repository()
+        run["results"] = {
+            str(triage.patient_id): {
+                "content_hash": repository.get_content_hash(triage.patient_id),
+                "as_of": run["as_of"],
+                "valid_until": triage.valid_until.isoformat() if triage.valid_until else None,
+                "result": {**triage.outcome(), "path": self._effective_path(triage)}
+            }
+            for _, triage in triaged
+        }
+        update["incremental_run"] = run
+        return update
+    
+    def commit_results_node(self, state):
+        """Persist the staged results of an incremental run and record it as the new watermark."""
+        run = state.get("incremental_run")
+        if not run:
+            return {}
+        results = self._with_review_outcomes(run["results"], state)
+        get_results_store().commit_run(
+            run["run_id"], "incremental", run["definitions_version"], results, run["removed"], run["reused"]
+        )
+        WorkflowLogger.print_success(
+            f"Committed {run['run_id']}: {len(results)} re-evaluated, {run['reused']} reused"
+        )
+        return {}
+    
+    def _with_review_outcomes(self, results, state):
+        """Staged results with the LLM review's outcome (the reminder it sent, if any) for reviewed patients."""
+        sent = {}
+        contents = [str(msg.content) for msg in state.get("messages", []) if isinstance(msg, ToolMessage)]
+        for content in [*contents, *state.get("reminders_sent", [])]:
+            match = _REMINDER_SENT.match(content)
+            if match:
+                sent.setdefault(match.group(1), match.group(2))
+        return {
+            patient_id: (
+                {**row, "result": {**row["result"], "llm_review": {"reminder_type": sent.get(patient_id)}}}
+                if row["result"]["path"] in REVIEW_PATHS else row
+            )
+            for patient_id, row in results.items()
+        }
+    
+    async def acommit_results_node(self, state):
+        """Async variant of commit_results_node."""
+        return await asyncio.to_thread(self.commit_results_node, state)
+    
+    def _triage_panel(self, patients=None, as_of=None):
+        """Run deterministic triage over the given patients (default: every patient in the repository)."""
+        repository = get_patient_repository()
+        return [
+            (patient, triage_patient(patient, repository.get_measurements(patient["patient_id"]), as_of))
+            for patient in (repository.all() if patients is None else patients)
+        ]
+    
+    def _effective_path(self, triage):
+        """Path a patient takes: rule-decided reminders are held for LLM validation unless auto-sending is enabled."""
+        if triage.path == RULES_REMINDER and not self.auto_send_rule_reminders:
+            return RULES_REMINDER_REVIEW
+        return triage.path
+    
+    def _fast_path_reminder_calls(self, triaged):
+        """Tool calls for every patient whose rules decided they need an intervention (auto-send only)."""
+        if not self.auto_send_rule_reminders:
+            return []
+        return [
+            {
+                "name": "fire_reminder",
+                "args": {"patient_id": triage.patient_id, "reminder_type": triage.reminder_type},
+                "id": f"rules-{triage.patient_id}"
+            }
+            for _, triage in triaged if triage.path == RULES_REMINDER
+        ]
+    
+    def _pre_classification_update(self, triaged, reminder_outcomes, notes=(), extra_counts=None):
+        """Build the hand-off message and path counts from triage results."""
+        path_counts = {
+            RULES_REMINDER: 0, RULES_REMINDER_REVIEW: 0, RULES_NO_ACTION: 0, LLM_REVIEW: 0, **(extra_counts or {})
+        }
+        reminder_results = iter(reminder_outcomes)
+        handled, residual, review_queue = list(notes), [], []
+        assignments = {}
+        
+        for patient, triage in triaged:
+            path = self._effective_path(triage)
+            path_counts[path] += 1
             
-            return {"messages": state["messages"] + [AIMessage(content=f"ENHANCED PLAN:\n{plan_response.content}")]}
+            if path == RULES_REMINDER:
+                success, result, _ = next(reminder_results)
+                also = "; ".join(f"{other['cohort']}: {other['reminder_type']}" for other in triage.other_interventions)
+                handled.append(f"{result} ({triage.cohort}" + (f"; also indicated, not sent: {also})" if also else ")"))
+                assignments[str(triage.patient_id)] = triage.cohort
+            elif path == RULES_NO_ACTION:
+                handled.append(f"Patient {triage.patient_id}: no intervention needed ({', '.join(triage.cohorts)})")
+                assignments[str(triage.patient_id)] = triage.cohort
+            else:
+                residual.append({"patient": patient, **triage.evidence()})
+                review_queue.append(triage.evidence())
         
-        except Exception as e:
-            ExceptionHandler.handle_llm_call_error(e, "planning phase")
+        WorkflowLogger.print_path_counts(path_counts)
+        if path_counts[RULES_REMINDER_REVIEW]:
+            WorkflowLogger.print_info(
+                f"{path_counts[RULES_REMINDER_REVIEW]} rule-decided reminder(s) held for LLM validation "
+                f"(enable auto_send_rule_reminders to send them without review)"
+            )
+        uncovered = [name for name, criteria in get_rule_engine().unchecked_criteria.items() if criteria]
+        if uncovered:
+            WorkflowLogger.print_info(
+                f"Rules cannot close {', '.join(uncovered)} members as 'no action': some intervention criteria "
+                f"have no rule, so those patients go to LLM review"
+            )
+        
+        if residual:
+            message = HumanMessage(content=PromptTemplates.get_hybrid_review_prompt(handled, residual))
+        else:
+            summary = "\n".join(f"- {line}" for line in handled)
+            message = AIMessage(content=f"Deterministic pre-classification handled every patient:\n{summary}")
+        
+        # Cohort membership and intervention flags for the whole panel, as packed bitmaps
+        return {
+            "messages": [message],
+            "path_counts": path_counts,
+            "cohorts": get_cohort_bitmap_index().to_state(),
+            "patient_to_cohort": assignments,
+            "review_queue": review_queue
+        }
+    
+    @safe_execute("batch classification")
+    def batch_classification_node(self, state):
+        """Classify the patients the rules could not decide in as few structured-output LLM calls as fit."""
+        WorkflowLogger.print_section("📦 BATCH LLM CLASSIFICATION")
+        
+        batches = self._classification_batches(state)
+        stats = {"llm_calls": 0, "retried_items": 0, "completion_tokens": 0}
+        decisions = {}
+        for batch in batches:
+            decisions.update(self._classify_batch(batch, stats))
+        
+        reminder_calls = self._decision_reminder_calls(decisions)
+        outcomes = [self._execute_tool_call(tool_call) for tool_call in reminder_calls]
+        return self._batch_classification_update(batches, decisions, outcomes, stats)
+    
+    @async_safe_execute("batch classification")
+    async def abatch_classification_node(self, state):
+        """Async variant of batch_classification_node; batches are classified concurrently."""
+        WorkflowLogger.print_section("📦 BATCH LLM CLASSIFICATION")
+        
+        batches = self._classification_batches(state)
+        stats = {"llm_calls": 0, "retried_items": 0, "completion_tokens": 0}
+        decisions = {}
+        for batch_decisions in await asyncio.gather(*(self._aclassify_batch(batch, stats) for batch in batches)):
+            decisions.update(batch_decisions)
+        
+        reminder_calls = self._decision_reminder_calls(decisions)
+        outcomes = await asyncio.gather(*(self._aexecute_tool_call(tool_call) for tool_call in reminder_calls))
+        return self._batch_classification_update(batches, decisions, outcomes, stats)
+    
+    def _classification_batches(self, state):
+        """Summaries of the patients queued for LLM review, packed to fit the model's context window."""
+        repository = get_patient_repository()
+        summaries = []
+        for evidence in state.get("review_queue", []):
+            patient = repository.get(evidence["patient_id"])
+            if patient is not None:
+                summaries.append(patient_summary(patient, evidence))
+        
+        prompt_tokens = estimate_text_tokens(PromptTemplates.get_batch_classification_prompt(get_cohort_catalog()))
+        batches = plan_batches(summaries, context_limit(self.llm), prompt_tokens, self.max_classification_batch)
+        WorkflowLogger.print_info(f"Packing {len(summaries)} patient(s) into {len(batches)} batch request(s)")
+        return batches
+    
+    def _classify_batch(self, batch, stats):
+        """Classify one batch, re-sending only the patients whose decisions did not validate."""
+        decisions, pending = {}, batch
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = self._structured_llm().invoke(self._batch_request(pending))
+            except Exception as e:
+                WorkflowLogger.print_warning(f"Batch request failed: {e}")
+                stats["llm_calls"] += 1
+                continue
+            pending = self._accept_batch_response(pending, response, decisions, stats, attempt)
+            if not pending:
+                break
+        return decisions
+    
+    async def _aclassify_batch(self, batch, stats):
+        """Async variant of _classify_batch."""
+        decisions, pending = {}, batch
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = await self._structured_llm().ainvoke(self._batch_request(pending))
+            except Exception as e:
+                WorkflowLogger.print_warning(f"Batch request failed: {e}")
+                stats["llm_calls"] += 1
+                continue
+            pending = self._accept_batch_response(pending, response, decisions, stats, attempt)
+            if not pending:
+                break
+        return decisions
+    
+    def _structured_llm(self):
+        """The planning/classification model in JSON output mode."""
+        return self.llm.bind(response_format={"type": "json_object"})
     
-    def enhanced_tool_node(self, state):
+    def _batch_request(self, summaries):
+        """Messages classifying one batch of patient summaries."""
+        return [
+            SystemMessage(content=PromptTemplates.get_batch_classification_prompt(get_cohort_catalog())),
+            HumanMessage(content=PromptTemplates.get_batch_classification_message(summaries))
+        ]
+    
+    def _accept_batch_response(self, pending, response, decisions, stats, attempt):
+        """Record the valid decisions of a response; returns the summaries still to classify."""
+        stats["llm_calls"] += 1
+        usage = getattr(response, "usage_metadata", None) or {}
+        stats["completion_tokens"] += usage.get("output_tokens", 0)
+        
+        patient_ids = [summary["patient"]["patient_id"] for summary in pending]
+        accepted, failed = parse_decisions(response.content, patient_ids, get_cohort_catalog())
+        decisions.update(accepted)
+        if failed and attempt < MAX_RETRIES:
+            WorkflowLogger.print_warning(f"{len(failed)} decision(s) did not validate, retrying patients {failed}")
+            stats["retried_items"] += len(failed)
+        return [summary for summary in pending if summary["patient"]["patient_id"] in failed]
+    
+    def _decision_reminder_calls(self, decisions):
+        """Reminder tool calls for every patient the model decided needs an intervention."""
+        return [
+            {
+                "name": "fire_reminder",
+                "args": {"patient_id": patient_id, "reminder_type": decision.intervention_type},
+                "id": f"batch-{patient_id}"
+            }
+            for patient_id, decision in decisions.items() if decision.needs_intervention
+        ]
+    
+    def _batch_classification_update(self, batches, decisions, reminder_outcomes, stats):
+        """Cohort assignments, reminders and throughput of a batch classification run."""
+        ordinals = get_patient_ordinals()
+        assignments, members, lines, reviewed = {}, {}, [], []
+        unresolved = 0
+        for summary in (summary for batch in batches for summary in batch):
+            patient_id = summary["patient"]["patient_id"]
+            reviewed.append(ordinals.ordinal(patient_id))
+            decision = decisions.get(patient_id)
+            if decision is None:
+                # Output never validated: keep the rule suggestion and leave the outreach decision open
+                unresolved += 1
+                cohort_name = (summary["suggested_cohorts"] or [None])[0]
+                lines.append(f"Patient {patient_id}: unresolved, rule suggestion {cohort_name or 'none'}")
+            else:
+                cohort_name = decision.cohort
+                lines.append(f"Patient {patient_id}: {cohort_name or 'no cohort'} ({decision.rationale})")
+            if cohort_name:
+                assignments[str(patient_id)] = cohort_name
+                members.setdefault(cohort_name, []).append(ordinals.ordinal(patient_id))
+        
+        reminders = [str(result) for _, result, _ in reminder_outcomes]
+        patients = sum(len(batch) for batch in batches)
+        stats.update(
+            patients=patients,
+            batches=len(batches),
+            unresolved=unresolved,
+            patients_per_call=round(patients / stats["llm_calls"], 2) if stats["llm_calls"] else 0.0
+        )
+        WorkflowLogger.print_batch_stats(stats)
+        
+        return {
+            "messages": [AIMessage(content="Batch classification results:\n" + "\n".join(
+                f"- {line}" for line in lines + reminders
+            ))],
+            "cohorts": self._reviewed_cohorts(reviewed, members),
+            "patient_to_cohort": assignments,
+            "reminders_sent": [reminder for reminder in reminders if reminder.startswith("Reminder sent")],
+            "llm_batch_stats": stats
+        }
+    
+    @safe_execute("patient review")
+    def review_patient_batch_node(self, state: PatientBatchState):
+        """Review one fan-out batch of patients in its own small LLM conversation."""
+        patients, evidence = self._load_review_batch(state)
+        result = self.patient_review_graph.invoke(self._review_input(patients, evidence))
+        return self._review_update(patients, evidence, result)
+    
+    @async_safe_execute("patient review")
+    async def areview_patient_batch_node(self, state: PatientBatchState):
+        """Async variant of review_patient_batch_node."""
+        patients, evidence = self._load_review_batch(state)
+        result = await self.patient_review_graph.ainvoke(self._review_input(patients, evidence))
+        return self._review_update(patients, evidence, result)
+    
+    def _load_review_batch(self, state: PatientBatchState):
+        """Load a batch's patients (skipping any removed since dispatch) and their rule evidence."""
+        repository = get_patient_repository()
+        patients = [patient for patient in map(repository.get, state["patient_ids"]) if patient is not None]
+        return patients, [triage.evidence() for _, triage in self._triage_panel(patients)]
+    
+    def _review_input(self, patients, evidence):
+        """Fresh conversation for one patient batch."""
+        patient_ids = [patient["patient_id"] for patient in patients]
+        WorkflowLogger.print_info(f"Reviewing patient batch {patient_ids}...")
+        
+        return {
+            "messages": [
+                SystemMessage(content=PromptTemplates.PATIENT_REVIEW_PROMPT),
+                HumanMessage(content=PromptTemplates.get_patient_review_message(patients, evidence))
+            ]
+        }
+    
+    def _review_update(self, patients, evidence, result):
+        """Turn a finished batch conversation into cohort assignments and reminder confirmations."""
+        assignments = self._parse_cohort_assignments(result["messages"][-1].content, evidence)
+        ordinals = get_patient_ordinals()
+        patient_ids = {str(patient["patient_id"]): patient["patient_id"] for patient in patients}
+        members = {}
+        for patient_id, cohort_name in assignments.items():
+            if cohort_name and patient_id in patient_ids:
+                members.setdefault(cohort_name, []).append(ordinals.ordinal(patient_ids[patient_id]))
+        cohorts = self._reviewed_cohorts([ordinals.ordinal(pid) for pid in patient_ids.values()], members)
+        
+        reminders = [
+            msg.content for msg in result["messages"]
+            if isinstance(msg, ToolMessage) and str(msg.content).startswith("Reminder sent")
+        ]
+        
+        return {
+            "cohorts": cohorts,
+            "patient_to_cohort": {pid: name for pid, name in assignments.items() if name},
+            "path_counts": {LLM_REVIEW: len(patients)},
+            "reminders_sent": reminders
+        }
+    
+    def _reviewed_cohorts(self, reviewed, members):
+        """
+        Cohort bitmaps update for reviewed patients: removal masks clearing them from
+        every rule-suggested cohort, plus the cohorts the review assigned them to.
+        """
+        removed = Bitmap.from_ordinals(reviewed).to_bytes()
+        cohorts = {f"{REMOVE_PREFIX}{name}": removed for name in get_cohort_catalog().names}
+        cohorts.update({name: Bitmap.from_ordinals(member).to_bytes() for name, member in members.items()})
+        return cohorts
+    
+    def summarize_cohorts_node(self, state):
+        """Reduce step of the fan-out graph: report the merged cohort assignments."""
+        ordinals = get_patient_ordinals()
+        lines = []
+        for name, data in state.get("cohorts", {}).items():
+            members = ordinals.patient_ids(Bitmap.from_bytes(data).ordinals())
+            lines.append(f"- {name}: {len(members)} patient(s) {', '.join(map(str, members))}")
+        lines += [f"- {reminder}" for reminder in state.get("reminders_sent", [])]
+        WorkflowLogger.print_section("🧮 FAN-OUT REVIEW COMPLETE")
+        print("\n".join(lines) or "No cohort assignments")
+        return {"messages": [AIMessage(content="Cohort assignments and reminders:\n" + ("\n".join(lines) or "- none"))]}
+    
+    async def asummarize_cohorts_node(self, state):
+        """Async variant of summarize_cohorts_node."""
+        return self.summarize_cohorts_node(state)
+    
+    def _parse_cohort_assignments(self, content: str, evidence: list) -> dict:
+        """
+        Read the COHORT ASSIGNMENTS line, or under the lean prompt profile the
+        decisions[].cohort of the JSON response; fall back to the rule-suggested
+        cohort per patient.
+        """
+        assignments = {
+            str(facts["patient_id"]): (facts["suggested_cohorts"] or [None])[0]
+            for facts in evidence
+        }
+        
+        marker = PromptTemplates.COHORT_ASSIGNMENTS_MARKER
+        parsed = self._lean_cohort_assignments(content) if self.prompt_profile == "lean" else None
+        if parsed is None and marker not in (content or ""):
+            WorkflowLogger.print_warning("No cohort assignments in review output, using rule suggestions")
+            return assignments
+        
+        if parsed is None:
+            try:
+                parsed = json.loads(content.rsplit(marker, 1)[1].strip().splitlines()[0])
+            except (ValueError, IndexError):
+                WorkflowLogger.print_warning("Malformed cohort assignments in review output, using rule suggestions")
+                return assignments
+        
+        for patient_id, cohort_name in parsed.items():
+            if str(patient_id) in assignments:
+                assignments[str(patient_id)] = None if str(cohort_name).lower() == "none" else cohort_name
+        return assignments
+    
+    @staticmethod
+    def _lean_cohort_assignments(content: str):
+        """Patient ID to cohort from a lean {"decisions": [...]} response, or None if it is not one."""
+        try:
+            decisions = json.loads(content or "").get("decisions")
+            return {
+                str(decision["patient_id"]): decision.get("cohort") or "none"
+                for decision in decisions
+            }
+        except (ValueError, AttributeError, TypeError, KeyError):
+            return None
+    
+    def enhanced_tool_node(self, state, config=None):
         """Enhanced tool node with detailed logging and safe execution."""
         WorkflowLogger.print_section("🛠️ TOOL EXECUTION PHASE")
         
@@ -90,44 +856,224 @@ class WorkflowNodes:
                 WorkflowLogger.print_error("No tool calls found in message")
                 return {"messages": []}
             
-            tool_messages = []
+            tool_calls = last_message.tool_calls
+            for i, tool_call in enumerate(tool_calls, 1):
+                WorkflowLogger.print_tool_execution(i, tool_call.get('name', 'Unknown'), tool_call.get('args', {}))
             
-            for i, tool_call in enumerate(last_message.tool_calls, 1):
-                tool_name = tool_call.get('name', 'Unknown')
-                tool_args = tool_call.get('args', {})
-                tool_id = tool_call.get('id', 'unknown')
-                
-                WorkflowLogger.print_tool_execution(i, tool_name, tool_args)
-                
-                # Find tool function
-                tool_func = self._find_tool_function(tool_name)
-                
-                if not tool_func:
-                    error_msg = f"Tool '{tool_name}' not found"
-                    WorkflowLogger.print_error(error_msg)
-                    tool_messages.append(ToolMessage(content=error_msg, tool_call_id=tool_id))
-                    continue
-                
-                # Execute tool safely
-                start_time = time.time()
-                WorkflowLogger.print_info(f"Executing {tool_name}...")
-                
-                success, result = safe_tool_execution(tool_name, tool_func, tool_args)
-                execution_time = time.time() - start_time
-                
-                if success:
-                    WorkflowLogger.print_tool_result(tool_name, result, execution_time)
-                
-                tool_messages.append(ToolMessage(content=str(result), tool_call_id=tool_id))
+            # Repeats of calls that already succeeded in this conversation, or of another call
+            # in this message, are not executed again
+            log = self._tool_call_logs.for_config(config)
+            repeats = self._repeated_tool_calls(log, tool_calls)
+            pending = [tool_call for tool_call, repeat in zip(tool_calls, repeats) if repeat is None]
+            
+            # Independent tool calls from one AI message run concurrently, in order, each in a copy
+            # of this context so they see the run's pinned cohort catalog
+            if len(pending) > 1 and self.max_tool_workers > 1:
+                with ThreadPoolExecutor(max_workers=min(len(pending), self.max_tool_workers)) as pool:
+                    futures = [
+                        pool.submit(contextvars.copy_context().run, self._execute_tool_call, tool_call)
+                        for tool_call in pending
+                    ]
+                    outcomes = [future.result() for future in futures]
+            else:
+                outcomes = [self._execute_tool_call(tool_call) for tool_call in pending]
             
-            WorkflowLogger.print_workflow_complete(len(tool_messages))
-            return {"messages": tool_messages}
+            return self._tool_node_update(tool_calls, outcomes, repeats, log)
             
         except Exception as e:
             error_msg = f"Critical error in tool execution: {str(e)}"
             WorkflowLogger.print_error(error_msg)
             return {"messages": [ToolMessage(content=error_msg, tool_call_id="error")]}
     
+    async def aenhanced_tool_node(self, state, config=None):
+        """Async variant of enhanced_tool_node; tool calls run concurrently on the event loop."""
+        WorkflowLogger.print_section("🛠️ TOOL EXECUTION PHASE")
+        
+        try:
+            last_message = state["messages"][-1]
+            
+            if not hasattr(last_message, 'tool_calls') or not last_message.tool_calls:
+                WorkflowLogger.print_error("No tool calls found in message")
+                return {"messages": []}
+            
+            tool_calls = last_message.tool_calls
+            for i, tool_call in enumerate(tool_calls, 1):
+                WorkflowLogger.print_tool_execution(i, tool_call.get('name', 'Unknown'), tool_call.get('args', {}))
+            
+            # gather() returns results in call order
+            workers = asyncio.Semaphore(max(1, self.max_tool_workers))
+            async def run(tool_call):
+                async with workers:
+                    return await self._aexecute_tool_call(tool_call)
+            log = self._tool_call_logs.for_config(config)
+            repeats = self._repeated_tool_calls(log, tool_calls)
+            pending = [tool_call for tool_call, repeat in zip(tool_calls, repeats) if repeat is None]
+            outcomes = await asyncio.gather(*(run(tool_call) for tool_call in pending))
+            
+            return self._tool_node_update(tool_calls, outcomes, repeats, log)
+            
+        except Exception as e:
+            error_msg = f"Critical error in tool execution: {str(e)}"
+            WorkflowLogger.print_error(error_msg)
+            return {"messages": [ToolMessage(content=error_msg, tool_call_id="error")]}
+    
+    def _tool_node_update(self, tool_calls, outcomes, repeats, log):
+        """
+        Report per-tool timings, record successful calls and build ToolMessages in the original call order.
+        
+        A repeat of another call in this message gets a reference only if that
+        call succeeded, and its error otherwise. After a successful
+        side-effecting call the read-only entries of the log are dropped.
+        """
+        tool_messages = []
+        dedup_counts = {"coalesced": 0, "duplicates_blocked": 0}
+        executed = iter(outcomes)
+        results = {}
+        side_effect = False
+        for index, (tool_call, repeat) in enumerate(zip(tool_calls, repeats)):
+            if isinstance(repeat, str):
+                content = self._repeated_call_result(tool_call, repeat, dedup_counts)
+            elif repeat is not None:
+                success, result, _ = results[repeat]
+                content = (self._repeated_call_result(tool_call, tool_calls[repeat].get('id', 'unknown'), dedup_counts)
+                           if success else self._encode_result(tool_call.get('name'), result))
+            else:
+                success, result, execution_time = results[index] = next(executed)
+                if success:
+                    WorkflowLogger.print_tool_result(tool_call.get('name', 'Unknown'), result, execution_time)
+                    read_only = tool_call.get('name') in ToolRegistry.READ_ONLY_TOOLS
+                    side_effect = side_effect or not read_only
+                    if self._coalescable(tool_call):
+                        log.record(self._call_key(tool_call), tool_call.get('id', 'unknown'), read_only)
+                content = self._encode_result(tool_call.get('name'), result)
+            tool_messages.append(ToolMessage(content=content, tool_call_id=tool_call.get('id', 'unknown')))
+        
+        if side_effect:
+            log.invalidate_reads()
+        WorkflowLogger.print_workflow_complete(len(tool_messages))
+        update = {"messages": tool_messages}
+        if any(dedup_counts.values()):
+            update["tool_call_dedup"] = dedup_counts
+        return update
+    
+    def _coalescable(self, tool_call):
+        name = tool_call.get('name')
+        return name in ToolRegistry.READ_ONLY_TOOLS or name in ToolRegistry.DEDUPLICATED_TOOLS
+    
+    def _call_key(self, tool_call):
+        """Tool name plus arguments normalized through the tool's schema (defaults filled, types coerced)."""
+        tool_name = tool_call.get('name')
+        args = tool_call.get('args', {})
+        schema = getattr(self._find_tool(tool_name), "args_schema", None)
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            try:
+                args = schema.model_validate(args).model_dump()
+            except ValidationError:
+                pass
+        return call_key(tool_name, args)
+    
+    def _repeated_tool_calls(self, log, tool_calls):
+        """
+        Per tool call, what it repeats: the ID of an identical call that already
+        succeeded in this conversation, the index of an identical call earlier
+        in this message, or None to execute it.
+        """
+        repeats, first_in_message = [], {}
+        for index, tool_call in enumerate(tool_calls):
+            if not self._coalescable(tool_call):
+                repeats.append(None)
+                continue
+            key = self._call_key(tool_call)
+            earlier_id = log.earlier(key)
+            if earlier_id is not None:
+                repeats.append(earlier_id)
+            else:
+                repeats.append(first_in_message.get(key))
+                first_in_message.setdefault(key, index)
+        return repeats
+    
+    def _repeated_call_result(self, tool_call, earlier_id, dedup_counts):
+        """Short ToolMessage content for a repeated call instead of executing it again."""
+        tool_name = tool_call.get('name')
+        if tool_name in ToolRegistry.DEDUPLICATED_TOOLS:
+            dedup_counts["duplicates_blocked"] += 1
+            WorkflowLogger.print_warning(
+                f"Duplicate {tool_name} call {tool_call.get('args', {})} blocked (already executed as {earlier_id})"
+            )
+            return f"Duplicate call not executed: {tool_name} with these arguments already ran in this run (call {earlier_id})."
+        dedup_counts["coalesced"] += 1
+        WorkflowLogger.print_info(f"{tool_name} repeated: referring to the result of call {earlier_id}")
+        return f"Unchanged: same result as the earlier {tool_name} call {earlier_id} above."
+    
+    def _execute_tool_call(self, tool_call):
+        """Execute one tool call under its per-tool concurrency limit; returns (success, result, seconds)."""
+        tool_name = tool_call.get('name', 'Unknown')
+        tool_args = tool_call.get('args', {})
+        
+        # Find tool function
+        tool_func = self._find_tool_function(tool_name)
+        
+        if not tool_func:
+            error_msg = f"Tool '{tool_name}' not found"
+            WorkflowLogger.print_error(error_msg)
+            return False, error_msg, 0.0
+        
+        semaphore = self._tool_semaphores.get(tool_name)
+        if semaphore:
+            semaphore.acquire()
+        try:
+            # Execute tool safely
+            start_time = time.time()
+            WorkflowLogger.print_info(f"Executing {tool_name}...")
+            success, result = safe_tool_execution(tool_name, tool_func, tool_args)
+            return success, result, time.time() - start_time
+        finally:
+            if semaphore:
+                semaphore.release()
+    
+    def _encode_result(self, tool_name: str, result) -> str:
+        """Compact, size-guarded ToolMessage content for a tool result."""
+        encoder = self.result_encoders.get(tool_name, self.result_encoders[None])
+        return encoder.encode(result, tool_name=tool_name)
+    
+    async def _aexecute_tool_call(self, tool_call):
+        """Async variant of _execute_tool_call, preferring a tool's native coroutine."""
+        tool_name = tool_call.get('name', 'Unknown')
+        tool_args = tool_call.get('args', {})
+        
+        tool = self._find_tool(tool_name)
+        
+        if not tool:
+            error_msg = f"Tool '{tool_name}' not found"
+            WorkflowLogger.print_error(error_msg)
+            return False, error_msg, 0.0
+        
+        async with self._async_tool_semaphore(tool_name):
+            start_time = time.time()
+            WorkflowLogger.print_info(f"Executing {tool_name}...")
+            success, result = await async_safe_tool_execution(tool_name, tool.coroutine or tool.func, tool_args)
+            return success, result, time.time() - start_time
+    
+    def _async_tool_semaphore(self, tool_name: str):
+        """Per-tool asyncio semaphore for the running event loop (no-op when the tool is unlimited)."""
+        limit = self._tool_limits.get(tool_name)
+        if not limit:
+            return contextlib.nullcontext()
+        
+        loop = asyncio.get_running_loop()
+        entry = self._async_tool_semaphores.get(tool_name)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, asyncio.Semaphore(limit))
+            self._async_tool_semaphores[tool_name] = entry
+        return entry[1]
+    
+    def _find_tool(self, tool_name: str):
+        """Find registered tool by name."""
+        for tool in self.tools:
+            if tool.name == tool_name:
+                return tool
+        return None
+    
     def _find_tool_function(self, tool_name: str):
         """Find tool function by name."""
         for tool in self.tools:
@@ -135,8 +1081,14 @@ class WorkflowNodes:
                 return tool.func
         return None
     
-    def _validate_tool_calls(self, tool_calls):
-        """Validate tool calls for suspicious actions."""
+    def _validate_tool_calls(self, tool_calls, interactive=True):
+        """
+        Validate tool calls for suspicious actions.
+        
+        A suspicious action is confirmed on the console when interactive; the
+        async path must not block the event loop on input(), so there it is
+        rejected as if the user had declined.
+        """
         for tool_call in tool_calls:
             if tool_call.get('name') == "fire_reminder":
                 patient_id = tool_call.get('args', {}).get('patient_id')
@@ -144,6 +1096,8 @@ class WorkflowNodes:
                 
                 if patient_id == 5 and "hba1c" in reminder_type.lower():
                     WorkflowLogger.print_validation_warning(patient_id, "is cancer screening, not diabetic!")
+                    if not interactive:
+                        raise ValueError("Action cancelled due to classification concern (no confirmation on the async path).")
                     user_input = input("\n⚠️ Suspicious action detected! Continue? (y/n): ")
                     if user_input.lower() != 'y':
                         raise ValueError("Action cancelled due to classification concern.")
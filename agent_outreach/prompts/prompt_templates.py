@@ -4,6 +4,12 @@ Prompt Templates for Clinical Outreach Agent
 Centralized storage of all system prompts and reasoning templates.
 """
 
+import json
+
+# verbose: free-text REASONING sections before every action (demo/audit runs)
+# lean:    compact JSON decisions with rationale codes in the model's JSON mode (production)
+PROMPT_PROFILES = ("verbose", "lean")
+
 class PromptTemplates:
     """Collection of prompt templates used throughout the workflow."""
     
@@ -23,6 +29,22 @@ REASONING:
 ACTIONS:
 [Then proceed with tool calls]"""
 
+    # Short codes the lean profile uses instead of free-text justifications
+    RATIONALE_CODES = {
+        "LAB_OVERDUE": "a monitored lab or screening is overdue",
+        "OUT_OF_RANGE": "latest value is outside the cohort target",
+        "NO_FOLLOW_UP": "no recent visit or follow-up",
+        "ADHERENCE": "medication adherence concern",
+        "AT_TARGET": "in cohort and at target, no action",
+        "NO_COHORT": "meets no cohort's classification criteria",
+        "MISSING_DATA": "data needed to decide is missing"
+    }
+
+    LEAN_OUTPUT_PROMPT = """OUTPUT FORMAT: Do not write out your reasoning. Call tools directly when you need them.
+When you report results, respond with compact JSON only, one decision per patient:
+{{"decisions": [{{"patient_id": <int>, "cohort": "<cohort name or null>", "action": "<reminder type or none>", "code": "<rationale code>"}}]}}
+Rationale codes: {codes}"""
+
     PLANNING_PROMPT = """Create a comprehensive execution plan with reasoning validation.
     
     PLANNING REQUIREMENTS:
@@ -34,6 +56,14 @@ ACTIONS:
     
     Be specific about tool names, parameters, and expected patient classifications."""
 
+    LEAN_PLANNING_PROMPT = """Create the execution plan as compact JSON only, without explanations:
+{"steps": [{"tool": "<tool name>", "purpose": "<at most 8 words>"}], "validate": [<patient IDs to double-check>]}"""
+
+    PREFETCHED_CONTEXT_PROMPT = """PREFETCHED DATA (already loaded for you; do not call these tools again):
+{results}
+
+Go straight to classifying the patients and sending reminders."""
+
     SYSTEM_PROMPT = """You are an Enhanced Clinical Outreach Agent v2.0 with reasoning validation capabilities.
 
 CRITICAL VALIDATION REQUIREMENTS:
@@ -42,7 +72,7 @@ CRITICAL VALIDATION REQUIREMENTS:
 
 Your workflow:
 1. Generate execution plan with validation steps
-2. Get all patients and analyze their data
+2. Page through the patients with list_patients (pass next_cursor back until it is null) and analyze their data
 3. Get all cohorts to understand classification criteria
 4. Classify each patient correctly based on their actual data
 5. Send appropriate reminders based on validated cohorts
@@ -50,7 +80,90 @@ Your workflow:
 
 Execute with maximum transparency and validation."""
 
-    WORKFLOW_START_PROMPT = """Please start the clinical outreach workflow. Get all patients, analyze their data, classify them into appropriate cohorts, and send reminders to patients who need interventions."""
+    WORKFLOW_START_PROMPT = """Please start the clinical outreach workflow. Page through all patients with list_patients, analyze their data, classify them into appropriate cohorts, and send reminders to patients who need interventions."""
+
+    HYBRID_REVIEW_PROMPT = """Deterministic pre-classification has already processed the patient panel.
+
+ALREADY HANDLED (do not contact these patients again):
+{handled}
+
+PATIENTS NEEDING YOUR REVIEW:
+The rules could not decide the patients below, or recommend a reminder that has not been sent.
+Each entry includes the patient record, suggested cohorts, the rule evidence (matched criteria,
+missing metrics, criteria no rule checks) and any rule_recommendation to validate before sending.
+{residual}
+
+Do not list the whole panel (list_patients, get_all_patients). Classify only these patients, validate their cohorts
+against their data, and send appropriate reminders to those who need interventions."""
+
+    PATIENT_REVIEW_PROMPT = """You are reviewing a small batch of patients as part of a larger outreach run.
+
+Only work on the patients given to you. Do not list the whole panel (list_patients, get_all_patients).
+1. Use get_all_cohorts or get_cohort_info if you need classification or intervention criteria
+2. Classify each patient into the single most appropriate cohort based on their actual data
+3. Send appropriate reminders to patients who need interventions
+
+When you are done, end your final message with one line in exactly this format:
+COHORT ASSIGNMENTS: {"<patient_id>": "<cohort_name or none>", ...}"""
+
+    COHORT_ASSIGNMENTS_MARKER = "COHORT ASSIGNMENTS:"
+
+    BATCH_CLASSIFICATION_PROMPT = """You classify a batch of patients that deterministic rules could not decide.
+
+Cohorts and the interventions each one offers:
+{cohorts}
+
+For every patient given to you, choose the single most appropriate cohort (or null) based on the
+patient's actual data and the rule evidence, and decide whether an intervention is needed.
+
+Respond with JSON only, in exactly this shape, with one decision per patient:
+{{"decisions": [{{"patient_id": <int>, "cohort": "<cohort name or null>", "needs_intervention": <true or false>,
+"intervention_type": "<one of that cohort's interventions, or null>", "rationale": "<at most 12 words>"}}]}}"""
+
+    @staticmethod
+    def get_patient_review_message(patients: list, evidence: list) -> str:
+        """Build the hand-off message for one fan-out patient batch."""
+        entries = [{"patient": patient, **facts} for patient, facts in zip(patients, evidence)]
+        return "Patients to review:\n" + "\n".join(json.dumps(entry, default=str) for entry in entries)
+
+    @staticmethod
+    def get_batch_classification_prompt(catalog) -> str:
+        """Build the batch classification instructions from the cohort catalog in effect."""
+        cohorts = "\n".join(
+            f"- {name}: {', '.join(option['type'] for option in catalog.available_interventions(name))}"
+            for name in catalog.names
+        )
+        return PromptTemplates.BATCH_CLASSIFICATION_PROMPT.format(cohorts=cohorts)
+
+    @staticmethod
+    def get_batch_classification_message(summaries: list) -> str:
+        """Build the request for one batch of patient summaries."""
+        return "Patients to classify:\n" + "\n".join(json.dumps(summary, default=str) for summary in summaries)
+
+    @staticmethod
+    def get_hybrid_review_prompt(handled: list, residual: list) -> str:
+        """Build the LLM hand-off message listing only the patients the rules could not decide."""
+        handled_text = "\n".join(f"- {line}" for line in handled) or "- None"
+        residual_text = "\n".join(json.dumps(entry, default=str) for entry in residual)
+        return PromptTemplates.HYBRID_REVIEW_PROMPT.format(handled=handled_text, residual=residual_text)
+
+    @staticmethod
+    def get_prefetched_context(results: list) -> str:
+        """Build the context block of prefetched (tool name, call ID, encoded result) triples."""
+        blocks = "\n\n".join(f"{name} (call {call_id}):\n{content}" for name, call_id, content in results)
+        return PromptTemplates.PREFETCHED_CONTEXT_PROMPT.format(results=blocks)
+
+    @staticmethod
+    def get_output_prompt(profile: str = "verbose") -> str:
+        """Output instructions appended to system messages for a prompt profile."""
+        if profile == "lean":
+            return PromptTemplates.LEAN_OUTPUT_PROMPT.format(codes=", ".join(PromptTemplates.RATIONALE_CODES))
+        return PromptTemplates.REASONING_PROMPT
+
+    @staticmethod
+    def get_planning_prompt(profile: str = "verbose") -> str:
+        """Planning instructions for a prompt profile."""
+        return PromptTemplates.LEAN_PLANNING_PROMPT if profile == "lean" else PromptTemplates.PLANNING_PROMPT
 
     @staticmethod
     def get_enhanced_system_message(base_prompt: str, reasoning_prompt: str = None) -> str:
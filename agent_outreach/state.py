@@ -1,13 +1,51 @@
+import operator
 from typing import TypedDict, List, Dict, Any, Optional
 from langgraph.graph.message import add_messages
 from langchain_core.messages import AnyMessage, HumanMessage, ToolMessage
 from typing_extensions import Annotated
 
+from .tools.cohort_bitmaps import merge_packed
+
+def merge_cohorts(left: Dict[str, bytes], right: Dict[str, bytes]) -> Dict[str, bytes]:
+    """Reducer OR-ing the packed cohort bitmaps written by parallel patient reviews."""
+    return merge_packed(left, right)
+
+def merge_dicts(left: Dict, right: Dict) -> Dict:
+    """Reducer merging dictionaries, later writes winning."""
+    return {**(left or {}), **(right or {})}
+
+def add_counts(left: Dict[str, int], right: Dict[str, int]) -> Dict[str, int]:
+    """Reducer summing per-key counters."""
+    merged = dict(left or {})
+    for key, count in (right or {}).items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
 class OutreachState(TypedDict, total=False):
     """State for the clinical outreach workflow"""
     # Graph messages
-    messages: Annotated[List[AnyMessage], add_messages]   
-    # cohort_info: 
-    cohorts: Dict[str, List[str]]
-    patient_to_cohort: Dict[str, str]
+    messages: Annotated[List[AnyMessage], add_messages]
+    # cohort_info: packed membership bitmaps over dense patient ordinals (tools/cohort_bitmaps.py)
+    cohorts: Annotated[Dict[str, bytes], merge_cohorts]
+    patient_to_cohort: Annotated[Dict[str, str], merge_dicts]
     cohort_criteria: Optional[str]
+    # Number of patients that took each path (rules fast path vs LLM review)
+    path_counts: Annotated[Dict[str, int], add_counts]
+    # Confirmations of reminders fired inside fan-out review subgraphs
+    reminders_sent: Annotated[List[str], operator.add]
+    # Incremental mode: run id, definitions version and staged per-patient results until commit
+    incremental_run: Dict[str, Any]
+    # Version of the cohort definitions the run is pinned to
+    cohort_definitions_version: str
+    # Rule evidence of the patients left for LLM review by pre-classification
+    review_queue: List[Dict[str, Any]]
+    # Batch mode: LLM calls, retries and patients per call
+    llm_batch_stats: Dict[str, Any]
+    # Calls, prompt/completion tokens and milliseconds spent in planning and reasoning LLM calls
+    llm_usage: Annotated[Dict[str, int], add_counts]
+    # Repeated tool calls answered with a reference (coalesced) or not executed again (duplicates_blocked)
+    tool_call_dedup: Annotated[Dict[str, int], add_counts]
+
+class PatientBatchState(TypedDict):
+    """Input for one fan-out patient review: the IDs of a small batch, loaded and triaged by the review itself"""
+    patient_ids: List[int]
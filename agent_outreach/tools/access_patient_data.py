@@ -1,6 +1,23 @@
 # tools/access_patient_data.py
 
-from .mock_data import PATIENTS
+import base64
+import json
+from datetime import date
+from typing import Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .intervention_rules import INTERVENE, NO_INTERVENTION, UNDETERMINED
+from .patient_repository import get_patient_repository
+from .result_encoding import compact_record
+from .triage import RULES_NO_ACTION, RULES_REMINDER, triage_patient
+
+# list_patients paging limits: records per page, encoded page size and records scanned per call
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+PAGE_MAX_CHARS = 8000
+MAX_SCAN = 10000
+INTERVENTION_STATUSES = (INTERVENE, NO_INTERVENTION, UNDETERMINED)
 
 def get_all_patients():
     """
@@ -10,12 +27,7 @@ def get_all_patients():
         list: Complete list of all patients with their medical information
     """
     print("\n🔍 GET_ALL_PATIENTS - Retrieving all patient data...")
-    print(f"📊 Found {len(PATIENTS)} patient(s) in database")
-    
-    for i, patient in enumerate(PATIENTS, 1):
-        print(f"   {i}. Patient {patient.get('patient_id', 'Unknown')}: {patient.get('name', 'Unknown Name')}")
-    
-    result = PATIENTS
+    result = get_patient_repository().all()
     print(f"✅ Returning {len(result)} patient records")
     return result
 
@@ -31,7 +43,7 @@ def get_patient_by_id(patient_id: int):
     """
     print(f"\n🔍 GET_PATIENT_BY_ID - Searching for Patient ID: {patient_id}")
     
-    result = next((p for p in PATIENTS if p["patient_id"] == patient_id), None)
+    result = get_patient_repository().get(patient_id)
     
     if result:
         print(f"✅ Found patient: {result.get('name', 'Unknown Name')}")
@@ -43,63 +55,79 @@ def get_patient_by_id(patient_id: int):
     
     return result
 
-def search_patients_by_supporting_facts(search_terms: list):
+def search_patients_by_supporting_facts(search_terms: list, match_all: bool = False):
     """
     Tool to search patients based on supporting facts/medical conditions.
     
+    Terms are matched case-insensitively as substrings of supporting facts, medications
+    and family history through the repository's inverted index, so the cost depends on
+    the number of matches rather than the panel size.
+    
     Args:
-        search_terms (list): List of terms to search for in supporting facts
+        search_terms (list): List of terms to search for
+        match_all (bool): Require every term instead of any of them
         
     Returns:
-        list: Patients whose supporting facts contain any of the search terms
+        list: Matching patients, best matches (most terms, whole-word hits) first
     """
-    print(f"\n🔍 SEARCH_PATIENTS_BY_SUPPORTING_FACTS - Searching for terms: {search_terms}")
+    mode = "all of" if match_all else "any of"
+    print(f"\n🔍 SEARCH_PATIENTS_BY_SUPPORTING_FACTS - Searching for {mode}: {search_terms}")
     
-    matching_patients = []
-    for patient in PATIENTS:
-        supporting_facts = patient.get("supporting_facts", [])
-        for term in search_terms:
-            if any(term.lower() in fact.lower() for fact in supporting_facts):
-                matching_patients.append(patient)
-                print(f"   ✅ Match found: Patient {patient.get('patient_id')} ({patient.get('name')}) - {supporting_facts}")
-                break
+    matches = get_patient_repository().search_facts(search_terms, match_all)
+    for patient, score in matches:
+        print(f"   ✅ Match found: Patient {patient.get('patient_id')} ({patient.get('name')}) - score {score:g}")
     
-    if not matching_patients:
+    if not matches:
         print("   ❌ No patients found matching the search terms")
     
-    print(f"📊 Total matches: {len(matching_patients)} patient(s)")
-    return matching_patients
+    print(f"📊 Total matches: {len(matches)} patient(s)")
+    return [patient for patient, _ in matches]
+
+class SearchPatientsInput(BaseModel):
+    """Input schema for facts search."""
+    search_terms: List[str] = Field(description="Terms to look for in supporting facts, medications and family history")
+    match_all: bool = Field(False, description="Require every term instead of any of them")
+
+def iter_patients_in_range(attribute: str, low: float = None, high: float = None, as_of: date = None,
+                           verbose: bool = False) -> Iterator[dict]:
+    """
+    Lazily stream patients whose numeric attribute lies in [low, high] from the sorted index.
+    
+    Args:
+        attribute: "age", "bmi", "hba1c", "fasting_glucose", "last_visit" or "days_since_last_visit"
+        low: Inclusive lower bound (optional)
+        high: Inclusive upper bound (optional)
+        as_of: Reference date for days_since_last_visit (defaults to today)
+        verbose: Print a line per matching patient
+        
+    Yields:
+        dict: Matching patients in ascending attribute order
+    """
+    for patient in get_patient_repository().find_in_range(attribute, low, high, as_of):
+        if verbose:
+            print(f"   ✅ Patient {patient.get('patient_id')} ({patient.get('name')}) matches {attribute} range")
+        yield patient
 
-def get_patients_by_age_range(min_age: int = None, max_age: int = None):
+def get_patients_by_age_range(min_age: int = None, max_age: int = None, verbose: bool = False):
     """
     Tool to filter patients by age range.
     
+    Answered by binary search on the repository's sorted age index, so the cost grows
+    with the number of matches rather than the panel. Patients without an age are
+    never returned.
+    
     Args:
         min_age (int, optional): Minimum age filter
         max_age (int, optional): Maximum age filter
+        verbose (bool): Print a line per matching patient
         
     Returns:
-        list: Patients within the specified age range
+        list: Patients within the specified age range, youngest first
     """
     age_filter = f"min_age={min_age}, max_age={max_age}"
     print(f"\n🔍 GET_PATIENTS_BY_AGE_RANGE - Filtering by age: {age_filter}")
     
-    filtered_patients = []
-    for patient in PATIENTS:
-        age = patient.get("age")
-        if age is None:
-            print(f"   ⚠️  Skipping Patient {patient.get('patient_id')} - no age data")
-            continue
-            
-        if min_age is not None and age < min_age:
-            print(f"   ❌ Patient {patient.get('patient_id')} (age {age}) below minimum age {min_age}")
-            continue
-        if max_age is not None and age > max_age:
-            print(f"   ❌ Patient {patient.get('patient_id')} (age {age}) above maximum age {max_age}")
-            continue
-            
-        filtered_patients.append(patient)
-        print(f"   ✅ Patient {patient.get('patient_id')} ({patient.get('name')}, age {age}) matches criteria")
+    filtered_patients = list(iter_patients_in_range("age", min_age, max_age, verbose=verbose))
     
     print(f"📊 Age filter results: {len(filtered_patients)} patient(s) match the criteria")
     return filtered_patients
@@ -116,7 +144,7 @@ def get_patient_contact_info(patient_id: int):
     """
     print(f"\n🔍 GET_PATIENT_CONTACT_INFO - Getting contact info for Patient ID: {patient_id}")
     
-    patient = get_patient_by_id(patient_id)
+    patient = get_patient_repository().get(patient_id)
     if patient:
         contact_info = {
             "patient_id": patient["patient_id"],
@@ -135,6 +163,12 @@ def get_patient_contact_info(patient_id: int):
         print(f"❌ Cannot get contact info - Patient ID {patient_id} not found")
         return None
 
+# Fields find_patient returns; everything the cohort and intervention criteria look at
+FIND_PATIENT_FIELDS = [
+    "patient_id", "name", "age", "supporting_facts", "last_hba1c", "fasting_glucose", "bmi",
+    "medications", "last_colonoscopy", "last_mammography", "family_history", "last_visit", "phone", "email"
+]
+
 # Additional helper function to find patients needing intervention
 def find_patient(patient_id: int):
     """
@@ -144,45 +178,113 @@ def find_patient(patient_id: int):
         patient_id (int): The unique identifier for the patient
         
     Returns:
-        str: Formatted patient information or error message
+        dict or str: Compact patient record (FIND_PATIENT_FIELDS, empty values omitted) or error message
     """
     print(f"\n🔍 FIND_PATIENT - Detailed lookup for Patient ID: {patient_id}")
     
-    patient = next((p for p in PATIENTS if p["patient_id"] == patient_id), None)
+    patient = get_patient_repository().get(patient_id)
     
     if not patient:
         error_msg = f"Patient with ID {patient_id} not found in database"
         print(f"❌ {error_msg}")
         return error_msg
     
-    # Format detailed patient information
-    patient_info = f"""
-Patient {patient['patient_id']}: {patient['name']}
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📋 Supporting Facts: {', '.join(patient.get('supporting_facts', []))}
-📅 Age: {patient.get('age', 'Unknown')}
-📞 Phone: {patient.get('phone', 'Not provided')}
-📧 Email: {patient.get('email', 'Not provided')}
-"""
-    
-    # Add condition-specific details
-    if 'diabetes' in str(patient.get('supporting_facts', [])).lower():
-        if 'last_hba1c' in patient:
-            patient_info += f"🩸 Last HbA1c: {patient['last_hba1c']}\n"
-        if 'fasting_glucose' in patient:
-            patient_info += f"🍯 Fasting Glucose: {patient['fasting_glucose']}\n"
-        if 'medications' in patient:
-            patient_info += f"💊 Medications: {', '.join(patient['medications'])}\n"
-    
-    if 'cancer' in str(patient.get('supporting_facts', [])).lower():
-        if 'last_colonoscopy' in patient:
-            patient_info += f"🔬 Last Colonoscopy: {patient['last_colonoscopy']}\n"
-        if 'family_history' in patient:
-            patient_info += f"👨‍👩‍👧‍👦 Family History: {', '.join(patient['family_history'])}\n"
-    
-    patient_info += f"🏥 Last Visit: {patient.get('last_visit', 'Unknown')}"
-    
-    print(f"✅ Patient found and detailed information compiled")
-    print(patient_info)
-    
-    return patient_info
\ No newline at end of file
+    record = compact_record(patient, FIND_PATIENT_FIELDS)
+    
+    print(f"✅ Patient found: {record['name']}")
+    for field, value in record.items():
+        print(f"   • {field}: {', '.join(value) if isinstance(value, list) else value}")
+    
+    return record
+
+
+class ListPatientsInput(BaseModel):
+    """Input schema for paging through patients."""
+    cursor: Optional[str] = Field(None, description="next_cursor from the previous page; omit for the first page")
+    cohort: Optional[str] = Field(None, description="Only patients suggested for this cohort, e.g. 'diabetic'")
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    intervention_status: Optional[str] = Field(
+        None, description="Only patients whose rules say 'intervene', 'no_intervention' or 'undetermined'"
+    )
+    fields: Optional[List[str]] = Field(None, description="Patient fields to return (defaults to FIND_PATIENT_FIELDS)")
+    limit: int = Field(DEFAULT_PAGE_SIZE, description=f"Patients per page (at most {MAX_PAGE_SIZE})")
+
+def _encode_cursor(after_id) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": after_id}).encode()).decode()
+
+def _decode_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))["after"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Invalid cursor '{cursor}'; pass next_cursor from a previous list_patients result")
+
+def _intervention_status(patient: dict, measurements: dict) -> str:
+    """Patient-level rule outcome: intervene, no_intervention or undetermined."""
+    path = triage_patient(patient, measurements).path
+    return {RULES_REMINDER: INTERVENE, RULES_NO_ACTION: NO_INTERVENTION}.get(path, UNDETERMINED)
+
+def list_patients(cursor: Optional[str] = None, cohort: Optional[str] = None, min_age: Optional[int] = None,
+                  max_age: Optional[int] = None, intervention_status: Optional[str] = None,
+                  fields: Optional[List[str]] = None, limit: int = DEFAULT_PAGE_SIZE) -> dict:
+    """
+    Tool to page through patients with server-side filters and field projection.
+    
+    Pages are ordered by patient ID and never exceed PAGE_MAX_CHARS once encoded, and a
+    single call scans at most MAX_SCAN records, so a page may hold fewer than `limit`
+    patients (even none) while next_cursor is still set. Keep paging until next_cursor is null.
+    
+    Args:
+        cursor (str, optional): next_cursor from the previous page
+        cohort (str, optional): Only patients suggested for this cohort
+        min_age (int, optional): Minimum age filter
+        max_age (int, optional): Maximum age filter
+        intervention_status (str, optional): "intervene", "no_intervention" or "undetermined"
+        fields (list, optional): Patient fields to return (defaults to FIND_PATIENT_FIELDS)
+        limit (int): Maximum patients per page (capped at MAX_PAGE_SIZE)
+        
+    Returns:
+        dict: {"patients": [...], "next_cursor": str or None, "scanned": int}
+    """
+    if intervention_status is not None and intervention_status not in INTERVENTION_STATUSES:
+        raise ValueError(f"intervention_status must be one of: {', '.join(INTERVENTION_STATUSES)}")
+    
+    repository = get_patient_repository()
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    fields = fields or FIND_PATIENT_FIELDS
+    
+    page, size, scanned = [], 0, 0
+    last_id, exhausted = _decode_cursor(cursor), True
+    for patient in repository.scan(last_id):
+        if len(page) >= limit or scanned >= MAX_SCAN:
+            exhausted = False
+            break
+        
+        patient_id = patient["patient_id"]
+        age = patient.get("age")
+        matches = (
+            (cohort is None or cohort in repository.get_cohorts(patient_id))
+            and (min_age is None or (age is not None and age >= min_age))
+            and (max_age is None or (age is not None and age <= max_age))
+            and (intervention_status is None
+                 or _intervention_status(patient, repository.get_measurements(patient_id)) == intervention_status)
+        )
+        
+        if matches:
+            record = compact_record(patient, fields)
+            record_size = len(json.dumps(record, separators=(",", ":"), default=str)) + 1
+            if page and size + record_size > PAGE_MAX_CHARS:
+                exhausted = False
+                break
+            page.append(record)
+            size += record_size
+        
+        scanned += 1
+        last_id = patient_id
+    
+    next_cursor = None if exhausted else _encode_cursor(last_id)
+    print(f"\n🔍 LIST_PATIENTS - {len(page)} patient(s) returned after scanning {scanned}"
+          f"{' (more available)' if next_cursor else ''}")
+    return {"patients": page, "next_cursor": next_cursor, "scanned": scanned}
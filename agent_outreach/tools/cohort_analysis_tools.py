@@ -1,11 +1,12 @@
 # tools/cohort_analysis_tools.py
 
-from .access_cohort_definitions import (
-    get_all_cohort_definitions, 
-    get_key_indicators, 
-    get_intervention_criteria
-)
+from .cohort_catalog import get_cohort_catalog
+from .cohort_matcher import get_cohort_matcher
+from .intervention_rules import UNDETERMINED, get_rule_engine
+from .lab_parsing import normalized_metrics
+from .result_memo import memoized
 
+@memoized("classify_patient_to_cohorts")
 def classify_patient_to_cohorts(patient_data: dict):
     """
     Tool to help LLM classify a patient into appropriate cohorts based on their data.
@@ -16,27 +17,16 @@ def classify_patient_to_cohorts(patient_data: dict):
     Returns:
         list: Suggested cohorts this patient might belong to (for LLM to validate)
     """
-    suggested_cohorts = []
-    supporting_facts = patient_data.get("supporting_facts", [])
-    all_cohorts = get_all_cohort_definitions()
-    
-    for cohort_name, cohort_info in all_cohorts.items():
-        key_indicators = cohort_info.get("key_indicators", [])
-        
-        # Check if any key indicators match supporting facts
-        for indicator in key_indicators:
-            for fact in supporting_facts:
-                if indicator.lower() in fact.lower():
-                    if cohort_name not in suggested_cohorts:
-                        suggested_cohorts.append(cohort_name)
-                    break
-    
-    return suggested_cohorts
+    return get_cohort_matcher().classify(patient_data)
 
+@memoized("analysis.analyze_intervention_need")
 def analyze_intervention_need(patient_data: dict, cohort_name: str):
     """
     Tool to help LLM analyze if a patient in a specific cohort needs intervention.
     
+    The deterministic rule engine decides clear-cut cases; only patients the rules
+    cannot decide are flagged for LLM evaluation.
+    
     Args:
         patient_data (dict): Patient information
         cohort_name (str): Name of the cohort to analyze for
@@ -44,15 +34,18 @@ def analyze_intervention_need(patient_data: dict, cohort_name: str):
     Returns:
         dict: Analysis results with criteria and recommendations
     """
-    criteria = get_intervention_criteria(cohort_name)
+    criteria = get_cohort_catalog().intervention_criteria(cohort_name)
+    rule_decision = get_rule_engine().evaluate(patient_data, cohort_name)
     analysis = {
         "cohort": cohort_name,
         "intervention_criteria": criteria,
         "patient_data_summary": {
             "supporting_facts": patient_data.get("supporting_facts", []),
-            "key_metrics": {}
+            "key_metrics": {},
+            "normalized_metrics": normalized_metrics(patient_data)
         },
-        "llm_should_evaluate": True
+        "rule_decision": rule_decision._asdict(),
+        "llm_should_evaluate": rule_decision.decision == UNDETERMINED
     }
     
     # Add relevant metrics based on cohort type
@@ -93,9 +86,8 @@ def match_patient_to_interventions(patient_data: dict, cohort_name: str, analysi
     Returns:
         dict: Recommended interventions with reasoning
     """
-    from .access_cohort_definitions import get_available_interventions
-    
-    available_interventions = get_available_interventions(cohort_name)
+    catalog = get_cohort_catalog()
+    available_interventions = catalog.available_interventions(cohort_name)
     recommendations = {
         "cohort": cohort_name,
         "patient_id": patient_data.get("patient_id"),
@@ -105,15 +97,27 @@ def match_patient_to_interventions(patient_data: dict, cohort_name: str, analysi
         "reasoning": []
     }
     
-    # LLM should use this data to make intelligent intervention decisions
-    # This is a helper tool that structures the data for LLM analysis
-    
     recommendations["available_options"] = available_interventions
     recommendations["analysis_summary"] = analysis_results
-    recommendations["llm_should_decide"] = True
+    
+    # Use the rule engine's decision when it could make one; otherwise leave it to the LLM
+    rule_decision = (analysis_results or {}).get("rule_decision")
+    if rule_decision is None:
+        rule_decision = get_rule_engine().evaluate(patient_data, cohort_name)._asdict()
+    
+    if rule_decision["decision"] == UNDETERMINED:
+        recommendations["llm_should_decide"] = True
+        return recommendations
+    
+    recommendations["needs_intervention"] = bool(rule_decision["matched_criteria"])
+    recommended = catalog.intervention(cohort_name, rule_decision["recommended_intervention"])
+    recommendations["recommended_interventions"] = [recommended] if recommended else []
+    recommendations["reasoning"] = rule_decision["matched_criteria"]
+    recommendations["llm_should_decide"] = False
     
     return recommendations
 
+@memoized("evaluate_cohort_membership")
 def evaluate_cohort_membership(patient_data: dict, cohort_name: str):
     """
     Tool to help LLM evaluate if a patient truly belongs to a specific cohort.
@@ -125,10 +129,9 @@ def evaluate_cohort_membership(patient_data: dict, cohort_name: str):
     Returns:
         dict: Evaluation framework for LLM decision-making
     """
-    from .access_cohort_definitions import get_classification_criteria, get_key_indicators
-    
-    classification_criteria = get_classification_criteria(cohort_name)
-    key_indicators = get_key_indicators(cohort_name)
+    catalog = get_cohort_catalog()
+    classification_criteria = catalog.classification_criteria(cohort_name)
+    key_indicators = catalog.key_indicators(cohort_name)
     
     evaluation = {
         "cohort": cohort_name,
@@ -143,7 +146,8 @@ def evaluate_cohort_membership(patient_data: dict, cohort_name: str):
                 "hba1c": patient_data.get("last_hba1c"),
                 "glucose": patient_data.get("fasting_glucose"),
                 "blood_pressure": patient_data.get("blood_pressure")
-            }
+            },
+            "normalized_metrics": normalized_metrics(patient_data)
         },
         "llm_evaluation_needed": True,
         "membership_confidence": None  # LLM should set this
@@ -158,18 +162,4 @@ def generate_cohort_summary():
     Returns:
         dict: Summary of all cohorts with key information
     """
-    all_cohorts = get_all_cohort_definitions()
-    summary = {
-        "total_cohorts": len(all_cohorts),
-        "cohort_overview": {}
-    }
-    
-    for cohort_name, cohort_info in all_cohorts.items():
-        summary["cohort_overview"][cohort_name] = {
-            "name": cohort_info.get("name"),
-            "description": cohort_info.get("description"),
-            "key_indicators": cohort_info.get("key_indicators", [])[:3],  # First 3 indicators
-            "intervention_count": len(cohort_info.get("available_interventions", []))
-        }
-    
-    return summary
\ No newline at end of file
+    return get_cohort_catalog().summary
@@ -0,0 +1,334 @@
+# tools/cohort_bitmaps.py
+
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .cohort_catalog import get_cohort_catalog
+from .fire_reminder import get_contact_log, get_contact_log_version, get_contacts_since
+from .patient_repository import get_patient_repository
+from .patient_store import ColumnarPatientStore
+
+# Set bits per byte value, for cardinality without unpacking
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+
+CONTACTED_FLAG = "contacted_in_{days}_days"
+# State key prefix of a bitmap whose members are cleared from the named bitmap before unions
+REMOVE_PREFIX = "-"
+
+
+class PatientOrdinals:
+    """Dense, append-only ordinal per patient ID, so bitmaps stay comparable across builds."""
+
+    def __init__(self):
+        self._ordinal_of: Dict[int, int] = {}
+        self._ids: List[int] = []
+
+    def ordinal(self, patient_id: int) -> int:
+        """Ordinal of a patient, assigning the next free one on first sight."""
+        ordinal = self._ordinal_of.get(patient_id)
+        if ordinal is None:
+            ordinal = self._ordinal_of[patient_id] = len(self._ids)
+            self._ids.append(patient_id)
+        return ordinal
+
+    def patient_ids(self, ordinals: Iterable[int]) -> List[int]:
+        return [self._ids[ordinal] for ordinal in ordinals]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class Bitmap:
+    """
+    Packed bit array over patient ordinals (one bit per patient).
+
+    & | and - (AND NOT) work on bitmaps of different lengths by zero-padding,
+    and cardinality is a popcount over the packed bytes.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: np.ndarray = None):
+        self.bits = bits if bits is not None else np.zeros(0, dtype=np.uint8)
+
+    @classmethod
+    def from_ordinals(cls, ordinals: Iterable[int]) -> "Bitmap":
+        ordinals = np.fromiter(ordinals, dtype=np.int64)
+        if not len(ordinals):
+            return cls()
+        mask = np.zeros(int(ordinals.max()) + 1, dtype=bool)
+        mask[ordinals] = True
+        return cls(np.packbits(mask))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Bitmap":
+        return cls(np.frombuffer(data, dtype=np.uint8).copy())
+
+    def to_bytes(self) -> bytes:
+        return self.bits.tobytes()
+
+    def ordinals(self) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(self.bits))
+
+    def cardinality(self) -> int:
+        return int(_POPCOUNT[self.bits].sum())
+
+    def _aligned(self, other: "Bitmap"):
+        size = max(len(self.bits), len(other.bits))
+        return (np.pad(self.bits, (0, size - len(self.bits))),
+                np.pad(other.bits, (0, size - len(other.bits))))
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        left, right = self._aligned(other)
+        return Bitmap(left & right)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        left, right = self._aligned(other)
+        return Bitmap(left | right)
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        left, right = self._aligned(other)
+        return Bitmap(left & ~right)
+
+    def __len__(self) -> int:
+        return self.cardinality()
+
+
+def merge_packed(left: Dict[str, bytes], right: Dict[str, bytes]) -> Dict[str, bytes]:
+    """
+    Union packed bitmaps by name (state reducer helper).
+
+    A "-<name>" entry in right is a removal mask: its members are cleared from
+    <name> first, so an update can move patients out of a bitmap it does not own.
+    """
+    merged = dict(left or {})
+    for key, data in (right or {}).items():
+        name = key[len(REMOVE_PREFIX):]
+        if key.startswith(REMOVE_PREFIX) and name in merged:
+            merged[name] = (Bitmap.from_bytes(merged[name]) - Bitmap.from_bytes(data)).to_bytes()
+    for name, data in (right or {}).items():
+        if name.startswith(REMOVE_PREFIX):
+            continue
+        if name in merged:
+            data = (Bitmap.from_bytes(merged[name]) | Bitmap.from_bytes(data)).to_bytes()
+        merged[name] = data
+    return merged
+
+
+_TOKEN = re.compile(r"\s*(\(|\)|[A-Za-z0-9_:.\-]+)")
+
+
+class CohortBitmapIndex:
+    """
+    Bitmap membership index per cohort and per intervention flag.
+
+    Named bitmaps:
+        <cohort>                          suggested cohort members
+        <cohort>:needs_intervention       members whose rules say intervene
+        <cohort>:undetermined             members the rules cannot decide
+        needs_intervention / undetermined the same across all cohorts
+        contacted_in_<N>_days             patients reminded within the contact window
+
+    Queries combine names with AND, OR, ANDNOT, NOT and parentheses, e.g.
+    "diabetic AND NOT contacted_in_30_days".
+
+    Args:
+        ordinals: Ordinal mapping the bitmaps are keyed by
+        bitmaps: Named bitmaps
+        universe: Bitmap of every indexed patient (for NOT)
+    """
+
+    def __init__(self, ordinals: PatientOrdinals, bitmaps: Dict[str, Bitmap], universe: Bitmap):
+        self.ordinals = ordinals
+        self.bitmaps = bitmaps
+        self.universe = universe
+        # When the earliest flagged contact leaves the contact window (None if nobody is flagged)
+        self.contacts_expire_at: Optional[datetime] = None
+
+    @classmethod
+    def build(cls, repository, ordinals: PatientOrdinals = None, contact_log: Dict[int, datetime] = None,
+              contact_window_days: int = 30, as_of: datetime = None) -> "CohortBitmapIndex":
+        """
+        Build the index from a repository with the vectorized cohort/rule masks.
+
+        Args:
+            repository: PatientRepository to index
+            ordinals: Shared ordinal mapping (a new one if omitted)
+            contact_log: Patient ID to time of last reminder
+            contact_window_days: Window for the contacted flag
+            as_of: Reference time (defaults to now)
+        """
+        ordinals = ordinals or PatientOrdinals()
+        as_of = as_of or datetime.now()
+        store = ColumnarPatientStore.from_repository(repository, as_of=as_of.date())
+        row_ordinals = np.array([ordinals.ordinal(int(pid)) for pid in store.patient_ids], dtype=np.int64)
+
+        def from_mask(mask: np.ndarray) -> Bitmap:
+            return Bitmap.from_ordinals(row_ordinals[mask])
+
+        bitmaps = {}
+        any_intervention, any_undetermined = Bitmap(), Bitmap()
+        for cohort_name in store.cohort_definitions:
+            bitmaps[cohort_name] = from_mask(store.cohort_mask(cohort_name))
+            bitmaps[f"{cohort_name}:needs_intervention"] = from_mask(store.intervention_mask(cohort_name))
+            bitmaps[f"{cohort_name}:undetermined"] = from_mask(store.undetermined_mask(cohort_name))
+            any_intervention |= bitmaps[f"{cohort_name}:needs_intervention"]
+            any_undetermined |= bitmaps[f"{cohort_name}:undetermined"]
+        bitmaps["needs_intervention"] = any_intervention
+        bitmaps["undetermined"] = any_undetermined
+
+        index = cls(ordinals, bitmaps, Bitmap.from_ordinals(row_ordinals))
+        index.apply_contacts(repository, contact_log or {}, contact_window_days, as_of, replace=True)
+        return index
+
+    def apply_contacts(self, repository, contacts: Dict[int, datetime], contact_window_days: int = 30,
+                       as_of: datetime = None, replace: bool = False) -> None:
+        """
+        Set the contacted flag for contacts within the window, leaving every other bitmap as built.
+
+        Args:
+            repository: PatientRepository the index was built from
+            contacts: Patient ID to time of contact
+            contact_window_days: Window for the contacted flag
+            as_of: Reference time (defaults to now)
+            replace: Rebuild the flag from these contacts instead of adding them
+        """
+        window = timedelta(days=contact_window_days)
+        cutoff = (as_of or datetime.now()) - window
+        name = CONTACTED_FLAG.format(days=contact_window_days)
+        in_window = {
+            patient_id: contacted_at for patient_id, contacted_at in contacts.items()
+            if contacted_at >= cutoff and repository.get(patient_id) is not None
+        }
+        contacted = Bitmap.from_ordinals(self.ordinals.ordinal(patient_id) for patient_id in in_window)
+        # A new Bitmap, so results already handed out keep their snapshot
+        self.bitmaps[name] = contacted if replace else self.bitmaps.get(name, Bitmap()) | contacted
+
+        expiries = [contacted_at + window for contacted_at in in_window.values()]
+        if not replace and self.contacts_expire_at is not None:
+            expiries.append(self.contacts_expire_at)
+        self.contacts_expire_at = min(expiries) if expiries else None
+
+    def query(self, expression: str) -> Bitmap:
+        """
+        Evaluate a set-algebra expression over the named bitmaps.
+
+        Raises:
+            ValueError: On unknown names or malformed expressions
+        """
+        return _QueryParser(expression, self.bitmaps, self.universe).parse()
+
+    def count(self, expression: str) -> int:
+        return self.query(expression).cardinality()
+
+    def patient_ids(self, bitmap: Bitmap) -> List[int]:
+        return self.ordinals.patient_ids(bitmap.ordinals())
+
+    def to_state(self, names: Optional[Iterable[str]] = None) -> Dict[str, bytes]:
+        """Packed bitmaps for the workflow state."""
+        return {name: self.bitmaps[name].to_bytes() for name in (names or self.bitmaps)}
+
+
+class _QueryParser:
+    """Recursive descent: or := and (OR and)* ; and := not ((AND|ANDNOT) not)* ; not := NOT not | atom"""
+
+    def __init__(self, expression: str, bitmaps: Dict[str, Bitmap], universe: Bitmap):
+        self.expression = expression
+        self.tokens = _TOKEN.findall(expression)
+        if "".join(self.tokens) != re.sub(r"\s+", "", expression):
+            raise ValueError(f"Cannot parse cohort query '{expression}'")
+        self.position = 0
+        self.bitmaps = bitmaps
+        self.universe = universe
+
+    def parse(self) -> Bitmap:
+        result = self._parse_or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected '{self.tokens[self.position]}' in cohort query '{self.expression}'")
+        return result
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position].upper() if self.position < len(self.tokens) else None
+
+    def _next(self) -> str:
+        if self.position >= len(self.tokens):
+            raise ValueError(f"Cohort query '{self.expression}' ended unexpectedly")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _parse_or(self) -> Bitmap:
+        result = self._parse_and()
+        while self._peek() == "OR":
+            self._next()
+            result = result | self._parse_and()
+        return result
+
+    def _parse_and(self) -> Bitmap:
+        result = self._parse_not()
+        while self._peek() in ("AND", "ANDNOT"):
+            operator = self._next().upper()
+            operand = self._parse_not()
+            result = result - operand if operator == "ANDNOT" else result & operand
+        return result
+
+    def _parse_not(self) -> Bitmap:
+        if self._peek() == "NOT":
+            self._next()
+            return self.universe - self._parse_not()
+        token = self._next()
+        if token == "(":
+            result = self._parse_or()
+            if self._next() != ")":
+                raise ValueError(f"Missing ')' in cohort query '{self.expression}'")
+            return result
+        if token not in self.bitmaps:
+            raise ValueError(f"Unknown cohort or flag '{token}'. Available: {', '.join(self.bitmaps)}")
+        return self.bitmaps[token]
+
+
+_ordinals = PatientOrdinals()
+_index: Optional[CohortBitmapIndex] = None
+_index_key = None
+_index_contact_version = 0
+_index_lock = threading.Lock()
+
+def get_patient_ordinals() -> PatientOrdinals:
+    """Get the process-wide ordinal mapping shared by all bitmaps in workflow state."""
+    return _ordinals
+
+def get_cohort_bitmap_index(contact_window_days: int = 30, as_of: datetime = None) -> CohortBitmapIndex:
+    """
+    Get the bitmap index for the current repository, rebuilding it only when the
+    repository, its contents, the cohort catalog or the date (the days-since
+    rules) changed. New contacts only update the contacted flag, which is
+    recomputed from the contact log once a flagged contact leaves the window.
+
+    Args:
+        contact_window_days: Window for the contacted flag
+        as_of: Reference time (defaults to now)
+    """
+    global _index, _index_key, _index_contact_version
+    repository = get_patient_repository()
+    now = as_of or datetime.now()
+    key = (id(repository), repository.version, get_cohort_catalog().version, contact_window_days, now.date())
+    with _index_lock:
+        # Read before the contacts, so one recorded in between is applied again next time (setting a bit is idempotent)
+        contact_version = get_contact_log_version()
+        if _index is None or key != _index_key:
+            _index = CohortBitmapIndex.build(repository, _ordinals, get_contact_log(), contact_window_days, now)
+            _index_key = key
+        elif contact_version != _index_contact_version:
+            contacts = get_contacts_since(_index_contact_version)
+            if contacts is None:
+                _index.apply_contacts(repository, get_contact_log(), contact_window_days, now, replace=True)
+            else:
+                _index.apply_contacts(repository, contacts, contact_window_days, now)
+        if _index.contacts_expire_at is not None and now > _index.contacts_expire_at:
+            _index.apply_contacts(repository, get_contact_log(), contact_window_days, now, replace=True)
+        _index_contact_version = contact_version
+        return _index
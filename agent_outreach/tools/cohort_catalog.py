@@ -0,0 +1,178 @@
+# tools/cohort_catalog.py
+
+import contextlib
+import sys
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, FrozenSet, Iterator, Optional, Tuple
+
+from .cohort_definitions import COHORT_DEFINITIONS
+from .content_hash import stable_hash
+from .result_encoding import ResultEncoder
+
+
+class FrozenDict(dict):
+    """Read-only dict, so cached catalog views can be handed to every caller."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Cohort catalog views are read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value):
+    """Recursively convert dicts to FrozenDicts and lists to tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class CohortCatalog:
+    """
+    Immutable, precompiled view of a set of cohort definitions.
+
+    Everything the cohort tools return is derived once when the catalog is
+    built: frozen definitions, the cohort summary, lowercased indicator sets,
+    interventions by type and the JSON tool-result payloads, so tools hand out
+    cached views instead of rebuilding dicts per call. Compiled structures (the
+    indicator matcher, the rule engine) are cached on the catalog too, so a
+    catalog and everything derived from it are swapped in as one value. A
+    change of definitions means building a new catalog (with a new version)
+    and swapping it in with set_cohort_catalog().
+
+    Args:
+        cohort_definitions: Cohort definitions keyed by cohort name
+        source: Where the definitions came from (file path or "builtin")
+    """
+
+    def __init__(self, cohort_definitions: Dict[str, dict], source: str = "builtin"):
+        self.definitions: FrozenDict = freeze(cohort_definitions)
+        self.version: str = stable_hash(self.definitions)[:16]
+        self.names: Tuple[str, ...] = tuple(self.definitions)
+        self.source = source
+        self._compiled: Dict[str, Any] = {}
+
+        self.indicator_sets: Dict[str, FrozenSet[str]] = {
+            name: frozenset(indicator.lower() for indicator in cohort.get("key_indicators", ()))
+            for name, cohort in self.definitions.items()
+        }
+        self._interventions: Dict[str, Dict[str, FrozenDict]] = {}
+        for name, cohort in self.definitions.items():
+            by_type = self._interventions[name] = {}
+            for option in cohort.get("available_interventions", ()):
+                by_type.setdefault(option.get("type"), option)
+        self.summary: FrozenDict = freeze({
+            "total_cohorts": len(self.definitions),
+            "cohort_overview": {
+                name: {
+                    "name": cohort.get("name"),
+                    "description": cohort.get("description"),
+                    "key_indicators": cohort.get("key_indicators", ())[:3],  # First 3 indicators
+                    "intervention_count": len(cohort.get("available_interventions", ()))
+                }
+                for name, cohort in self.definitions.items()
+            }
+        })
+
+        # Tool results as the LLM sees them, rendered once with the default JSON encoding
+        encoder = ResultEncoder("json", max_chars=sys.maxsize)
+        for view in (self.definitions, self.summary, *self.definitions.values()):
+            view.rendered_json = encoder.encode(view)
+
+    def get(self, cohort_name: str) -> Optional[FrozenDict]:
+        """Definition of a cohort, or None if unknown."""
+        return self.definitions.get(cohort_name)
+
+    def field(self, cohort_name: str, field: str) -> tuple:
+        """A list-valued field of a cohort (empty for unknown cohorts)."""
+        cohort = self.definitions.get(cohort_name)
+        return cohort.get(field, ()) if cohort else ()
+
+    def classification_criteria(self, cohort_name: str) -> tuple:
+        return self.field(cohort_name, "classification_criteria")
+
+    def intervention_criteria(self, cohort_name: str) -> tuple:
+        return self.field(cohort_name, "intervention_criteria")
+
+    def available_interventions(self, cohort_name: str) -> tuple:
+        return self.field(cohort_name, "available_interventions")
+
+    def key_indicators(self, cohort_name: str) -> tuple:
+        return self.field(cohort_name, "key_indicators")
+
+    def intervention(self, cohort_name: str, intervention_type: str) -> Optional[FrozenDict]:
+        """An available intervention of a cohort by its type, or None."""
+        return self._interventions.get(cohort_name, {}).get(intervention_type)
+
+    def compiled(self, name: str, build: Callable[[Dict[str, dict]], Any]) -> Any:
+        """
+        A structure compiled from this catalog's definitions, built once per catalog.
+
+        Args:
+            name: Cache key (e.g. "matcher")
+            build: Compiler called with the frozen definitions on first use
+        """
+        structure = self._compiled.get(name)
+        if structure is None:
+            structure = self._compiled[name] = build(self.definitions)
+        return structure
+
+    def __contains__(self, cohort_name: str) -> bool:
+        return cohort_name in self.definitions
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+
+_catalog: Optional[CohortCatalog] = None
+# Catalog pinned by a running workflow; copied into the threads and tasks it spawns
+_pinned: ContextVar[Optional[CohortCatalog]] = ContextVar("pinned_cohort_catalog", default=None)
+
+def get_cohort_catalog() -> CohortCatalog:
+    """
+    Get the cohort catalog in effect: the one pinned by the current workflow run,
+    otherwise the active one. The active catalog is loaded on first use from the
+    file at COHORT_DEFINITIONS_PATH, or built from COHORT_DEFINITIONS without it.
+    """
+    pinned = _pinned.get()
+    return pinned if pinned is not None else get_active_cohort_catalog()
+
+def get_active_cohort_catalog() -> CohortCatalog:
+    """Get the active catalog, ignoring any pin (the one new runs start with)."""
+    global _catalog
+    if _catalog is None:
+        from .cohort_source import get_cohort_source
+
+        source = get_cohort_source()
+        _catalog = source.load() if source else CohortCatalog(COHORT_DEFINITIONS)
+    return _catalog
+
+def set_cohort_catalog(catalog: CohortCatalog) -> None:
+    """Swap in a new active catalog; compiled matchers, rule engines and memoized results follow its version."""
+    global _catalog
+    _catalog = catalog
+
+@contextlib.contextmanager
+def pinned_cohort_catalog(catalog: CohortCatalog = None) -> Iterator[CohortCatalog]:
+    """
+    Pin a catalog (the active one by default) for the current context, so a
+    workflow run keeps the definitions it started with while the active
+    catalog is reloaded underneath it.
+    """
+    catalog = catalog or get_cohort_catalog()
+    token = _pinned.set(catalog)
+    try:
+        yield catalog
+    finally:
+        _pinned.reset(token)
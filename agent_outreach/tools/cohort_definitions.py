@@ -4,6 +4,8 @@ COHORT_DEFINITIONS = {
     "diabetic": {
         "name": "Diabetic Management",
         "description": "Patients with diabetes requiring ongoing management and monitoring",
+        # Lower is more urgent: picks the reminder when several cohorts' rules call for one
+        "priority": 1,
         "classification_criteria": [
             "Supporting facts include any form of diabetes (Type 1, Type 2, etc.)",
             "HbA1c levels documented in patient data",
@@ -18,6 +20,27 @@ COHORT_DEFINITIONS = {
             "Poor glucose monitoring compliance",
             "Recent complications or concerning symptoms"
         ],
+        "intervention_rules": [
+            {
+                "criterion": "HbA1c > 7.0% indicates need for better glucose control",
+                "conditions": [{"metric": "hba1c", "op": ">", "value": 7.0}],
+                "intervention": "routine_followup"
+            },
+            {
+                "criterion": "Fasting glucose > 130 mg/dL suggests intervention needed",
+                "conditions": [{"metric": "fasting_glucose", "op": ">", "value": 130}],
+                "intervention": "glucose_monitoring"
+            },
+            {
+                "criterion": "Poor medication adherence or missed refills",
+                "conditions": [{"metric": "facts", "op": "contains_any", "value": ["poor adherence", "missed refill", "non-adherent"]}],
+                "intervention": "medication_adherence"
+            }
+        ],
+        "decisive_metrics": ["hba1c", "fasting_glucose"],
+        "thresholds": {
+            "classification_fasting_glucose": 126
+        },
         "key_indicators": [
             "diabetes", "diabetic", "hba1c", "insulin", "metformin", 
             "glucose", "blood sugar", "diabetic retinopathy"
@@ -49,6 +72,7 @@ COHORT_DEFINITIONS = {
     "obesity": {
         "name": "Obesity Management", 
         "description": "Patients with BMI ≥30 requiring weight management support",
+        "priority": 3,
         "classification_criteria": [
             "BMI ≥30 or supporting facts explicitly mention obesity",
             "Weight-related health conditions (sleep apnea, metabolic syndrome)",
@@ -62,6 +86,30 @@ COHORT_DEFINITIONS = {
             "Poor dietary habits or sedentary lifestyle",
             "Weight gain trend or lack of progress"
         ],
+        "intervention_rules": [
+            {
+                "criterion": "BMI ≥35 (severe obesity) requires immediate intervention",
+                "conditions": [{"metric": "bmi", "op": ">=", "value": 35}],
+                "intervention": "weight_management"
+            },
+            {
+                "criterion": "Weight-related complications (sleep apnea, joint pain)",
+                "conditions": [{"metric": "facts", "op": "contains_any", "value": ["sleep apnea", "joint pain"]}],
+                "intervention": "weight_management"
+            },
+            {
+                "criterion": "No active weight management program in place",
+                "conditions": [
+                    {"metric": "bmi", "op": ">=", "value": 30},
+                    {"metric": "facts", "op": "not_contains_any", "value": ["weight management", "exercise program", "dietitian", "nutrition"]}
+                ],
+                "intervention": "nutrition_counseling"
+            }
+        ],
+        "decisive_metrics": ["bmi"],
+        "thresholds": {
+            "classification_bmi": 30
+        },
         "key_indicators": [
             "obesity", "obese", "bmi", "overweight", "weight management",
             "sleep apnea", "metabolic syndrome", "weight loss"
@@ -93,6 +141,7 @@ COHORT_DEFINITIONS = {
     "cancer_screening": {
         "name": "Cancer Screening",
         "description": "Patients due for preventive cancer screening",
+        "priority": 2,
         "classification_criteria": [
             "Age-appropriate for cancer screening (varies by screening type)",
             "Family history of cancer",
@@ -106,6 +155,33 @@ COHORT_DEFINITIONS = {
             "Concerning symptoms requiring follow-up",
             "Previous abnormal results requiring monitoring"
         ],
+        "intervention_rules": [
+            {
+                "criterion": "Overdue for age-appropriate screening (>1 year past due)",
+                "conditions": [
+                    {"metric": "age", "op": ">=", "value": 45},
+                    {"metric": "days_since_last_screening", "op": ">", "value": 365}
+                ],
+                "intervention": "overdue_screening"
+            },
+            {
+                "criterion": "High-risk family history without recent screening",
+                "conditions": [
+                    {"metric": "family_history_count", "op": ">", "value": 0},
+                    {"metric": "days_since_last_screening", "op": ">", "value": 365}
+                ],
+                "intervention": "high_risk_counseling"
+            },
+            {
+                "criterion": "Never had baseline screening at appropriate age",
+                "conditions": [
+                    {"metric": "age", "op": ">=", "value": 45},
+                    {"metric": "days_since_last_screening", "op": "missing"}
+                ],
+                "intervention": "screening_reminder"
+            }
+        ],
+        "decisive_metrics": ["age"],
         "key_indicators": [
             "screening", "cancer", "family history", "overdue", "colonoscopy", 
             "mammography", "pap smear", "risk factors"
@@ -134,31 +210,3 @@ COHORT_DEFINITIONS = {
         ]
     }
 }
-
-# Helper functions for LLM to use
-def get_cohort_definitions():
-    """Get cohort definitions with classification criteria and interventions."""
-    return COHORT_DEFINITIONS
-
-def get_cohort_by_name(cohort_name):
-    """Get specific cohort definition by name."""
-    return COHORT_DEFINITIONS.get(cohort_name)
-
-def get_all_cohort_names():
-    """Get list of all available cohort names."""
-    return list(COHORT_DEFINITIONS.keys())
-
-def get_classification_criteria(cohort_name):
-    """Get classification criteria for a specific cohort."""
-    cohort = COHORT_DEFINITIONS.get(cohort_name)
-    return cohort.get("classification_criteria", []) if cohort else []
-
-def get_intervention_criteria(cohort_name):
-    """Get intervention criteria for a specific cohort."""
-    cohort = COHORT_DEFINITIONS.get(cohort_name)
-    return cohort.get("intervention_criteria", []) if cohort else []
-
-def get_available_interventions(cohort_name):
-    """Get available interventions for a specific cohort."""
-    cohort = COHORT_DEFINITIONS.get(cohort_name)
-    return cohort.get("available_interventions", []) if cohort else []
\ No newline at end of file
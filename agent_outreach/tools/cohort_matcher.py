@@ -0,0 +1,129 @@
+# tools/cohort_matcher.py
+
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+from .cohort_catalog import get_cohort_catalog
+
+# Facts are joined with a separator no indicator contains, so matches never span facts
+_FACT_SEPARATOR = "\n"
+
+
+class CohortMatcher:
+    """
+    Aho-Corasick automaton compiled from every cohort's key indicators.
+
+    A single pass over a patient's lowercased supporting facts reports every
+    indicator occurrence (including overlapping ones) together with the
+    cohort(s) it belongs to, replacing the cohorts x indicators x facts loop.
+
+    Args:
+        cohort_definitions: Cohort definitions keyed by cohort name
+    """
+
+    def __init__(self, cohort_definitions: Dict[str, dict]):
+        self.cohort_names = list(cohort_definitions)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[Tuple[str, str], ...]] = [()]
+
+        for cohort_name, cohort_info in cohort_definitions.items():
+            for indicator in cohort_info.get("key_indicators", []):
+                self._add_pattern(indicator.lower(), cohort_name)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, cohort_name: str) -> None:
+        """Insert one indicator into the trie."""
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = next_node
+        if (cohort_name, pattern) not in self._output[node]:
+            self._output[node] += ((cohort_name, pattern),)
+
+    def _build_failure_links(self) -> None:
+        """Breadth-first pass computing failure links and merged outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def find_indicators(self, facts: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Find every key indicator mentioned in the given facts.
+
+        Args:
+            facts: Free-text facts (e.g. a patient's supporting_facts)
+
+        Returns:
+            dict: Matched indicators keyed by cohort name, in first-match order
+        """
+        text = _FACT_SEPARATOR.join(str(fact) for fact in facts).lower()
+        matches: Dict[str, List[str]] = {}
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for cohort_name, indicator in output[node]:
+                found = matches.setdefault(cohort_name, [])
+                if indicator not in found:
+                    found.append(indicator)
+        return matches
+
+    def classify(self, patient_data: dict) -> List[str]:
+        """
+        Suggest cohorts for a patient from their supporting facts.
+
+        Args:
+            patient_data: Patient dictionary with supporting_facts
+
+        Returns:
+            list: Matching cohort names in cohort definition order
+        """
+        matches = self.find_indicators(patient_data.get("supporting_facts", []))
+        return [name for name in self.cohort_names if name in matches]
+
+    def classify_many(self, patients: Iterable[dict]) -> Dict[int, List[str]]:
+        """
+        Suggest cohorts for a whole panel in one sweep, e.g. for nightly runs.
+
+        Args:
+            patients: Patient dictionaries with patient_id and supporting_facts
+
+        Returns:
+            dict: Suggested cohort names keyed by patient ID
+        """
+        return {patient["patient_id"]: self.classify(patient) for patient in patients}
+
+
+def get_cohort_matcher() -> CohortMatcher:
+    """Get the matcher compiled from the cohort catalog in effect (compiled once per catalog)."""
+    return get_cohort_catalog().compiled("matcher", CohortMatcher)
+
+def classify_many(patients: Iterable[dict]) -> Dict[int, List[str]]:
+    """
+    Bulk entry point classifying every patient against all cohorts.
+
+    Args:
+        patients: Patient dictionaries with patient_id and supporting_facts
+
+    Returns:
+        dict: Suggested cohort names keyed by patient ID
+    """
+    return get_cohort_matcher().classify_many(patients)
@@ -0,0 +1,230 @@
+# tools/cohort_source.py
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from .cohort_catalog import CohortCatalog, get_active_cohort_catalog, set_cohort_catalog
+from .cohort_matcher import CohortMatcher
+from .intervention_rules import METRICS, TEXT_OPS, InterventionRuleEngine
+from .patient_repository import get_patient_repository
+
+try:
+    import yaml
+except ImportError:  # YAML definition files are optional
+    yaml = None
+
+_LIST_FIELDS = (
+    "classification_criteria", "intervention_criteria", "intervention_rules",
+    "decisive_metrics", "key_indicators", "available_interventions"
+)
+_RULE_OPS = (">", ">=", "<", "<=", "==", "missing") + TEXT_OPS
+
+
+def load_definitions_file(path: str) -> Dict[str, dict]:
+    """
+    Parse a cohort definitions file (.json, or .yaml/.yml when PyYAML is installed).
+
+    Raises:
+        ValueError: On unsupported extensions or unparseable content
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8") as handle:
+        text = handle.read()
+    if extension == ".json":
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in {path}: {e}") from e
+    if extension in (".yaml", ".yml"):
+        if yaml is None:
+            raise ValueError(f"Cannot load {path}: install PyYAML to use YAML cohort definitions")
+        try:
+            return yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in {path}: {e}") from e
+    raise ValueError(f"Unsupported cohort definitions file '{path}'. Expected .json, .yaml or .yml")
+
+def validate_cohort_definitions(definitions) -> List[str]:
+    """
+    Check cohort definitions against the shape the catalog, matcher and rule engine expect.
+
+    Returns:
+        list: Problems found (empty when the definitions are valid)
+    """
+    if not isinstance(definitions, dict) or not definitions:
+        return ["Cohort definitions must be a non-empty mapping of cohort name to definition"]
+
+    problems = []
+    for cohort_name, cohort in definitions.items():
+        where = f"cohort '{cohort_name}'"
+        if not isinstance(cohort, dict):
+            problems.append(f"{where}: definition must be a mapping")
+            continue
+        shape_problems = [f"{where}: '{field}' must be a list" for field in _LIST_FIELDS
+                          if not isinstance(cohort.get(field, []), list)]
+        if not isinstance(cohort.get("name"), str):
+            shape_problems.append(f"{where}: 'name' must be a string")
+        if not isinstance(cohort.get("priority", 0), int):
+            shape_problems.append(f"{where}: 'priority' must be an integer")
+        if not isinstance(cohort.get("thresholds", {}), dict):
+            shape_problems.append(f"{where}: 'thresholds' must be a mapping")
+        if shape_problems:
+            problems.extend(shape_problems)
+            continue
+
+        if not all(isinstance(indicator, str) and indicator for indicator in cohort.get("key_indicators", [])):
+            problems.append(f"{where}: key_indicators must be non-empty strings")
+        for metric in cohort.get("decisive_metrics", []):
+            if metric not in METRICS:
+                problems.append(f"{where}: unknown decisive metric '{metric}'")
+
+        intervention_types = set()
+        for option in cohort.get("available_interventions", []):
+            if not isinstance(option, dict) or not isinstance(option.get("type"), str):
+                problems.append(f"{where}: every available intervention needs a 'type'")
+            else:
+                intervention_types.add(option["type"])
+
+        for index, rule in enumerate(cohort.get("intervention_rules", [])):
+            rule_where = f"{where} rule {index}"
+            if not isinstance(rule, dict) or not isinstance(rule.get("criterion"), str):
+                problems.append(f"{rule_where}: needs a 'criterion'")
+                continue
+            if rule["criterion"] not in cohort.get("intervention_criteria", []):
+                # Coverage of intervention_criteria is what lets the rules close a patient as "no action"
+                problems.append(f"{rule_where}: criterion '{rule['criterion']}' is not one of the intervention_criteria")
+            if rule.get("intervention") is not None and rule["intervention"] not in intervention_types:
+                problems.append(f"{rule_where}: intervention '{rule['intervention']}' is not an available intervention")
+            conditions = rule.get("conditions")
+            if not isinstance(conditions, list) or not conditions:
+                problems.append(f"{rule_where}: needs a non-empty 'conditions' list")
+                continue
+            for condition in conditions:
+                if not isinstance(condition, dict):
+                    problems.append(f"{rule_where}: conditions must be mappings")
+                elif condition.get("metric") not in METRICS:
+                    problems.append(f"{rule_where}: unknown metric '{condition.get('metric')}'")
+                elif condition.get("op") not in _RULE_OPS:
+                    problems.append(f"{rule_where}: unknown operator '{condition.get('op')}'")
+                elif condition["op"] in TEXT_OPS and not isinstance(condition.get("value"), list):
+                    problems.append(f"{rule_where}: '{condition['op']}' needs a list value")
+                elif condition["op"] not in TEXT_OPS + ("missing",) and not isinstance(condition.get("value"), (int, float)):
+                    problems.append(f"{rule_where}: '{condition['op']}' needs a numeric value")
+    return problems
+
+
+class CohortDefinitionSource:
+    """
+    Cohort definitions file that is validated, compiled and hot-swapped on change.
+
+    load() parses and validates the file, builds a CohortCatalog with its
+    matcher and rule engine already compiled, and only then makes it the active
+    catalog in a single assignment. Workflow runs pin the catalog they started
+    with (see pinned_cohort_catalog), so a reload never changes the definitions
+    under a running batch. A file that fails to parse or validate leaves the
+    current catalog active.
+
+    Args:
+        path: JSON or YAML definitions file
+        poll_interval: Seconds between file checks of the background watcher
+    """
+
+    def __init__(self, path: str, poll_interval: float = 2.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> CohortCatalog:
+        """
+        Load, validate and compile the file, and swap it in as the active catalog.
+
+        Raises:
+            ValueError: If the file cannot be parsed or fails validation
+        """
+        with self._lock:
+            stamp = self._file_stamp()
+            definitions = load_definitions_file(self.path)
+            problems = validate_cohort_definitions(definitions)
+            if problems:
+                raise ValueError(f"Invalid cohort definitions in {self.path}:\n  - " + "\n  - ".join(problems))
+
+            catalog = CohortCatalog(definitions, source=self.path)
+            # Compile before the swap so no run ever sees a half-built catalog
+            catalog.compiled("matcher", CohortMatcher)
+            catalog.compiled("rule_engine", InterventionRuleEngine)
+            set_cohort_catalog(catalog)
+            get_patient_repository().reindex_cohorts()
+            self._stamp = stamp
+            self.reloads += 1
+            self.last_error = None
+            return catalog
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload when the file changed since the last load.
+
+        Returns:
+            bool: True if a new catalog was swapped in
+        """
+        try:
+            if self._file_stamp() == self._stamp:
+                return False
+            previous_version = get_active_cohort_catalog().version
+            catalog = self.load()
+        except (OSError, ValueError) as e:
+            if str(e) != self.last_error:
+                print(f"⚠️ Keeping cohort definitions {get_active_cohort_catalog().version}: {e}")
+            self.last_error = str(e)
+            return False
+        if catalog.version != previous_version:
+            print(f"🔄 Cohort definitions reloaded from {self.path}: {previous_version} → {catalog.version}")
+        return True
+
+    def watch(self) -> None:
+        """Start a daemon thread polling the file every poll_interval seconds."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.wait(self.poll_interval):
+                self.reload_if_changed()
+
+        self._watcher = threading.Thread(target=poll, name="cohort-definitions-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop the background watcher."""
+        self._stop.set()
+
+
+_source: Optional[CohortDefinitionSource] = None
+_source_configured = False
+
+def get_cohort_source() -> Optional[CohortDefinitionSource]:
+    """
+    Get the definitions file source configured by COHORT_DEFINITIONS_PATH, or
+    None when the built-in COHORT_DEFINITIONS are used.
+    """
+    global _source, _source_configured
+    if not _source_configured:
+        path = os.getenv("COHORT_DEFINITIONS_PATH")
+        _source = CohortDefinitionSource(path) if path else None
+        _source_configured = True
+    return _source
+
+def set_cohort_source(source: Optional[CohortDefinitionSource]) -> None:
+    """Replace the definitions file source (None reverts to built-in definitions on the next load)."""
+    global _source, _source_configured
+    _source, _source_configured = source, True
@@ -1,5 +1,10 @@
-from .cohort_definitions import COHORT_DEFINITIONS
-from .mock_data import PATIENTS
+from .cohort_bitmaps import get_cohort_bitmap_index
+from .cohort_catalog import get_cohort_catalog
+from .cohort_matcher import get_cohort_matcher
+from .intervention_rules import UNDETERMINED, get_rule_engine
+from .lab_parsing import measurement_value, normalized_metrics
+from .patient_repository import get_patient_repository
+from .result_memo import memoized
 from rich.console import Console
 from rich.panel import Panel
 
@@ -7,7 +12,7 @@ console = Console()
   
 def get_all_cohorts():
     """Get complete list of all available cohorts with their definitions and criteria."""
-    return COHORT_DEFINITIONS
+    return get_cohort_catalog().definitions
 
 def get_cohort_info(cohort_name: str):
     """
@@ -19,8 +24,21 @@ def get_cohort_info(cohort_name: str):
     Returns:
         Dictionary with cohort definition, criteria, and interventions
     """
-    return COHORT_DEFINITIONS.get(cohort_name)
+    return get_cohort_catalog().get(cohort_name)
 
+def get_cohort_patients(cohort_name: str):
+    """
+    Get all patients whose supporting facts match a cohort's key indicators.
+
+    Args:
+        cohort_name: Name of the cohort ("diabetic", "obesity", "cancer_screening")
+
+    Returns:
+        List of candidate patients for the cohort (for LLM to validate)
+    """
+    return get_patient_repository().find_by_cohort(cohort_name)
+
+@memoized("classify_patient")
 def classify_patient(patient_data: dict):
     """
     Classify a patient into appropriate cohorts based on their medical data.
@@ -31,21 +49,7 @@ def classify_patient(patient_data: dict):
     Returns:
         List of cohorts this patient likely belongs to
     """
-    suggested_cohorts = []
-    supporting_facts = patient_data.get("supporting_facts", [])
-    
-    for cohort_name, cohort_info in COHORT_DEFINITIONS.items():
-        key_indicators = cohort_info.get("key_indicators", [])
-        
-        # Check if any key indicators match supporting facts
-        for indicator in key_indicators:
-            for fact in supporting_facts:
-                if indicator.lower() in fact.lower():
-                    if cohort_name not in suggested_cohorts:
-                        suggested_cohorts.append(cohort_name)
-                    break
-    
-    return suggested_cohorts
+    return get_cohort_matcher().classify(patient_data)
 
 def get_intervention_options(cohort_name: str):
     """
@@ -57,9 +61,9 @@ def get_intervention_options(cohort_name: str):
     Returns:
         List of available interventions with types, descriptions, and templates
     """
-    cohort = COHORT_DEFINITIONS.get(cohort_name)
-    return cohort.get("available_interventions", []) if cohort else []
+    return get_cohort_catalog().available_interventions(cohort_name)
 
+@memoized("analyze_intervention_need")
 def analyze_intervention_need(patient_data: dict, cohort_name: str):
     """
     Analyze if a patient in a specific cohort needs clinical intervention.
@@ -69,20 +73,24 @@ def analyze_intervention_need(patient_data: dict, cohort_name: str):
         cohort_name: Name of the cohort to analyze for
         
     Returns:
-        Dictionary with analysis framework for LLM decision-making
+        Dictionary with the rule engine's decision, plus the analysis framework
+        for LLM decision-making when the rules cannot decide
     """
-    cohort = COHORT_DEFINITIONS.get(cohort_name)
+    cohort = get_cohort_catalog().get(cohort_name)
     if not cohort:
         return {"error": f"Cohort '{cohort_name}' not found"}
     
+    rule_decision = get_rule_engine().evaluate(patient_data, cohort_name)
     analysis = {
         "cohort": cohort_name,
         "intervention_criteria": cohort.get("intervention_criteria", []),
         "patient_data_summary": {
             "supporting_facts": patient_data.get("supporting_facts", []),
-            "key_metrics": {}
+            "key_metrics": {},
+            "normalized_metrics": normalized_metrics(patient_data)
         },
-        "needs_llm_evaluation": True
+        "rule_decision": rule_decision._asdict(),
+        "needs_llm_evaluation": rule_decision.decision == UNDETERMINED
     }
     
     # Add relevant metrics based on cohort type
@@ -118,25 +126,33 @@ def get_cohort_summary():
     Returns:
         Dictionary with overview of all cohorts and their key characteristics
     """
-    summary = {
-        "total_cohorts": len(COHORT_DEFINITIONS),
-        "cohort_overview": {}
-    }
-    
-    for cohort_name, cohort_info in COHORT_DEFINITIONS.items():
-        summary["cohort_overview"][cohort_name] = {
-            "name": cohort_info.get("name"),
-            "description": cohort_info.get("description"),
-            "key_indicators": cohort_info.get("key_indicators", [])[:3],  # First 3 indicators
-            "intervention_count": len(cohort_info.get("available_interventions", []))
-        }
+    return get_cohort_catalog().summary
+
+def query_cohorts(expression: str, limit: int = 100):
+    """
+    Answer set-algebra questions over cohort membership and intervention flags.
     
-    return summary
+    Args:
+        expression: e.g. "diabetic AND NOT contacted_in_30_days" or "obesity OR diabetic:needs_intervention"
+        limit: Maximum patient IDs to return (the count is always exact)
+        
+    Returns:
+        Dictionary with the matching patient count and up to `limit` patient IDs
+    """
+    index = get_cohort_bitmap_index()
+    bitmap = index.query(expression)
+    patient_ids = index.patient_ids(bitmap)
+    return {
+        "expression": expression,
+        "count": bitmap.cardinality(),
+        "patient_ids": patient_ids[:limit],
+        "truncated": len(patient_ids) > limit
+    }
 
 def classify_patient_with_debug(patient_id: int) -> str:
     """Classify patient with detailed debugging output."""
     
-    patient = next((p for p in PATIENTS if p["patient_id"] == patient_id), None)
+    patient = get_patient_repository().get(patient_id)
     if not patient:
         return f"Patient {patient_id} not found"
     
@@ -170,8 +186,9 @@ def classify_patient_with_debug(patient_id: int) -> str:
     ]
     
     # Check for obesity markers
+    bmi = measurement_value(get_patient_repository().get_measurements(patient_id), "bmi")
     obesity_indicators = [
-        "bmi" in patient and float(str(patient.get("bmi", "0")).replace(">", "")) >= 30,
+        bmi is not None and bmi >= 30,
         any("obesity" in str(fact).lower() for fact in supporting_facts)
     ]
     
@@ -0,0 +1,21 @@
+# tools/content_hash.py
+
+import hashlib
+import json
+
+
+def stable_hash(value) -> str:
+    """SHA-256 of a value's canonical JSON form (sorted keys, no whitespace)."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def patient_content_hash(patient: dict) -> str:
+    """Content hash of a patient record; changes whenever any field changes."""
+    return stable_hash(patient)
+
+def cohort_definitions_version(cohort_definitions: dict = None) -> str:
+    """Short version id of a set of cohort definitions (defaults to the active cohort catalog)."""
+    if cohort_definitions is None:
+        from .cohort_catalog import get_cohort_catalog
+        return get_cohort_catalog().version
+    return stable_hash(cohort_definitions)[:16]
@@ -0,0 +1,144 @@
+# tools/fact_index.py
+
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Patient fields holding free-text clinical facts
+FACT_FIELDS = ("supporting_facts", "medications", "family_history")
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text) -> str:
+    """Lowercase and collapse punctuation/whitespace runs to single spaces."""
+    return _NON_ALNUM.sub(" ", str(text).lower()).strip()
+
+def _ngrams(text: str, n: int) -> Set[str]:
+    """Character n-grams of a normalized string (the string itself if shorter than n)."""
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class FactIndex:
+    """
+    Character n-gram inverted index over a patient's free-text fact fields.
+
+    Every normalized fact value is split into n-grams with a posting set of
+    patient IDs per n-gram. A query term is answered by intersecting the
+    posting sets of its n-grams (smallest first) and confirming the substring
+    on the few candidates left, so matching keeps the substring semantics of a
+    linear scan. Records are added and removed incrementally.
+
+    Args:
+        fields: Patient fields to index
+        n: N-gram length
+    """
+
+    def __init__(self, fields: Iterable[str] = FACT_FIELDS, n: int = 3):
+        self.fields = tuple(fields)
+        self.n = n
+        self._postings: Dict[str, Set[int]] = {}
+        self._values: Dict[int, List[str]] = {}
+        self._grams_of: Dict[int, Set[str]] = {}
+
+    def add(self, patient: dict) -> None:
+        """Index a patient, replacing any previously indexed version."""
+        patient_id = patient["patient_id"]
+        self.remove(patient_id)
+
+        values = []
+        for field in self.fields:
+            raw = patient.get(field) or []
+            for value in ([raw] if isinstance(raw, str) else raw):
+                normalized = normalize_text(value)
+                if normalized:
+                    values.append(normalized)
+
+        grams = set().union(*(_ngrams(value, self.n) for value in values)) if values else set()
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(patient_id)
+        self._values[patient_id] = values
+        self._grams_of[patient_id] = grams
+
+    def remove(self, patient_id: int) -> None:
+        """Drop a patient from the index (no-op if not indexed)."""
+        self._values.pop(patient_id, None)
+        for gram in self._grams_of.pop(patient_id, ()):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(patient_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def match(self, term: str) -> Dict[int, float]:
+        """
+        Patients whose facts contain the term.
+
+        Returns:
+            dict: Patient ID to score (matching fact values, +1 per whole-word match)
+        """
+        term = normalize_text(term)
+        if not term:
+            return {}
+
+        candidates = self._candidates(term)
+        scores = {}
+        padded_term = f" {term} "
+        for patient_id in candidates:
+            score = 0.0
+            for value in self._values.get(patient_id, ()):
+                if term in value:
+                    score += 2.0 if padded_term in f" {value} " else 1.0
+            if score:
+                scores[patient_id] = score
+        return scores
+
+    def search(self, terms: Iterable[str], match_all: bool = False) -> List[Tuple[int, float]]:
+        """
+        Any-of or all-of term search.
+
+        Args:
+            terms: Search terms (substring match on normalized facts)
+            match_all: Require every term instead of any
+
+        Returns:
+            list: (patient_id, score) ranked by terms matched, then score, then ID
+        """
+        per_term = [self.match(term) for term in terms if normalize_text(term)]
+        if not per_term:
+            return []
+
+        if match_all:
+            # Intersect the smallest result sets first
+            per_term.sort(key=len)
+            patient_ids = set(per_term[0])
+            for scores in per_term[1:]:
+                patient_ids &= scores.keys()
+                if not patient_ids:
+                    return []
+        else:
+            patient_ids = set().union(*(scores.keys() for scores in per_term))
+
+        ranked = []
+        for patient_id in patient_ids:
+            matched = [scores[patient_id] for scores in per_term if patient_id in scores]
+            ranked.append((len(matched), sum(matched), patient_id))
+        ranked.sort(key=lambda item: (-item[0], -item[1], item[2]))
+        return [(patient_id, score) for _, score, patient_id in ranked]
+
+    def _candidates(self, term: str) -> Set[int]:
+        """Patients holding every n-gram of the term."""
+        if len(term) < self.n:
+            # Short terms: union of postings of every n-gram that contains them
+            return set().union(*(ids for gram, ids in self._postings.items() if term in gram))
+        postings = sorted((self._postings.get(gram, set()) for gram in _ngrams(term, self.n)), key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return candidates
+
+    def __len__(self) -> int:
+        return len(self._values)
@@ -1,4 +1,4 @@
-from .mock_data import PATIENTS
+from .patient_repository import get_patient_repository
 from pydantic import BaseModel
 from typing import Optional
 
@@ -17,7 +17,7 @@ def find_unmet_patients(condition_filter: Optional[str] = None) -> str:
         A formatted string listing patients who need intervention
     """
     unmet_patients = [
-        patient for patient in PATIENTS 
+        patient for patient in get_patient_repository().all() 
         if patient.get("needs_intervention", False)
     ]
     
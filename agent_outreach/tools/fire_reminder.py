@@ -1,6 +1,18 @@
 from pydantic import BaseModel
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+import asyncio
+import threading
 import traceback
 
+# Time of the last reminder per patient, for "contacted in the last N days" cohort queries
+_contact_log = {}
+_contact_log_version = 0
+_contact_log_lock = threading.Lock()
+# Recent (version, patient_id, contacted_at) entries, so indexes can apply new contacts without a rebuild
+_recent_contacts = deque(maxlen=1024)
+
 class FireReminderInput(BaseModel):
     """Input schema for firing reminders."""
     patient_id: int
@@ -14,6 +26,7 @@ def fire_reminder(patient_id: int, reminder_type: str, priority: str = "normal")
         print(f"   Priority: {priority}")
         
         result = f"Reminder sent to Patient {patient_id}: {reminder_type}"
+        record_contact(patient_id)
         print(f"✅ {result}")
         return result
         
@@ -23,4 +36,43 @@ def fire_reminder(patient_id: int, reminder_type: str, priority: str = "normal")
         print(f"Error type: {type(e).__name__}")
         print("📋 Fire reminder error traceback:")
         traceback.print_exc()
-        raise
\ No newline at end of file
+        raise
+
+def record_contact(patient_id: int, contacted_at: datetime = None):
+    """Record that a patient was contacted."""
+    global _contact_log_version
+    contacted_at = contacted_at or datetime.now()
+    with _contact_log_lock:
+        _contact_log[patient_id] = contacted_at
+        _contact_log_version += 1
+        _recent_contacts.append((_contact_log_version, patient_id, contacted_at))
+
+def get_contact_log() -> dict:
+    """Get a copy of the last contact time per patient."""
+    with _contact_log_lock:
+        return dict(_contact_log)
+
+def get_contacts_since(version: int) -> Optional[Dict[int, datetime]]:
+    """
+    Contacts recorded after a contact log version.
+
+    Returns:
+        dict: Patient ID to contact time, or None when some of them are no longer retained
+    """
+    with _contact_log_lock:
+        if version >= _contact_log_version:
+            return {}
+        if not _recent_contacts or _recent_contacts[0][0] > version + 1:
+            return None
+        return {patient_id: contacted_at for entry_version, patient_id, contacted_at in _recent_contacts
+                if entry_version > version}
+
+def get_contact_log_version() -> int:
+    """Counter bumped on every recorded contact."""
+    return _contact_log_version
+
+async def afire_reminder(patient_id: int, reminder_type: str, priority: str = "normal") -> str:
+    """Async variant of fire_reminder so reminder delivery does not block the event loop."""
+    # Delivery is simulated today; a real messaging backend call would be awaited here
+    await asyncio.sleep(0)
+    return fire_reminder(patient_id, reminder_type, priority)
@@ -0,0 +1,274 @@
+# tools/intervention_rules.py
+
+import math
+import operator
+from datetime import date, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .cohort_catalog import get_cohort_catalog
+from .lab_parsing import measurement_value, parse_patient_measurements
+
+# Patient fields holding the date of a cancer screening procedure
+SCREENING_DATE_FIELDS = ("last_colonoscopy", "last_mammography")
+# Clinical free-text fields the "facts" metric is built from (never names, contact details or addresses)
+CLINICAL_TEXT_FIELDS = ("supporting_facts", "medications", "family_history")
+
+INTERVENE = "intervene"
+NO_INTERVENTION = "no_intervention"
+UNDETERMINED = "undetermined"
+
+_COMPARISONS: Dict[str, Callable] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq
+}
+TEXT_OPS = ("contains_any", "not_contains_any")
+# Metrics produced by extract_metrics() that rules may reference
+METRICS = (
+    "age", "bmi", "hba1c", "fasting_glucose", "days_since_last_visit",
+    "days_since_last_screening", "family_history_count", "facts"
+)
+# Metrics that grow by one every day without the record changing
+DATE_METRICS = ("days_since_last_visit", "days_since_last_screening")
+
+
+def days_since(raw, as_of: date) -> Optional[float]:
+    """Days between an ISO date string and the reference date, or None if missing/malformed."""
+    if not raw:
+        return None
+    try:
+        return float((as_of - date.fromisoformat(str(raw))).days)
+    except ValueError:
+        return None
+
+def _days_until_change(compare: Callable, days: float, value) -> Optional[int]:
+    """Days until a comparison on a daily-growing metric changes outcome, or None if it never does."""
+    current = compare(days, value)
+    # Comparisons are monotonic in the metric, so the change (if any) happens where it crosses the value
+    start = max(1, math.floor(value - days))
+    for offset in (start, start + 1, start + 2):
+        if compare(days + offset, value) != current:
+            return offset
+    return None
+
+def extract_metrics(patient: dict, measurements: dict = None, as_of: date = None) -> dict:
+    """
+    Collect the metrics that intervention rules are written against.
+
+    Args:
+        patient: Patient dictionary
+        measurements: Typed lab values (parsed from the record if omitted)
+        as_of: Reference date for the days-since metrics (defaults to today)
+
+    Returns:
+        dict: Metric name to value, with None for anything not recorded
+    """
+    as_of = as_of or date.today()
+    if measurements is None:
+        measurements = parse_patient_measurements(patient)
+
+    screening_days = [days_since(patient.get(field), as_of) for field in SCREENING_DATE_FIELDS]
+    screening_days = [days for days in screening_days if days is not None]
+
+    # Clinical free text only, so text rules cannot match on names, emails or addresses
+    text_values = []
+    for field in CLINICAL_TEXT_FIELDS:
+        value = patient.get(field)
+        if isinstance(value, str):
+            text_values.append(value)
+        elif isinstance(value, list):
+            text_values.extend(str(item) for item in value)
+
+    return {
+        "age": patient.get("age"),
+        "bmi": measurement_value(measurements, "bmi"),
+        "hba1c": measurement_value(measurements, "last_hba1c"),
+        "fasting_glucose": measurement_value(measurements, "fasting_glucose"),
+        "days_since_last_visit": days_since(patient.get("last_visit"), as_of),
+        "days_since_last_screening": min(screening_days) if screening_days else None,
+        "family_history_count": len(patient.get("family_history", [])),
+        "facts": "\n".join(text_values).lower()
+    }
+
+
+class RuleDecision(NamedTuple):
+    """Outcome of evaluating one cohort's intervention rules for one patient."""
+    cohort: str
+    decision: str
+    matched_criteria: List[str]
+    recommended_intervention: Optional[str]
+    missing_metrics: List[str]
+    # Intervention criteria without a machine-readable rule; only a reviewer can rule them out
+    unchecked_criteria: List[str]
+
+
+def _compile_condition(condition: dict) -> Callable[[dict], Optional[bool]]:
+    """Compile one condition into a tri-state check: True, False, or None when the metric is missing."""
+    metric, op, value = condition["metric"], condition["op"], condition.get("value")
+
+    if op == "missing":
+        return lambda metrics: metrics.get(metric) is None
+    if op in TEXT_OPS:
+        needles = tuple(str(v).lower() for v in value)
+        expected = op == "contains_any"
+        return lambda metrics: (
+            None if metrics.get(metric) is None
+            else any(needle in metrics[metric] for needle in needles) == expected
+        )
+    if op in _COMPARISONS:
+        compare = _COMPARISONS[op]
+        return lambda metrics: None if metrics.get(metric) is None else compare(metrics[metric], value)
+
+    raise ValueError(f"Unknown rule operator '{op}' for metric '{metric}'")
+
+
+class CompiledRule(NamedTuple):
+    """An intervention rule compiled once from its cohort definition."""
+    criterion: str
+    conditions: List[dict]
+    checks: List[Callable[[dict], Optional[bool]]]
+    intervention: Optional[str]
+
+    def evaluate(self, metrics: dict) -> Optional[bool]:
+        """All conditions must hold; None when undecidable because a metric is missing."""
+        result = True
+        for check in self.checks:
+            outcome = check(metrics)
+            if outcome is False:
+                return False
+            if outcome is None:
+                result = None
+        return result
+
+
+class InterventionRuleEngine:
+    """
+    Deterministic evaluator for the machine-readable intervention_rules of each cohort.
+
+    A cohort decision is "intervene" when any rule holds, and "no_intervention" only
+    when no rule holds, every decisive metric is recorded and every one of the
+    cohort's intervention_criteria is covered by a rule. Otherwise it is
+    "undetermined", with the criteria no rule checks listed in unchecked_criteria,
+    and the patient is escalated to the LLM.
+
+    Args:
+        cohort_definitions: Cohort definitions with intervention_rules and decisive_metrics
+    """
+
+    def __init__(self, cohort_definitions: Dict[str, dict]):
+        self.rules: Dict[str, List[CompiledRule]] = {}
+        self.decisive_metrics: Dict[str, List[str]] = {}
+        self.unchecked_criteria: Dict[str, List[str]] = {}
+
+        for cohort_name, cohort_info in cohort_definitions.items():
+            self.rules[cohort_name] = [
+                CompiledRule(
+                    criterion=rule["criterion"],
+                    conditions=rule["conditions"],
+                    checks=[_compile_condition(condition) for condition in rule["conditions"]],
+                    intervention=rule.get("intervention")
+                )
+                for rule in cohort_info.get("intervention_rules", [])
+            ]
+            self.decisive_metrics[cohort_name] = list(cohort_info.get("decisive_metrics", []))
+            covered = {rule.criterion for rule in self.rules[cohort_name]}
+            self.unchecked_criteria[cohort_name] = [
+                criterion for criterion in cohort_info.get("intervention_criteria", []) if criterion not in covered
+            ]
+
+    def decide(self, metrics: dict, cohort_name: str) -> RuleDecision:
+        """
+        Evaluate a cohort's rules against pre-extracted metrics.
+
+        Args:
+            metrics: Output of extract_metrics()
+            cohort_name: Name of the cohort
+
+        Returns:
+            RuleDecision: Decision, matched criteria and recommended intervention type
+        """
+        if cohort_name not in self.rules:
+            return RuleDecision(cohort_name, UNDETERMINED, [], None, [], [])
+
+        matched = [rule for rule in self.rules[cohort_name] if rule.evaluate(metrics)]
+        missing = [metric for metric in self.decisive_metrics[cohort_name] if metrics.get(metric) is None]
+        unchecked = self.unchecked_criteria[cohort_name]
+
+        if matched:
+            decision = INTERVENE
+        elif not missing and not unchecked:
+            decision = NO_INTERVENTION
+        else:
+            decision = UNDETERMINED
+
+        return RuleDecision(
+            cohort=cohort_name,
+            decision=decision,
+            matched_criteria=[rule.criterion for rule in matched],
+            recommended_intervention=matched[0].intervention if matched else None,
+            missing_metrics=missing,
+            unchecked_criteria=list(unchecked)
+        )
+
+    def valid_until(self, metrics: dict, cohort_names: List[str], as_of: date) -> Optional[date]:
+        """
+        First date on which the decisions for these cohorts may differ from those at as_of
+        because a days-since metric crossed a rule threshold.
+
+        Args:
+            metrics: Output of extract_metrics() as of the given date
+            cohort_names: Cohorts whose rules were evaluated
+            as_of: Date the metrics were extracted as of
+
+        Returns:
+            date: First date to re-evaluate on, or None if only a record or definitions change can alter them
+        """
+        offsets = [
+            _days_until_change(_COMPARISONS[condition["op"]], metrics[condition["metric"]], condition["value"])
+            for cohort_name in cohort_names
+            for rule in self.rules.get(cohort_name, [])
+            for condition in rule.conditions
+            if condition["metric"] in DATE_METRICS and condition["op"] in _COMPARISONS
+            and metrics.get(condition["metric"]) is not None
+        ]
+        offsets = [offset for offset in offsets if offset is not None]
+        return as_of + timedelta(days=min(offsets)) if offsets else None
+
+    def evaluate(self, patient: dict, cohort_name: str, measurements: dict = None, as_of: date = None) -> RuleDecision:
+        """
+        Evaluate a patient against one cohort's intervention rules.
+
+        Args:
+            patient: Patient dictionary
+            cohort_name: Name of the cohort
+            measurements: Typed lab values (parsed from the record if omitted)
+            as_of: Reference date for the days-since metrics (defaults to today)
+
+        Returns:
+            RuleDecision: Decision, matched criteria and recommended intervention type
+        """
+        return self.decide(extract_metrics(patient, measurements, as_of), cohort_name)
+
+    def evaluate_patient(self, patient: dict, cohort_names: List[str] = None,
+                         measurements: dict = None, as_of: date = None) -> Dict[str, RuleDecision]:
+        """
+        Evaluate a patient against several cohorts, extracting metrics only once.
+
+        Args:
+            patient: Patient dictionary
+            cohort_names: Cohorts to evaluate (defaults to all)
+            measurements: Typed lab values (parsed from the record if omitted)
+            as_of: Reference date for the days-since metrics (defaults to today)
+
+        Returns:
+            dict: RuleDecision keyed by cohort name
+        """
+        metrics = extract_metrics(patient, measurements, as_of)
+        return {name: self.decide(metrics, name) for name in (cohort_names or self.rules)}
+
+
+def get_rule_engine() -> InterventionRuleEngine:
+    """Get the rule engine compiled from the cohort catalog in effect (compiled once per catalog)."""
+    return get_cohort_catalog().compiled("rule_engine", InterventionRuleEngine)
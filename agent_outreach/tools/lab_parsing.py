@@ -0,0 +1,213 @@
+# tools/lab_parsing.py
+
+import re
+from collections import Counter
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+
+class Measurement(NamedTuple):
+    """A unit-normalized numeric measurement."""
+    value: float
+    unit: str
+    qualifier: str = ""  # ">" or "<" when the source value was censored, e.g. ">35"
+
+
+class BloodPressure(NamedTuple):
+    """A blood pressure reading in mmHg."""
+    systolic: float
+    diastolic: float
+    unit: str = "mmHg"
+
+
+ParsedValue = Union[Measurement, BloodPressure]
+
+# Conversion factor from mmol/L to mg/dL for glucose
+_GLUCOSE_MMOL_TO_MG = 18.016
+_LB_TO_KG = 0.45359237
+_INCH_TO_CM = 2.54
+
+_QUANTITY = re.compile(r"^\s*(?P<qualifier>[<>]=?)?\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>[a-z%/²0-9. ]*?)\s*$")
+_FEET_INCHES = re.compile(r"^\s*(?P<feet>\d+)\s*(?:'|ft|feet)\s*(?:(?P<inches>\d+(?:\.\d+)?)\s*(?:\"|''|in|inches)?)?\s*$")
+_BLOOD_PRESSURE = re.compile(r"^\s*(?P<systolic>\d{2,3})\s*/\s*(?P<diastolic>\d{2,3})\s*(?:mm\s*hg)?\s*$")
+
+
+def _quantity(raw: str, units: Dict[str, Tuple[str, float]], default_unit: str) -> Optional[Measurement]:
+    """Parse "<qualifier><number> <unit>" and convert the unit using the given table."""
+    match = _QUANTITY.match(raw.lower())
+    if not match:
+        return None
+    unit = match.group("unit").strip() or default_unit
+    if unit not in units:
+        return None
+    target_unit, factor = units[unit]
+    return Measurement(round(float(match.group("value")) * factor, 2), target_unit, match.group("qualifier") or "")
+
+def _parse_percent(raw: str) -> Optional[Measurement]:
+    return _quantity(raw, {"%": ("%", 1.0)}, "%")
+
+def _parse_glucose(raw: str) -> Optional[Measurement]:
+    return _quantity(raw, {
+        "mg/dl": ("mg/dL", 1.0),
+        "mmol/l": ("mg/dL", _GLUCOSE_MMOL_TO_MG)
+    }, "mg/dl")
+
+def _parse_bmi(raw: str) -> Optional[Measurement]:
+    return _quantity(raw, {"kg/m2": ("kg/m2", 1.0), "kg/m²": ("kg/m2", 1.0)}, "kg/m2")
+
+def _parse_weight(raw: str) -> Optional[Measurement]:
+    return _quantity(raw, {
+        "kg": ("kg", 1.0),
+        "lb": ("kg", _LB_TO_KG),
+        "lbs": ("kg", _LB_TO_KG)
+    }, "lbs")
+
+def _parse_length(raw: str) -> Optional[Measurement]:
+    feet_inches = _FEET_INCHES.match(raw.lower())
+    if feet_inches:
+        inches = int(feet_inches.group("feet")) * 12 + float(feet_inches.group("inches") or 0)
+        return Measurement(round(inches * _INCH_TO_CM, 2), "cm")
+    return _quantity(raw, {
+        "cm": ("cm", 1.0),
+        "m": ("cm", 100.0),
+        "in": ("cm", _INCH_TO_CM),
+        "inch": ("cm", _INCH_TO_CM),
+        "inches": ("cm", _INCH_TO_CM)
+    }, "in")
+
+def _parse_blood_pressure(raw: str) -> Optional[BloodPressure]:
+    match = _BLOOD_PRESSURE.match(raw.lower())
+    if not match:
+        return None
+    return BloodPressure(float(match.group("systolic")), float(match.group("diastolic")))
+
+
+# Parser per measurement kind, and the kind of each patient field parsed at ingestion
+PARSERS: Dict[str, Callable[[str], Optional[ParsedValue]]] = {
+    "percent": _parse_percent,
+    "glucose": _parse_glucose,
+    "bmi": _parse_bmi,
+    "weight": _parse_weight,
+    "length": _parse_length,
+    "blood_pressure": _parse_blood_pressure
+}
+
+FIELD_KINDS = {
+    "last_hba1c": "percent",
+    "fasting_glucose": "glucose",
+    "bmi": "bmi",
+    "weight": "weight",
+    "height": "length",
+    "waist_circumference": "length",
+    "blood_pressure": "blood_pressure"
+}
+
+
+class LabValueParser:
+    """
+    Memoized parser turning free-text lab values and measurements into typed values.
+
+    Results are cached by (kind, raw string), so repeated values such as "8.2%"
+    are parsed once. Malformed values are counted per field instead of raising.
+    """
+
+    def __init__(self):
+        self._cache: Dict[Tuple[str, str], Optional[ParsedValue]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.malformed = Counter()
+
+    def parse(self, field: str, raw) -> Optional[ParsedValue]:
+        """
+        Parse one patient field value.
+
+        Args:
+            field: Patient field name (e.g. "last_hba1c", "height")
+            raw: Raw value as stored on the patient record
+
+        Returns:
+            Measurement, BloodPressure or None if missing, unknown or malformed
+        """
+        kind = FIELD_KINDS.get(field)
+        if kind is None or raw is None or raw == "":
+            return None
+
+        key = (kind, str(raw))
+        if key in self._cache:
+            self.cache_hits += 1
+            parsed = self._cache[key]
+        else:
+            self.cache_misses += 1
+            parsed = PARSERS[kind](key[1])
+            self._cache[key] = parsed
+
+        if parsed is None:
+            self.malformed[field] += 1
+        return parsed
+
+    def parse_patient(self, patient: dict) -> Dict[str, ParsedValue]:
+        """
+        Parse every known measurement field on a patient record.
+
+        Args:
+            patient: Patient dictionary
+
+        Returns:
+            dict: Typed values keyed by field name, omitting missing or malformed ones
+        """
+        measurements = {}
+        for field in FIELD_KINDS:
+            parsed = self.parse(field, patient.get(field))
+            if parsed is not None:
+                measurements[field] = parsed
+        return measurements
+
+    def get_stats(self) -> dict:
+        """Return cache and malformed-value counters."""
+        return {
+            "cache_size": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "malformed": dict(self.malformed)
+        }
+
+
+_parser = LabValueParser()
+
+def get_lab_parser() -> LabValueParser:
+    """Get the shared parser whose cache is reused across ingestion and tools."""
+    return _parser
+
+def parse_patient_measurements(patient: dict) -> Dict[str, ParsedValue]:
+    """Parse a patient's measurement fields with the shared parser."""
+    return _parser.parse_patient(patient)
+
+def measurement_value(measurements: Dict[str, ParsedValue], field: str) -> Optional[float]:
+    """Return the numeric value of a parsed Measurement field, or None."""
+    parsed = measurements.get(field)
+    return parsed.value if isinstance(parsed, Measurement) else None
+
+def normalized_metrics(patient: dict) -> Dict[str, dict]:
+    """
+    Typed, unit-normalized lab values for a patient in a tool-result friendly form.
+
+    A patient stored in the repository uses the values parsed at ingestion, so
+    tools do not re-parse the record (or count its malformed values again);
+    any other record is parsed here.
+
+    Args:
+        patient: Patient dictionary
+
+    Returns:
+        dict: Field name to {"value"/"unit"/...} mapping for every parseable field
+    """
+    # Imported here: the repository parses lab values with this module at ingestion
+    from .patient_repository import get_patient_repository
+
+    repository = get_patient_repository()
+    patient_id = patient.get("patient_id")
+    stored = repository.get(patient_id) if patient_id is not None else None
+    if stored is not None and (stored is patient or stored == patient):
+        measurements = repository.get_measurements(patient_id)
+    else:
+        measurements = parse_patient_measurements(patient)
+    return {field: parsed._asdict() for field, parsed in measurements.items()}
@@ -0,0 +1,358 @@
+# tools/patient_repository.py
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cohort_catalog import get_cohort_catalog
+from .cohort_matcher import get_cohort_matcher
+from .content_hash import patient_content_hash
+from .fact_index import FactIndex
+from .lab_parsing import measurement_value, parse_patient_measurements
+from .sorted_index import SortedIndex
+from .mock_data import PATIENTS
+
+
+def _visit_ordinal(patient: dict) -> Optional[int]:
+    """Day ordinal of the last visit, or None if missing/malformed."""
+    try:
+        return date.fromisoformat(str(patient["last_visit"])).toordinal() if patient.get("last_visit") else None
+    except ValueError:
+        return None
+
+# Numeric attributes kept in sorted indexes: name -> value from (patient, measurements)
+NUMERIC_ATTRIBUTES: Dict[str, Callable[[dict, dict], Optional[float]]] = {
+    "age": lambda patient, measurements: patient.get("age"),
+    "bmi": lambda patient, measurements: measurement_value(measurements, "bmi"),
+    "hba1c": lambda patient, measurements: measurement_value(measurements, "last_hba1c"),
+    "fasting_glucose": lambda patient, measurements: measurement_value(measurements, "fasting_glucose"),
+    "last_visit": lambda patient, measurements: _visit_ordinal(patient)
+}
+# Derived attribute answered from the last_visit index relative to a reference date
+DAYS_SINCE_LAST_VISIT = "days_since_last_visit"
+
+
+class PatientRepository(ABC):
+    """
+    Interface for patient storage backends used by the patient and cohort tools.
+
+    Tools only talk to this interface, so the in-memory implementation below can be
+    swapped for an EHR, FHIR or database backed one via set_patient_repository().
+    """
+
+    @abstractmethod
+    def get(self, patient_id: int) -> Optional[dict]:
+        """Return the patient with the given ID, or None if not found."""
+
+    @abstractmethod
+    def all(self) -> List[dict]:
+        """Return every patient in insertion order."""
+
+    @abstractmethod
+    def scan(self, after_id: Optional[int] = None) -> Iterator[dict]:
+        """Yield patients in ascending ID order, starting after the given ID (keyset cursor)."""
+
+    @abstractmethod
+    def get_measurements(self, patient_id: int) -> dict:
+        """Return the typed, unit-normalized lab values parsed when the patient was ingested."""
+
+    @abstractmethod
+    def get_cohorts(self, patient_id: int) -> List[str]:
+        """Return the cohorts the patient's data suggests membership in."""
+
+    @abstractmethod
+    def get_content_hash(self, patient_id: int) -> Optional[str]:
+        """Return the content hash of the stored record, used to detect changed patients between runs."""
+
+    def reindex_cohorts(self) -> None:
+        """Rebuild any cohort index after the cohort definitions changed (no-op without one)."""
+
+    @abstractmethod
+    def find_by_age(self, age: int) -> List[dict]:
+        """Return all patients of exactly the given age."""
+
+    @abstractmethod
+    def find_by_cohort(self, cohort_name: str) -> List[dict]:
+        """Return all patients whose data suggests membership in the given cohort."""
+
+    @abstractmethod
+    def find_in_range(self, attribute: str, low: Optional[float] = None, high: Optional[float] = None,
+                      as_of: date = None) -> Iterator[dict]:
+        """
+        Lazily yield patients whose numeric attribute lies in [low, high], in ascending order.
+
+        attribute is one of NUMERIC_ATTRIBUTES or "days_since_last_visit" (relative to
+        as_of, default today); patients without a value are never returned.
+        """
+
+    @abstractmethod
+    def find_by_phone(self, phone: str) -> Optional[dict]:
+        """Return the patient registered with the given phone number, if any."""
+
+    @abstractmethod
+    def search_facts(self, terms: List[str], match_all: bool = False) -> List[Tuple[dict, float]]:
+        """Return (patient, score) for patients whose facts, medications or family history contain the terms, best first."""
+
+    @abstractmethod
+    def find_by_email(self, email: str) -> Optional[dict]:
+        """Return the patient registered with the given email address, if any."""
+
+    @abstractmethod
+    def upsert(self, patient: dict) -> None:
+        """Insert a new patient or replace the existing record with the same ID."""
+
+    @abstractmethod
+    def remove(self, patient_id: int) -> Optional[dict]:
+        """Remove a patient and return the removed record, or None if not found."""
+
+    @property
+    @abstractmethod
+    def version(self) -> int:
+        """Counter bumped on every upsert/remove, so derived indexes know when to rebuild."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of stored patients."""
+
+
+def _normalize_phone(phone) -> str:
+    """Reduce a phone number to its digits so formatting differences still match."""
+    return "".join(ch for ch in str(phone) if ch.isdigit())
+
+def _normalize_email(email) -> str:
+    """Normalize an email address for case-insensitive lookup."""
+    return str(email).strip().lower()
+
+
+class InMemoryPatientRepository(PatientRepository):
+    """
+    Dictionary backed repository with a primary-key hash index, secondary
+    indexes on age, cohort, phone and email, and an n-gram inverted index over
+    free-text facts. Lab values and measurements are parsed into typed values
+    once, when a record is ingested.
+
+    Args:
+        patients: Initial patient records
+        cohort_classifier: Callable mapping a patient dict to a list of cohort names,
+            used to maintain the cohort index
+        cohort_version: Callable returning the version of the cohort definitions in
+            effect; cohort lookups under another version than the index was built
+            with classify directly instead of using the index
+    """
+
+    def __init__(self, patients: Iterable[dict] = (), cohort_classifier: Callable[[dict], List[str]] = None,
+                 cohort_version: Callable[[], str] = None):
+        self._cohort_classifier = cohort_classifier
+        self._cohort_version = cohort_version
+        self._cohort_index_version = cohort_version() if cohort_version else None
+        self._by_id: Dict[int, dict] = {}
+        # Patient IDs in ascending order, for keyset pagination
+        self._sorted_ids: List[int] = []
+        self._by_age: Dict[int, Dict[int, None]] = {}
+        self._by_cohort: Dict[str, Dict[int, None]] = {}
+        self._by_phone: Dict[str, int] = {}
+        self._by_email: Dict[str, int] = {}
+        self._facts = FactIndex()
+        self._numeric: Dict[str, SortedIndex] = {name: SortedIndex() for name in NUMERIC_ATTRIBUTES}
+        self._numeric_of: Dict[int, Dict[str, float]] = {}
+        self._version = 0
+        self._cohorts_of: Dict[int, List[str]] = {}
+        self._measurements: Dict[int, dict] = {}
+        self._content_hashes: Dict[int, str] = {}
+
+        for patient in patients:
+            self.upsert(patient)
+
+    def get(self, patient_id: int) -> Optional[dict]:
+        return self._by_id.get(patient_id)
+
+    def all(self) -> List[dict]:
+        return list(self._by_id.values())
+
+    def scan(self, after_id: Optional[int] = None) -> Iterator[dict]:
+        # Re-seek from the last yielded ID each step, so upserts/removals during a scan are safe
+        cursor = after_id
+        while True:
+            index = 0 if cursor is None else bisect_right(self._sorted_ids, cursor)
+            if index >= len(self._sorted_ids):
+                return
+            cursor = self._sorted_ids[index]
+            yield self._by_id[cursor]
+
+    def get_measurements(self, patient_id: int) -> dict:
+        return self._measurements.get(patient_id, {})
+
+    def get_cohorts(self, patient_id: int) -> List[str]:
+        if not self._cohort_index_current() and patient_id in self._by_id:
+            return list(self._cohort_classifier(self._by_id[patient_id]))
+        return list(self._cohorts_of.get(patient_id, []))
+
+    def get_content_hash(self, patient_id: int) -> Optional[str]:
+        return self._content_hashes.get(patient_id)
+
+    def find_by_age(self, age: int) -> List[dict]:
+        return [self._by_id[pid] for pid in self._by_age.get(age, {})]
+
+    def find_by_cohort(self, cohort_name: str) -> List[dict]:
+        if not self._cohort_index_current():
+            return [patient for patient in self._by_id.values() if cohort_name in self._cohort_classifier(patient)]
+        return [self._by_id[pid] for pid in self._by_cohort.get(cohort_name, {})]
+
+    def reindex_cohorts(self) -> None:
+        """Rebuild the cohort index under the cohort definitions now in effect."""
+        if not self._cohort_classifier:
+            return
+        by_cohort, cohorts_of = {}, {}
+        for patient_id, patient in self._by_id.items():
+            cohorts_of[patient_id] = self._cohort_classifier(patient)
+            for cohort_name in cohorts_of[patient_id]:
+                by_cohort.setdefault(cohort_name, {})[patient_id] = None
+        self._by_cohort, self._cohorts_of = by_cohort, cohorts_of
+        self._cohort_index_version = self._cohort_version() if self._cohort_version else None
+
+    def find_in_range(self, attribute: str, low: Optional[float] = None, high: Optional[float] = None,
+                      as_of: date = None) -> Iterator[dict]:
+        if attribute == DAYS_SINCE_LAST_VISIT:
+            # More days since the visit means an earlier visit date, so the bounds swap
+            today = (as_of or date.today()).toordinal()
+            low, high = (None if high is None else today - high), (None if low is None else today - low)
+            attribute = "last_visit"
+        if attribute not in self._numeric:
+            raise ValueError(f"No range index for '{attribute}'. Expected one of: "
+                             f"{', '.join([*NUMERIC_ATTRIBUTES, DAYS_SINCE_LAST_VISIT])}")
+        for pid in self._numeric[attribute].range(low, high):
+            yield self._by_id[pid]
+
+    def find_by_phone(self, phone: str) -> Optional[dict]:
+        pid = self._by_phone.get(_normalize_phone(phone))
+        return self._by_id.get(pid) if pid is not None else None
+
+    def find_by_email(self, email: str) -> Optional[dict]:
+        pid = self._by_email.get(_normalize_email(email))
+        return self._by_id.get(pid) if pid is not None else None
+
+    def search_facts(self, terms: List[str], match_all: bool = False) -> List[Tuple[dict, float]]:
+        return [(self._by_id[pid], score) for pid, score in self._facts.search(terms, match_all)]
+
+    def upsert(self, patient: dict) -> None:
+        patient_id = patient["patient_id"]
+        if patient_id in self._by_id:
+            self._unindex(self._by_id[patient_id])
+        else:
+            insort(self._sorted_ids, patient_id)
+        self._by_id[patient_id] = patient
+        self._measurements[patient_id] = parse_patient_measurements(patient)
+        self._content_hashes[patient_id] = patient_content_hash(patient)
+        self._index(patient)
+        self._version += 1
+
+    def remove(self, patient_id: int) -> Optional[dict]:
+        patient = self._by_id.pop(patient_id, None)
+        if patient is not None:
+            del self._sorted_ids[bisect_left(self._sorted_ids, patient_id)]
+            self._measurements.pop(patient_id, None)
+            self._content_hashes.pop(patient_id, None)
+            self._unindex(patient)
+            self._version += 1
+        return patient
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _cohort_index_current(self) -> bool:
+        """Whether the cohort index was built under the cohort definitions in effect."""
+        return (self._cohort_classifier is None or self._cohort_version is None
+                or self._cohort_version() == self._cohort_index_version)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def _index(self, patient: dict) -> None:
+        """Add a patient to every secondary index."""
+        patient_id = patient["patient_id"]
+
+        # Dicts keyed by ID keep insertion order and give O(1) removal
+        if patient.get("age") is not None:
+            self._by_age.setdefault(patient["age"], {})[patient_id] = None
+        if patient.get("phone"):
+            self._by_phone[_normalize_phone(patient["phone"])] = patient_id
+        if patient.get("email"):
+            self._by_email[_normalize_email(patient["email"])] = patient_id
+        self._facts.add(patient)
+
+        values = {}
+        for name, extract in NUMERIC_ATTRIBUTES.items():
+            value = extract(patient, self._measurements.get(patient_id, {}))
+            if value is not None:
+                self._numeric[name].add(value, patient_id)
+                values[name] = value
+        self._numeric_of[patient_id] = values
+
+        cohorts = self._cohort_classifier(patient) if self._cohort_classifier else []
+        self._cohorts_of[patient_id] = cohorts
+        for cohort_name in cohorts:
+            self._by_cohort.setdefault(cohort_name, {})[patient_id] = None
+
+    def _unindex(self, patient: dict) -> None:
+        """Remove a patient from every secondary index."""
+        patient_id = patient["patient_id"]
+
+        if patient.get("age") is not None:
+            _discard(self._by_age, patient["age"], patient_id)
+        # Another patient may have since registered the same phone/email; keep their entry
+        if patient.get("phone"):
+            _discard_owned(self._by_phone, _normalize_phone(patient["phone"]), patient_id)
+        if patient.get("email"):
+            _discard_owned(self._by_email, _normalize_email(patient["email"]), patient_id)
+        self._facts.remove(patient_id)
+
+        for name, value in self._numeric_of.pop(patient_id, {}).items():
+            self._numeric[name].remove(value, patient_id)
+
+        for cohort_name in self._cohorts_of.pop(patient_id, []):
+            _discard(self._by_cohort, cohort_name, patient_id)
+
+
+def _discard(index: Dict, key, patient_id: int) -> None:
+    """Remove a patient ID from a secondary index bucket, dropping empty buckets."""
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(patient_id, None)
+        if not bucket:
+            del index[key]
+
+def _discard_owned(index: Dict, key, patient_id: int) -> None:
+    """Remove a unique-key index entry only if it still maps to the given patient."""
+    if index.get(key) == patient_id:
+        del index[key]
+
+
+_repository: Optional[PatientRepository] = None
+
+def get_patient_repository() -> PatientRepository:
+    """
+    Get the active patient repository, building the default in-memory one on first use.
+
+    Returns:
+        PatientRepository: Repository shared by all patient and cohort tools
+    """
+    global _repository
+    if _repository is None:
+        _repository = InMemoryPatientRepository(
+            PATIENTS,
+            cohort_classifier=lambda patient: get_cohort_matcher().classify(patient),
+            cohort_version=lambda: get_cohort_catalog().version
+        )
+    return _repository
+
+def set_patient_repository(repository: PatientRepository) -> None:
+    """
+    Swap in a different repository backend for all patient and cohort tools.
+
+    Args:
+        repository: Repository implementation to use from now on
+    """
+    global _repository
+    _repository = repository
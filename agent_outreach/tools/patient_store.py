@@ -0,0 +1,171 @@
+# tools/patient_store.py
+
+from datetime import date
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from .cohort_catalog import get_cohort_catalog
+from .cohort_matcher import get_cohort_matcher
+from .intervention_rules import TEXT_OPS, extract_metrics, get_rule_engine
+from .lab_parsing import parse_patient_measurements
+
+
+class ColumnarPatientStore:
+    """
+    Columnar snapshot of the patient table for vectorized cohort and intervention filters.
+
+    Each numeric column is a float64 NumPy array with a matching boolean validity
+    mask, so rule checks such as HbA1c > 7.0 run as one boolean expression over
+    the whole panel instead of per-patient dict lookups. Intervention predicates
+    are the compiled intervention_rules of each cohort, evaluated column-wise.
+
+    Args:
+        patients: Patient records to snapshot
+        as_of: Reference date for the days-since columns (defaults to today)
+        cohort_definitions: Cohort definitions to evaluate
+        measurements: Typed lab values per patient (parsed from the records if omitted)
+    """
+
+    NUMERIC_COLUMNS = (
+        "age", "bmi", "hba1c", "fasting_glucose",
+        "days_since_last_visit", "days_since_last_screening", "family_history_count"
+    )
+
+    def __init__(self, patients: Iterable[dict], as_of: date = None, cohort_definitions: Dict[str, dict] = None,
+                 measurements: List[dict] = None):
+        self.as_of = as_of or date.today()
+        self.cohort_definitions = cohort_definitions or get_cohort_catalog().definitions
+
+        patients = list(patients)
+        if measurements is None:
+            measurements = [parse_patient_measurements(p) for p in patients]
+        self.patient_ids = np.array([p["patient_id"] for p in patients], dtype=np.int64)
+
+        raw_columns = {name: [] for name in self.NUMERIC_COLUMNS}
+        facts = []
+        for patient, typed in zip(patients, measurements):
+            metrics = extract_metrics(patient, typed, self.as_of)
+            for name in self.NUMERIC_COLUMNS:
+                raw_columns[name].append(metrics[name])
+            facts.append(metrics["facts"])
+
+        self.columns: Dict[str, np.ndarray] = {}
+        self.valid: Dict[str, np.ndarray] = {}
+        for name, values in raw_columns.items():
+            self.valid[name] = np.array([value is not None for value in values], dtype=bool)
+            self.columns[name] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+        self.facts = np.array(facts, dtype=np.str_)
+
+        # Keyword evidence per cohort from the compiled indicator matcher
+        classified = [set(get_cohort_matcher().classify(p)) for p in patients]
+        self.indicator_match: Dict[str, np.ndarray] = {
+            cohort_name: np.array([cohort_name in cohorts for cohorts in classified], dtype=bool)
+            for cohort_name in self.cohort_definitions
+        }
+
+    @classmethod
+    def from_repository(cls, repository, as_of: date = None):
+        """Snapshot every patient held by a PatientRepository, reusing its typed lab values."""
+        patients = repository.all()
+        measurements = [repository.get_measurements(p["patient_id"]) for p in patients]
+        return cls(patients, as_of=as_of, measurements=measurements)
+
+    def __len__(self) -> int:
+        return len(self.patient_ids)
+
+    def _condition_mask(self, condition: dict) -> np.ndarray:
+        """Vectorized form of one rule condition; patients missing the metric never match."""
+        metric, op, value = condition["metric"], condition["op"], condition.get("value")
+
+        if metric == "facts":
+            if op not in TEXT_OPS:
+                raise ValueError(f"Unsupported operator '{op}' for facts")
+            found = np.zeros(len(self), dtype=bool)
+            for needle in value:
+                found |= np.char.find(self.facts, str(needle).lower()) >= 0
+            return found if op == "contains_any" else ~found
+
+        if op == "missing":
+            return ~self.valid[metric]
+        column = np.nan_to_num(self.columns[metric])
+        comparisons = {">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal, "==": np.equal}
+        if op not in comparisons:
+            raise ValueError(f"Unsupported operator '{op}' for metric '{metric}'")
+        return self.valid[metric] & comparisons[op](column, value)
+
+    def _rule_mask(self, rule) -> np.ndarray:
+        """A rule holds where all of its conditions hold."""
+        mask = np.ones(len(self), dtype=bool)
+        for condition in rule.conditions:
+            mask &= self._condition_mask(condition)
+        return mask
+
+    def cohort_mask(self, cohort_name: str) -> np.ndarray:
+        """
+        Vectorized cohort classification predicate.
+
+        Membership is the key-indicator match of the cohort matcher, so it agrees
+        with triage and the repository's cohort index.
+
+        Args:
+            cohort_name: Name of the cohort
+
+        Returns:
+            np.ndarray: Boolean mask over patients likely belonging to the cohort
+        """
+        return self.indicator_match.get(cohort_name, np.zeros(len(self), dtype=bool)).copy()
+
+    def intervention_mask(self, cohort_name: str) -> np.ndarray:
+        """
+        Vectorized intervention predicate, restricted to cohort members.
+
+        Args:
+            cohort_name: Name of the cohort
+
+        Returns:
+            np.ndarray: Boolean mask over patients matching any of the cohort's intervention rules
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        for rule in get_rule_engine().rules.get(cohort_name, []):
+            mask |= self._rule_mask(rule)
+        return mask & self.cohort_mask(cohort_name)
+
+    def undetermined_mask(self, cohort_name: str) -> np.ndarray:
+        """
+        Cohort members the rules cannot decide: no rule matched and either a decisive
+        metric is missing or the cohort has intervention criteria no rule checks.
+
+        Args:
+            cohort_name: Name of the cohort
+
+        Returns:
+            np.ndarray: Boolean mask over patients that need LLM evaluation
+        """
+        engine = get_rule_engine()
+        undecidable = np.full(len(self), bool(engine.unchecked_criteria.get(cohort_name)), dtype=bool)
+        for metric in engine.decisive_metrics.get(cohort_name, []):
+            undecidable |= ~self.valid[metric]
+        return undecidable & self.cohort_mask(cohort_name) & ~self.intervention_mask(cohort_name)
+
+    def select(self, mask: np.ndarray) -> List[int]:
+        """Return the patient IDs selected by a boolean mask."""
+        return self.patient_ids[mask].tolist()
+
+    def evaluate_all(self) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Run every cohort and intervention predicate over the whole panel.
+
+        Returns:
+            dict: Per cohort, the member patient IDs, those needing intervention and
+                those the rules cannot decide
+        """
+        return {
+            cohort_name: {
+                "members": self.select(self.cohort_mask(cohort_name)),
+                "needs_intervention": self.select(self.intervention_mask(cohort_name)),
+                "undetermined": self.select(self.undetermined_mask(cohort_name))
+            }
+            for cohort_name in self.cohort_definitions
+        }
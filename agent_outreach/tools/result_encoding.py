@@ -0,0 +1,154 @@
+# tools/result_encoding.py
+
+import json
+from typing import Any, Iterable, List, Optional
+
+RESULT_FORMATS = ("json", "table")
+
+# How to get at what a truncated result left out, per producing tool
+CONTINUATIONS = {
+    "get_all_patients": "page through all of them with list_patients, passing each result's next_cursor as cursor",
+    "list_patients": "pass next_cursor as cursor for the following page, or request fewer fields",
+    "search_patients_by_supporting_facts": "narrow the search with more specific search_terms or match_all=true",
+    "query_cohorts": "narrow the expression or lower limit; list_patients with a cohort filter pages through members"
+}
+
+def continuation(tool_name: Optional[str]) -> str:
+    """Hint for reaching the rest of a truncated result of the given tool."""
+    if tool_name in CONTINUATIONS:
+        return CONTINUATIONS[tool_name]
+    if tool_name:
+        return f"call {tool_name} with narrower arguments to see the rest"
+    return "the rest was omitted"
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+def compact_record(record: dict, fields: Optional[Iterable[str]] = None, omit_nulls: bool = True) -> dict:
+    """
+    Project a record onto the requested fields and drop empty values.
+
+    Args:
+        record: Source dictionary (not modified)
+        fields: Keys to keep, in order (all keys if omitted)
+        omit_nulls: Drop None, empty strings and empty collections
+
+    Returns:
+        dict: Compact copy of the record
+    """
+    keys = fields if fields is not None else record.keys()
+    return {
+        key: record[key] for key in keys
+        if key in record and not (omit_nulls and _is_empty(record[key]))
+    }
+
+
+class ResultEncoder:
+    """
+    Token-efficient text encoding of tool results for ToolMessages.
+
+    Strings pass through unchanged. Dictionaries and lists are emitted as
+    compact JSON, or, for lists of records, as a pipe-separated table with one
+    header row. Results longer than max_chars are paginated: as many records as
+    fit are emitted together with the offset of the next page.
+
+    Args:
+        format: "json" or "table"
+        fields: Default field projection for record results (all fields if omitted)
+        omit_nulls: Drop None, empty strings and empty collections from records
+        max_chars: Maximum encoded size before paginating/truncating
+    """
+
+    def __init__(self, format: str = "json", fields: Optional[List[str]] = None, omit_nulls: bool = True,
+                 max_chars: int = 12000):
+        if format not in RESULT_FORMATS:
+            raise ValueError(f"Unknown result format '{format}'. Expected one of: {', '.join(RESULT_FORMATS)}")
+        self.format = format
+        self.fields = fields
+        self.omit_nulls = omit_nulls
+        self.max_chars = max_chars
+
+    def encode(self, result: Any, fields: Optional[List[str]] = None, offset: int = 0,
+               tool_name: Optional[str] = None) -> str:
+        """
+        Encode a tool result.
+
+        Args:
+            result: Raw tool return value
+            fields: Field projection overriding the encoder default
+            offset: Index of the first record to emit for list results
+            tool_name: Tool that produced the result, named in truncation notes
+
+        Returns:
+            str: Encoded result, never longer than max_chars (plus a short pagination note)
+        """
+        if isinstance(result, str):
+            return self._truncate(result, tool_name)
+
+        fields = fields if fields is not None else self.fields
+        if isinstance(result, dict):
+            # Cohort catalog views carry their JSON, rendered once when the catalog was built
+            rendered = getattr(result, "rendered_json", None)
+            if rendered is None or fields is not None or not self.omit_nulls:
+                rendered = self._json(self._compact(result, fields))
+            return self._truncate(rendered, tool_name)
+        if isinstance(result, (list, tuple)):
+            return self._encode_records(list(result), fields, offset, tool_name)
+        return self._truncate(str(result), tool_name)
+
+    def _compact(self, value, fields=None):
+        if isinstance(value, dict):
+            return compact_record(value, fields, self.omit_nulls)
+        return value
+
+    def _json(self, value) -> str:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def _truncate(self, text: str, tool_name: Optional[str] = None) -> str:
+        if len(text) <= self.max_chars:
+            return text
+        return (f"{text[:self.max_chars]}… [truncated {len(text) - self.max_chars} of {len(text)} chars; "
+                f"{continuation(tool_name)}]")
+
+    def _encode_records(self, records: list, fields, offset: int, tool_name: Optional[str] = None) -> str:
+        total = len(records)
+        items = [self._compact(record, fields) for record in records[offset:]]
+        use_table = self.format == "table" and items and all(isinstance(item, dict) for item in items)
+
+        if use_table:
+            columns = list(fields) if fields is not None else list(dict.fromkeys(key for item in items for key in item))
+            lines = ["|".join(columns)]
+            size = len(lines[0])
+            for item in items:
+                row = "|".join(self._cell(item.get(column)) for column in columns)
+                if len(lines) > 1 and size + len(row) + 1 > self.max_chars:
+                    break
+                lines.append(row)
+                size += len(row) + 1
+            shown = len(lines) - 1
+            body = "\n".join(lines)
+        else:
+            encoded = []
+            size = 2
+            for item in items:
+                text = self._json(item)
+                if encoded and size + len(text) + 1 > self.max_chars:
+                    break
+                encoded.append(text)
+                size += len(text) + 1
+            shown = len(encoded)
+            body = "[" + ",".join(encoded) + "]"
+
+        next_offset = offset + shown
+        if next_offset >= total:
+            return body
+        # No tool takes an offset, so point at the producing tool's own way to narrow or page
+        return f"{body}\n[showing records {offset}-{next_offset - 1} of {total}; {continuation(tool_name)}]"
+
+    def _cell(self, value) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            value = ";".join(str(item) for item in value)
+        return str(value).replace("|", "/").replace("\n", " ")
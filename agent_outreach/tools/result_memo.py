@@ -0,0 +1,217 @@
+# tools/result_memo.py
+
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, Optional
+
+from .cohort_catalog import get_cohort_catalog
+from .content_hash import patient_content_hash
+from .patient_repository import get_patient_repository
+
+MEMO_BACKENDS = ("off", "memory", "sqlite")
+
+
+class ResultMemo:
+    """
+    Memo of per-patient cohort tool results keyed by content, not identity.
+
+    A result is stored under (function, patient content hash, extra arguments,
+    cohort catalog version, date), so re-running a tool on an unchanged record
+    returns the stored result and any change to the record, swap of the
+    cohort catalog or change of day is a miss. The date is part of the key
+    because rule decisions read days-since metrics relative to today.
+    Entries of different catalog versions and dates can coexist (runs pinned
+    to an older version keep hitting theirs); stale ones simply age out of
+    the LRU, in memory and on disk.
+
+    Memoized results are shared between callers and must be treated as read-only.
+
+    Args:
+        max_entries: In-memory entries kept before the least recently used are evicted
+        path: Optional SQLite file persisting results across processes
+        max_disk_entries: Rows kept in the SQLite file before the least recently used are evicted
+    """
+
+    def __init__(self, max_entries: int = 4096, path: Optional[str] = None, max_disk_entries: int = 100000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.path = path
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, object]" = OrderedDict()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_memo ("
+                "key TEXT PRIMARY KEY, definitions_version TEXT NOT NULL, value TEXT NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS result_memo_accessed ON result_memo (accessed_at)")
+            self._conn.commit()
+
+
+    def invalidate(self) -> None:
+        """Drop every memoized result."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM result_memo")
+                self._conn.commit()
+
+    def call(self, name: str, func: Callable, patient_data: dict, *args, **kwargs):
+        """
+        Return func(patient_data, *args, **kwargs), computing it only on a memo miss.
+
+        Args:
+            name: Function name the result and hit counters are recorded under
+            func: Tool taking patient_data first and JSON-serializable arguments after it
+        """
+        version = get_cohort_catalog().version
+        extra = json.dumps([args, kwargs], sort_keys=True, default=str) if args or kwargs else ""
+        key = f"{name}:{version}:{date.today().isoformat()}:{self._content_hash(patient_data)}:{extra}"
+        found, value = self._get(name, key)
+        if not found:
+            value = func(patient_data, *args, **kwargs)
+            self._put(key, version, value)
+        return value
+
+    @staticmethod
+    def _content_hash(patient_data: dict) -> str:
+        """Content hash, reusing the repository's when patient_data is its stored record."""
+        repository = get_patient_repository()
+        patient_id = patient_data.get("patient_id") if isinstance(patient_data, dict) else None
+        if patient_id is not None and repository.get(patient_id) is patient_data:
+            content_hash = repository.get_content_hash(patient_id)
+            if content_hash is not None:
+                return content_hash
+        return patient_content_hash(patient_data)
+
+    def _get(self, name: str, key: str):
+        """(found, value) from memory, then disk, counting the lookup under name."""
+        with self._lock:
+            counters = self._counters.setdefault(name, {"hits": 0, "misses": 0, "disk_hits": 0})
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                counters["hits"] += 1
+                return True, self._entries[key]
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value FROM result_memo WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE result_memo SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                    self._conn.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    counters["hits"] += 1
+                    counters["disk_hits"] += 1
+                    return True, value
+            counters["misses"] += 1
+            return False, None
+
+    def _put(self, key: str, version: str, value) -> None:
+        with self._lock:
+            self._remember(key, value)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO result_memo (key, definitions_version, value, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, version, json.dumps(value, default=str), time.time())
+                )
+                overflow = self._disk_size() - self.max_disk_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM result_memo WHERE key IN "
+                        "(SELECT key FROM result_memo ORDER BY accessed_at LIMIT ?)",
+                        (overflow,)
+                    )
+                self._conn.commit()
+
+    def _remember(self, key: str, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_size(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM result_memo").fetchone()[0]
+
+    def get_stats(self) -> dict:
+        """Return overall and per-function hit counters."""
+        hits = sum(counters["hits"] for counters in self._counters.values())
+        misses = sum(counters["misses"] for counters in self._counters.values())
+        by_function = {}
+        for name, counters in self._counters.items():
+            lookups = counters["hits"] + counters["misses"]
+            by_function[name] = dict(counters, hit_rate=round(counters["hits"] / lookups, 3) if lookups else 0.0)
+        return {
+            "size": len(self),
+            "hits": hits,
+            "misses": misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "definitions_version": get_cohort_catalog().version,
+            "by_function": by_function
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_memo: Optional[ResultMemo] = None
+_memo_configured = False
+
+def get_result_memo() -> Optional[ResultMemo]:
+    """
+    Get the shared result memo, configured from the environment on first use.
+
+    RESULT_MEMO selects the backend ("off", "memory" (default) or "sqlite"),
+    RESULT_MEMO_PATH the sqlite file and RESULT_MEMO_MAX_ENTRIES the in-memory
+    size bound.
+    """
+    global _memo, _memo_configured
+    if not _memo_configured:
+        backend = os.getenv("RESULT_MEMO", "memory").lower()
+        if backend not in MEMO_BACKENDS:
+            raise ValueError(f"Unknown result memo backend '{backend}'. Expected one of: {', '.join(MEMO_BACKENDS)}")
+        max_entries = os.getenv("RESULT_MEMO_MAX_ENTRIES")
+        if backend != "off":
+            _memo = ResultMemo(
+                max_entries=int(max_entries) if max_entries else 4096,
+                path=os.getenv("RESULT_MEMO_PATH", ".result_memo.sqlite") if backend == "sqlite" else None
+            )
+        _memo_configured = True
+    return _memo
+
+def set_result_memo(memo: Optional[ResultMemo]):
+    """Replace the shared result memo (None disables memoization)."""
+    global _memo, _memo_configured
+    _memo, _memo_configured = memo, True
+
+def memoized(name: str) -> Callable:
+    """
+    Decorator routing a per-patient tool through the shared result memo.
+
+    The memo is looked up on every call, so set_result_memo() takes effect
+    for tools that were decorated at import time.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(patient_data: dict, *args, **kwargs):
+            memo = get_result_memo()
+            if memo is None:
+                return func(patient_data, *args, **kwargs)
+            return memo.call(name, func, patient_data, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,135 @@
+# tools/results_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+
+class ResultsStore:
+    """
+    Persistent per-patient outcomes of committed workflow runs (SQLite).
+
+    Each row records the patient's content hash, the cohort definitions
+    version, the date it was evaluated as of and the date it stays valid until,
+    so an incremental run only re-evaluates patients whose record or definitions
+    changed, or whose days-since metrics crossed a rule threshold. Results of a run are staged
+    and written in one transaction by commit_run(), which also records the run
+    as the new watermark; an interrupted run leaves the previous results intact.
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path: str = ".outreach_results.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "  run_id TEXT PRIMARY KEY, mode TEXT, definitions_version TEXT,"
+            "  committed_at REAL, evaluated INTEGER, reused INTEGER);"
+            "CREATE TABLE IF NOT EXISTS patient_results ("
+            "  patient_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, definitions_version TEXT NOT NULL,"
+            "  run_id TEXT NOT NULL, result TEXT NOT NULL, updated_at REAL NOT NULL, as_of TEXT, valid_until TEXT);"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(patient_results)")}
+        if "as_of" not in columns:
+            # Databases from before as_of was recorded; their rows are re-evaluated once
+            self._conn.execute("ALTER TABLE patient_results ADD COLUMN as_of TEXT")
+        if "valid_until" not in columns:
+            # Rows from before valid_until was recorded were only valid on the date they were evaluated as of
+            self._conn.execute("ALTER TABLE patient_results ADD COLUMN valid_until TEXT")
+            self._conn.execute("UPDATE patient_results SET valid_until = date(as_of, '+1 day') WHERE as_of IS NOT NULL")
+        self._conn.commit()
+
+    @staticmethod
+    def new_run_id() -> str:
+        return f"run-{int(time.time())}-{uuid.uuid4().hex[:8]}"
+
+    def load_results(self) -> Dict[str, dict]:
+        """
+        Results of the last committed runs.
+
+        Returns:
+            dict: Patient ID (as string) to {"content_hash", "definitions_version", "as_of", "valid_until",
+                "run_id", "result"}; valid_until is None for results only a record or definitions change invalidates
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT patient_id, content_hash, definitions_version, as_of, valid_until, run_id, result "
+                "FROM patient_results"
+            ).fetchall()
+        return {
+            patient_id: {
+                "content_hash": content_hash,
+                "definitions_version": definitions_version,
+                "as_of": as_of,
+                "valid_until": valid_until,
+                "run_id": run_id,
+                "result": json.loads(result)
+            }
+            for patient_id, content_hash, definitions_version, as_of, valid_until, run_id, result in rows
+        }
+
+    def last_committed_run(self) -> Optional[dict]:
+        """The watermark: most recently committed run, or None before the first one."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, mode, definitions_version, committed_at, evaluated, reused "
+                "FROM runs ORDER BY committed_at DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("run_id", "mode", "definitions_version", "committed_at", "evaluated", "reused")
+        return dict(zip(keys, row))
+
+    def commit_run(self, run_id: str, mode: str, definitions_version: str, results: Dict[str, dict],
+                   removed: List[str] = (), reused: int = 0) -> None:
+        """
+        Atomically write a run's re-evaluated results and record it as committed.
+
+        Args:
+            run_id: Run identifier
+            mode: Workflow mode that produced the results
+            definitions_version: Cohort definitions version the run evaluated under
+            results: Patient ID (string) to {"content_hash", "as_of", "valid_until", "result"} for re-evaluated patients
+            removed: Patient IDs no longer in the repository
+            reused: Number of patients whose previous results were reused
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO patient_results "
+                "(patient_id, content_hash, definitions_version, run_id, result, updated_at, as_of, valid_until) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (patient_id, row["content_hash"], definitions_version, run_id, json.dumps(row["result"]), now,
+                     row["as_of"], row.get("valid_until"))
+                    for patient_id, row in results.items()
+                ]
+            )
+            self._conn.executemany("DELETE FROM patient_results WHERE patient_id = ?", [(pid,) for pid in removed])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, mode, definitions_version, committed_at, evaluated, reused) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, mode, definitions_version, now, len(results), reused)
+            )
+
+
+_store: Optional[ResultsStore] = None
+
+def get_results_store() -> ResultsStore:
+    """Get the shared results store at OUTREACH_RESULTS_DB (default .outreach_results.sqlite)."""
+    global _store
+    if _store is None:
+        _store = ResultsStore(os.getenv("OUTREACH_RESULTS_DB", ".outreach_results.sqlite"))
+    return _store
+
+def set_results_store(store: ResultsStore) -> None:
+    """Replace the shared results store (e.g. with a temporary database)."""
+    global _store
+    _store = store
@@ -0,0 +1,45 @@
+# tools/sorted_index.py
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterator, List, Optional, Tuple
+
+
+class SortedIndex:
+    """
+    Secondary index keeping (value, patient_id) pairs in sorted order.
+
+    Range queries locate both ends by binary search and yield patient IDs
+    lazily in ascending value order, so their cost is O(log n + matches).
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[float, int]] = []
+
+    def add(self, value: float, patient_id: int) -> None:
+        insort(self._entries, (value, patient_id))
+
+    def remove(self, value: float, patient_id: int) -> None:
+        index = bisect_left(self._entries, (value, patient_id))
+        if index < len(self._entries) and self._entries[index] == (value, patient_id):
+            del self._entries[index]
+
+    def range(self, low: Optional[float] = None, high: Optional[float] = None) -> Iterator[int]:
+        """
+        Yield patient IDs whose value lies in [low, high] (either bound optional).
+
+        Both ends are located when iteration starts; the index should not be
+        modified while a range is being consumed.
+        """
+        start = 0 if low is None else bisect_left(self._entries, (low, float("-inf")))
+        stop = len(self._entries) if high is None else bisect_right(self._entries, (high, float("inf")))
+        for index in range(start, min(stop, len(self._entries))):
+            yield self._entries[index][1]
+
+    def count(self, low: Optional[float] = None, high: Optional[float] = None) -> int:
+        """Number of entries in [low, high] without materializing them."""
+        start = 0 if low is None else bisect_left(self._entries, (low, float("-inf")))
+        stop = len(self._entries) if high is None else bisect_right(self._entries, (high, float("inf")))
+        return max(0, stop - start)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,114 @@
+# tools/triage.py
+
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional
+
+from .cohort_catalog import get_cohort_catalog
+from .cohort_matcher import get_cohort_matcher
+from .intervention_rules import INTERVENE, NO_INTERVENTION, RuleDecision, extract_metrics, get_rule_engine
+
+# Paths a patient can take through the hybrid workflow
+RULES_REMINDER = "rules_reminder"
+RULES_NO_ACTION = "rules_no_action"
+LLM_REVIEW = "llm_review"
+# Rule-decided reminder held for LLM validation because auto_send_rule_reminders is off
+RULES_REMINDER_REVIEW = "rules_reminder_review"
+# Incremental runs: unchanged patient whose previous committed result was reused
+REUSED_RESULT = "reused"
+# Paths that hand the patient to the LLM
+REVIEW_PATHS = (LLM_REVIEW, RULES_REMINDER_REVIEW)
+
+
+class TriageResult(NamedTuple):
+    """Deterministic pre-classification of one patient."""
+    patient_id: int
+    cohorts: List[str]
+    decisions: Dict[str, RuleDecision]
+    path: str
+    reminder_type: Optional[str]
+    # Highest-priority suggested cohort (the one the reminder is for on the reminder path)
+    cohort: Optional[str]
+    # Interventions other intervening cohorts called for, which the single reminder does not cover
+    other_interventions: List[dict]
+    # First date a days-since metric may change the decisions (None: only a record or definitions change can)
+    valid_until: Optional[date] = None
+
+    def outcome(self) -> dict:
+        """JSON-serializable outcome persisted in the results table."""
+        return {
+            "path": self.path,
+            "cohort": self.cohort,
+            "cohorts": self.cohorts,
+            "reminder_type": self.reminder_type,
+            "other_interventions": self.other_interventions,
+            "decisions": {name: decision.decision for name, decision in self.decisions.items()}
+        }
+
+    def evidence(self) -> dict:
+        """Pre-computed evidence handed to the LLM for patients it has to review."""
+        return {
+            "patient_id": self.patient_id,
+            "suggested_cohorts": self.cohorts,
+            "rule_decisions": {
+                name: {
+                    "decision": decision.decision,
+                    "matched_criteria": decision.matched_criteria,
+                    "missing_metrics": decision.missing_metrics,
+                    "unchecked_criteria": decision.unchecked_criteria
+                }
+                for name, decision in self.decisions.items()
+            },
+            # Reminder the rules recommend, for the reviewer to validate before sending
+            "rule_recommendation": (
+                {"cohort": self.cohort, "reminder_type": self.reminder_type, "also_indicated": self.other_interventions}
+                if self.path == RULES_REMINDER else None
+            )
+        }
+
+
+def by_priority(cohort_names: List[str]) -> List[str]:
+    """Cohort names ordered by their definition's priority (lower first), then by name."""
+    catalog = get_cohort_catalog()
+    return sorted(cohort_names, key=lambda name: ((catalog.get(name) or {}).get("priority", float("inf")), name))
+
+
+def triage_patient(patient: dict, measurements: dict = None, as_of: date = None) -> TriageResult:
+    """
+    Classify a patient and evaluate intervention rules without an LLM.
+
+    A patient takes the reminder fast path when any cohort's rules say "intervene"
+    (the highest-priority intervening cohort picks the reminder; the others are
+    reported in other_interventions),
+    the no-action fast path when every suggested cohort says "no_intervention",
+    and is left for LLM review otherwise (no cohort matched, rules undetermined,
+    or intervention criteria no rule checks).
+
+    Args:
+        patient: Patient dictionary
+        measurements: Typed lab values (parsed from the record if omitted)
+        as_of: Reference date for the days-since metrics (defaults to today)
+
+    Returns:
+        TriageResult: Suggested cohorts, per-cohort rule decisions and chosen path
+    """
+    as_of = as_of or date.today()
+    cohorts = get_cohort_matcher().classify(patient)
+    engine = get_rule_engine()
+    metrics = extract_metrics(patient, measurements, as_of) if cohorts else {}
+    decisions = {name: engine.decide(metrics, name) for name in cohorts}
+
+    intervene = [decisions[name] for name in by_priority(list(decisions)) if decisions[name].decision == INTERVENE]
+    other_interventions = []
+    if intervene:
+        path, reminder_type, cohort = RULES_REMINDER, intervene[0].recommended_intervention, intervene[0].cohort
+        other_interventions = [
+            {"cohort": decision.cohort, "reminder_type": decision.recommended_intervention}
+            for decision in intervene[1:]
+        ]
+    elif decisions and all(decision.decision == NO_INTERVENTION for decision in decisions.values()):
+        path, reminder_type, cohort = RULES_NO_ACTION, None, by_priority(cohorts)[0]
+    else:
+        path, reminder_type, cohort = LLM_REVIEW, None, None
+
+    return TriageResult(patient["patient_id"], cohorts, decisions, path, reminder_type, cohort, other_interventions,
+                        engine.valid_until(metrics, cohorts, as_of))
@@ -5,6 +5,8 @@ This module provides centralized exception handling and error management
 to keep the main workflow logic clean and focused.
 """
 
+import asyncio
+import inspect
 import traceback
 import sys
 from typing import Callable, Any, Dict, Optional
@@ -123,6 +125,8 @@ class ExceptionHandler:
             WorkflowLogger.print_info("Install python-dotenv: pip install python-dotenv")
         elif "rich" in error_str:
             WorkflowLogger.print_info("Install Rich: pip install rich")
+        elif "numpy" in error_str:
+            WorkflowLogger.print_info("Install NumPy: pip install numpy")
         else:
             WorkflowLogger.print_info("Make sure all dependencies are installed: pip install -r requirements.txt")
         
@@ -160,6 +164,24 @@ def safe_execute(operation_name: str = "operation"):
         return wrapper
     return decorator
 
+def async_safe_execute(operation_name: str = "operation"):
+    """Async counterpart of safe_execute for coroutine node functions."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            try:
+                return await func(*args, **kwargs)
+            except ToolExecutionError as e:
+                WorkflowLogger.print_error(f"{operation_name} failed: {str(e)}")
+                raise
+            except LLMCallError as e:
+                WorkflowLogger.print_error(f"{operation_name} failed: {str(e)}")
+                raise
+            except Exception as e:
+                ExceptionHandler.handle_general_exception(e, operation_name)
+        return wrapper
+    return decorator
+
 def safe_tool_execution(tool_name: str, tool_func: Callable, tool_args: Dict) -> tuple[bool, Any]:
     """Safely execute a tool and return success status and result."""
     try:
@@ -172,6 +194,18 @@ def safe_tool_execution(tool_name: str, tool_func: Callable, tool_args: Dict) ->
         error_msg = ExceptionHandler.handle_tool_execution_error(tool_name, e, tool_args)
         return False, error_msg
 
+async def async_safe_tool_execution(tool_name: str, tool_func: Callable, tool_args: Dict) -> tuple[bool, Any]:
+    """Async counterpart of safe_tool_execution; sync tools run in a worker thread."""
+    try:
+        if inspect.iscoroutinefunction(tool_func):
+            result = await tool_func(**(tool_args or {}))
+        else:
+            result = await asyncio.to_thread(tool_func, **(tool_args or {}))
+        return True, result
+    except Exception as e:
+        error_msg = ExceptionHandler.handle_tool_execution_error(tool_name, e, tool_args)
+        return False, error_msg
+
 class ErrorHandlingContext:
     """Context manager for workflow execution with proper exception handling."""
     
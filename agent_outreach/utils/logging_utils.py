@@ -5,6 +5,7 @@ This module provides clean, formatted output functions to separate
 presentation logic from business logic.
 """
 
+import json
 import traceback
 from rich.console import Console
 from rich.panel import Panel
@@ -72,6 +73,33 @@ class WorkflowLogger:
         print(content)
         print("=" * 80)
     
+    @staticmethod
+    def print_llm_decisions(content: str):
+        """Print the compact JSON decisions of the lean prompt profile, one line per patient."""
+        if not content:
+            return
+        try:
+            decisions = json.loads(content).get("decisions")
+        except (ValueError, AttributeError):
+            decisions = None
+        WorkflowLogger.print_section("🧾 LLM DECISIONS:")
+        if not isinstance(decisions, list):
+            print(content)
+            return
+        for decision in decisions:
+            if isinstance(decision, dict):
+                print(f"   • Patient {decision.get('patient_id')}: {decision.get('cohort') or 'no cohort'} → "
+                      f"{decision.get('action') or 'none'} [{decision.get('code')}]")
+    
+    @staticmethod
+    def print_llm_usage(usage: dict):
+        """Print the LLM calls, tokens and time of a run."""
+        calls = usage.get("llm_calls", 0)
+        print(f"\n⏱️ LLM USAGE: {calls} call(s), {usage.get('prompt_tokens', 0)} prompt / "
+              f"{usage.get('completion_tokens', 0)} completion tokens, {usage.get('llm_ms', 0) / 1000:.2f}s in LLM calls")
+        if calls:
+            print(f"   • {usage.get('completion_tokens', 0) / calls:.0f} completion tokens per call")
+    
     @staticmethod
     def print_tool_calls(tool_calls: list):
         """Print tool calls in a formatted way."""
@@ -145,10 +173,73 @@ class WorkflowLogger:
         print(f"   ⚠️  WARNING: Patient {patient_id} {issue}")
     
     @staticmethod
-    def print_graph_architecture():
+    def print_path_counts(path_counts: dict):
+        """Print how many patients took each path through the workflow."""
+        print("\n🚦 PATIENT ROUTING:")
+        for path, count in path_counts.items():
+            print(f"   • {path}: {count} patient(s)")
+    
+    @staticmethod
+    def print_tool_call_dedup(counts: dict):
+        """Print how many repeated tool calls were coalesced or blocked."""
+        print(f"\n🔁 REPEATED TOOL CALLS: {counts.get('coalesced', 0)} coalesced (read-only), "
+              f"{counts.get('duplicates_blocked', 0)} duplicate side-effecting call(s) blocked")
+    
+    @staticmethod
+    def print_cache_stats(name: str, stats: dict):
+        """Print hit/miss counters of a cache."""
+        print(f"\n🗄️ {name.upper()} CACHE: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+              f"hit rate {stats['hit_rate']:.0%}, {stats['size']} entries, {stats['evictions']} evicted")
+        for function_name, counters in stats.get("by_function", {}).items():
+            print(f"   • {function_name}: {counters['hits']} hit(s), {counters['misses']} miss(es), "
+                  f"hit rate {counters['hit_rate']:.0%}")
+    
+    @staticmethod
+    def print_batch_stats(stats: dict):
+        """Print the throughput of batched LLM classification."""
+        print(f"\n📦 BATCH CLASSIFICATION: {stats['patients']} patient(s) in {stats['batches']} batch(es), "
+              f"{stats['llm_calls']} LLM call(s) → {stats['patients_per_call']} patients/call")
+        print(f"   • {stats['retried_items']} item(s) retried, {stats['unresolved']} unresolved, "
+              f"{stats['completion_tokens']} completion tokens")
+    
+    @staticmethod
+    def print_graph_architecture(mode: str = "standard", planning: str = "always", prefetch: str = "off"):
         """Print the workflow architecture diagram."""
+        planning_step = {
+            "always": "Planning → ",
+            "off": "",
+            "cached": "Planning (cached) → ",
+            "parallel": "Planning ∥ Prefetch → "
+        }[planning]
+        if prefetch != "off" and planning != "parallel":
+            planning_step = "Prefetch → " + planning_step
         WorkflowLogger.print_subsection("🏗️ WORKFLOW ARCHITECTURE:")
-        print("START → Planning → LLM (with reasoning)")
+        if mode == "fan_out":
+            print("START → Send × N patient batches (bounded concurrency)")
+            print("          ↓")
+            print("  review_patients: LLM ⇄ Tools per batch")
+            print("          ↓")
+            print("  Summarize (merge cohorts) → END")
+            print("=" * 50)
+            return
+        if mode == "batch":
+            print("START → Pre-classification (rules) → END (all patients decided)")
+            print("         ↓ (ambiguous patients only)")
+            print("      Batch classification: N patients per structured-output LLM call")
+            print("         ↓ (retry only items that fail validation)")
+            print("      Reminders → END")
+            print("=" * 50)
+            return
+        if mode == "hybrid":
+            print("START → Pre-classification (rules) → END (all patients decided)")
+            print("         ↓ (ambiguous patients only)")
+            print(f"      {planning_step}LLM (with reasoning)")
+        elif mode == "incremental":
+            print("START → Incremental pre-classification (changed patients only) → Commit results → END")
+            print("         ↓ (ambiguous changed patients only)")
+            print(f"      {planning_step}LLM (with reasoning) → ... → Commit results")
+        else:
+            print(f"START → {planning_step}LLM (with reasoning)")
         print("                     ↓")
         print("                 Router")
         print("                ↙      ↘")
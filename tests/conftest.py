@@ -0,0 +1,5 @@
+import os
+
+# WorkflowNodes builds its OpenAI client on construction; no request is made in these tests
+if not os.environ.get("OPENAI_API_KEY"):
+    os.environ["OPENAI_API_KEY"] = "test-key"
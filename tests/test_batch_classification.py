@@ -0,0 +1,42 @@
+import json
+
+from agent_outreach.nodes.batch_classification import parse_decisions, plan_batches
+from agent_outreach.tools.cohort_catalog import get_cohort_catalog
+
+
+def summary(patient_id, padding=0):
+    return {"patient": {"patient_id": patient_id, "notes": "x" * padding}, "suggested_cohorts": [], "rules": {}}
+
+
+def test_plan_batches_respects_max_batch_size():
+    batches = plan_batches([summary(i) for i in range(7)], context_tokens=100000, prompt_tokens=0, max_batch_size=3)
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+
+def test_plan_batches_respects_token_budget_and_isolates_oversized_items():
+    # A 600-token budget (60% of 1000) fits both small items with their output allowance, not the 8000-char one
+    small = [summary(1), summary(2)]
+    batches = plan_batches(small + [summary(3, padding=8000)] + [summary(4)], context_tokens=1000, prompt_tokens=0)
+    assert [[item["patient"]["patient_id"] for item in batch] for batch in batches] == [[1, 2], [3], [4]]
+
+
+def test_parse_decisions_accepts_valid_items_and_retries_the_rest():
+    content = json.dumps({"decisions": [
+        {"patient_id": 1, "cohort": "diabetic", "needs_intervention": True, "intervention_type": "routine_followup"},
+        {"patient_id": 2, "cohort": "none", "needs_intervention": False},
+        {"patient_id": 3, "cohort": "astrology", "needs_intervention": False},
+        {"patient_id": 4, "cohort": "obesity", "needs_intervention": True, "intervention_type": "hba1c_testing"},
+        {"patient_id": 5, "needs_intervention": "maybe"},
+        {"patient_id": 99, "cohort": "diabetic", "needs_intervention": False},
+        {"patient_id": 1, "cohort": "obesity", "needs_intervention": False}
+    ]})
+    accepted, retry = parse_decisions(content, [1, 2, 3, 4, 5], get_cohort_catalog())
+    assert sorted(accepted) == [1, 2]
+    assert accepted[1].cohort == "diabetic"
+    assert accepted[2].cohort is None
+    assert retry == [3, 4, 5]
+
+
+def test_parse_decisions_retries_everything_on_malformed_output():
+    accepted, retry = parse_decisions("not json", [1, 2], get_cohort_catalog())
+    assert accepted == {} and retry == [1, 2]
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from agent_outreach.tools import cohort_bitmaps
+from agent_outreach.tools.cohort_bitmaps import Bitmap, CohortBitmapIndex, get_cohort_bitmap_index, merge_packed
+from agent_outreach.tools.fire_reminder import get_contact_log_version, get_contacts_since, record_contact
+from agent_outreach.tools.patient_repository import get_patient_repository
+
+
+def packed(*ordinals):
+    return Bitmap.from_ordinals(ordinals).to_bytes()
+
+def members(data):
+    return Bitmap.from_bytes(data).ordinals().tolist()
+
+
+def test_bitmap_set_operations_on_different_lengths():
+    left, right = Bitmap.from_ordinals([0, 3, 9]), Bitmap.from_ordinals([3, 20])
+    assert (left & right).ordinals().tolist() == [3]
+    assert (left | right).ordinals().tolist() == [0, 3, 9, 20]
+    assert (left - right).ordinals().tolist() == [0, 9]
+    assert len(left | right) == 4
+
+
+def test_merge_packed_unions_by_name():
+    merged = merge_packed({"diabetic": packed(0)}, {"diabetic": packed(2), "obesity": packed(1)})
+    assert members(merged["diabetic"]) == [0, 2]
+    assert members(merged["obesity"]) == [1]
+
+
+def test_merge_packed_applies_removal_masks_before_unions():
+    left = {"diabetic": packed(0, 1), "obesity": packed(2), "diabetic:needs_intervention": packed(1)}
+    # Patient 1 was reviewed and moved from diabetic to obesity
+    right = {"-diabetic": packed(1), "-obesity": packed(1), "obesity": packed(1)}
+    merged = merge_packed(left, right)
+    assert members(merged["diabetic"]) == [0]
+    assert members(merged["obesity"]) == [1, 2]
+    assert members(merged["diabetic:needs_intervention"]) == [1]
+    assert not any(name.startswith("-") for name in merged)
+
+
+def test_contacts_since_returns_new_contacts_only():
+    version = get_contact_log_version()
+    assert get_contacts_since(version) == {}
+    record_contact(1)
+    record_contact(2)
+    assert set(get_contacts_since(version)) == {1, 2}
+    assert set(get_contacts_since(version + 1)) == {2}
+
+
+def test_new_contact_updates_only_the_contacted_flag():
+    index = get_cohort_bitmap_index()
+    cohorts_before = {name: bitmap.to_bytes() for name, bitmap in index.bitmaps.items() if "contacted" not in name}
+    patient_id = get_patient_repository().all()[-1]["patient_id"]
+
+    with mock.patch.object(cohort_bitmaps.CohortBitmapIndex, "build", side_effect=AssertionError("rebuilt")):
+        record_contact(patient_id)
+        updated = get_cohort_bitmap_index()
+
+    assert updated is index
+    assert patient_id in updated.patient_ids(updated.query("contacted_in_30_days"))
+    assert {name: bitmap.to_bytes() for name, bitmap in updated.bitmaps.items()
+            if "contacted" not in name} == cohorts_before
+
+
+def test_contacts_outside_the_window_are_not_flagged():
+    repository = get_patient_repository()
+    recent, old = repository.all()[0]["patient_id"], repository.all()[1]["patient_id"]
+    now = datetime.now()
+    index = CohortBitmapIndex.build(repository, contact_log={recent: now - timedelta(days=2)})
+    index.apply_contacts(repository, {old: now - timedelta(days=45)})
+    assert index.patient_ids(index.query("contacted_in_30_days")) == [recent]
+
+
+def test_contacts_age_out_of_the_flag_without_a_rebuild():
+    patient_id = get_patient_repository().all()[0]["patient_id"]
+    as_of = datetime(2031, 3, 1, 10, 0)
+    record_contact(patient_id, as_of - timedelta(days=30, hours=-1))
+    index = get_cohort_bitmap_index(as_of=as_of)
+    assert patient_id in index.patient_ids(index.query("contacted_in_30_days"))
+
+    with mock.patch.object(cohort_bitmaps.CohortBitmapIndex, "build", side_effect=AssertionError("rebuilt")):
+        later = get_cohort_bitmap_index(as_of=as_of + timedelta(hours=2))
+
+    assert later is index
+    assert patient_id not in later.patient_ids(later.query("contacted_in_30_days"))
+    assert later.contacts_expire_at is None or later.contacts_expire_at > as_of + timedelta(hours=2)
+
+
+def test_index_is_rebuilt_when_the_date_changes():
+    as_of = datetime(2031, 3, 1, 10, 0)
+    index = get_cohort_bitmap_index(as_of=as_of)
+    assert get_cohort_bitmap_index(as_of=as_of + timedelta(days=1)) is not index
@@ -0,0 +1,46 @@
+from agent_outreach.tools.cohort_definitions import COHORT_DEFINITIONS
+from agent_outreach.tools.cohort_matcher import CohortMatcher, classify_many
+from agent_outreach.tools.mock_data import PATIENTS
+
+
+def naive_classify(patient, definitions):
+    """The cohorts x indicators x facts loop the matcher replaced."""
+    facts = [fact.lower() for fact in patient.get("supporting_facts", [])]
+    return [
+        name for name, info in definitions.items()
+        if any(indicator.lower() in fact for indicator in info.get("key_indicators", []) for fact in facts)
+    ]
+
+
+def test_matcher_agrees_with_substring_search_on_the_mock_panel():
+    matcher = CohortMatcher(COHORT_DEFINITIONS)
+    for patient in PATIENTS:
+        assert matcher.classify(patient) == naive_classify(patient, COHORT_DEFINITIONS)
+
+
+def test_matcher_agrees_on_overlapping_and_case_varied_indicators():
+    definitions = {
+        "a": {"key_indicators": ["diabetes", "Type 2 Diabetes"]},
+        "b": {"key_indicators": ["betes mel"]},
+        "c": {"key_indicators": ["apnea"]}
+    }
+    patients = [
+        {"supporting_facts": ["TYPE 2 DIABETES mellitus"]},
+        {"supporting_facts": ["Sleep Apnea"]},
+        {"supporting_facts": ["diabe", "tes"]},
+        {"supporting_facts": []}
+    ]
+    matcher = CohortMatcher(definitions)
+    for patient in patients:
+        assert matcher.classify(patient) == naive_classify(patient, definitions)
+
+
+def test_indicators_never_match_across_fact_boundaries():
+    matcher = CohortMatcher({"a": {"key_indicators": ["high risk"]}})
+    assert matcher.find_indicators(["very high", "risk score"]) == {}
+    assert matcher.find_indicators(["High Risk family"]) == {"a": ["high risk"]}
+
+
+def test_classify_many_keys_results_by_patient_id():
+    result = classify_many(PATIENTS)
+    assert set(result) == {patient["patient_id"] for patient in PATIENTS}
@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+from agent_outreach.tools.cohort_catalog import (
+    get_active_cohort_catalog,
+    get_cohort_catalog,
+    pinned_cohort_catalog,
+    set_cohort_catalog,
+)
+from agent_outreach.tools.cohort_definitions import COHORT_DEFINITIONS
+from agent_outreach.tools.cohort_source import CohortDefinitionSource, validate_cohort_definitions
+from agent_outreach.tools.patient_repository import get_patient_repository
+
+
+@pytest.fixture(autouse=True)
+def restore_catalog():
+    catalog = get_active_cohort_catalog()
+    yield
+    set_cohort_catalog(catalog)
+    get_patient_repository().reindex_cohorts()
+
+
+def write_definitions(path, definitions, bump_mtime=0):
+    path.write_text(json.dumps(definitions))
+    if bump_mtime:
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_mtime))
+
+
+def with_priority(priority):
+    name = next(iter(COHORT_DEFINITIONS))
+    return {**COHORT_DEFINITIONS, name: {**COHORT_DEFINITIONS[name], "priority": priority}}
+
+
+def test_builtin_definitions_are_valid():
+    assert validate_cohort_definitions(COHORT_DEFINITIONS) == []
+
+
+def test_validation_reports_shape_and_rule_problems():
+    name = next(iter(COHORT_DEFINITIONS))
+    cohort = {**COHORT_DEFINITIONS[name], "key_indicators": "diabetes", "decisive_metrics": ["shoe_size"]}
+    problems = validate_cohort_definitions({name: cohort})
+    assert any("'key_indicators' must be a list" in problem for problem in problems)
+
+    cohort = {**COHORT_DEFINITIONS[name], "decisive_metrics": ["shoe_size"], "intervention_rules": [
+        {"criterion": "not a criterion", "conditions": [{"metric": "hba1c", "op": "~", "value": 1}]}
+    ]}
+    problems = validate_cohort_definitions({name: cohort})
+    assert any("unknown decisive metric 'shoe_size'" in problem for problem in problems)
+    assert any("is not one of the intervention_criteria" in problem for problem in problems)
+    assert any("unknown operator '~'" in problem for problem in problems)
+    assert validate_cohort_definitions([]) != []
+
+
+def test_reload_swaps_catalog_only_when_the_file_changes(tmp_path):
+    path = tmp_path / "cohorts.json"
+    write_definitions(path, with_priority(1))
+    source = CohortDefinitionSource(str(path))
+    first = source.load()
+    assert get_active_cohort_catalog() is first
+    assert source.reload_if_changed() is False
+
+    write_definitions(path, with_priority(2), bump_mtime=1_000_000)
+    assert source.reload_if_changed() is True
+    assert get_active_cohort_catalog().version != first.version
+    assert source.reloads == 2
+
+
+def test_invalid_files_keep_the_current_catalog(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "cohorts.yaml"
+    path.write_text(json.dumps(with_priority(1)))
+    source = CohortDefinitionSource(str(path))
+    catalog = source.load()
+
+    path.write_text("cohort: [unclosed\n  - list")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert source.reload_if_changed() is False
+    assert "Invalid YAML" in source.last_error
+    assert get_active_cohort_catalog() is catalog
+
+    path.write_text("diabetic: not a mapping\n")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2_000_000))
+    assert source.reload_if_changed() is False
+    assert "definition must be a mapping" in source.last_error
+    assert get_active_cohort_catalog() is catalog
+
+
+def test_pinned_catalog_survives_a_reload(tmp_path):
+    path = tmp_path / "cohorts.json"
+    write_definitions(path, with_priority(1))
+    source = CohortDefinitionSource(str(path))
+    original = source.load()
+
+    with pinned_cohort_catalog() as pinned:
+        assert pinned is original
+        write_definitions(path, with_priority(2), bump_mtime=1_000_000)
+        assert source.reload_if_changed() is True
+        assert get_cohort_catalog() is original
+        assert get_active_cohort_catalog() is not original
+    assert get_cohort_catalog() is get_active_cohort_catalog()
@@ -0,0 +1,48 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from agent_outreach.nodes.context_budget import ContextBudget, estimate_tokens
+
+
+def tool_turn(call_id, name, payload):
+    return [
+        AIMessage(content="", tool_calls=[{"name": name, "args": {}, "id": call_id}]),
+        ToolMessage(content=payload, tool_call_id=call_id)
+    ]
+
+
+def history():
+    return [
+        SystemMessage(content="system prompt"),
+        HumanMessage(content="start"),
+        *tool_turn("c1", "list_patients", "x" * 4000),
+        *tool_turn("c2", "get_all_cohorts", "y" * 4000),
+        *tool_turn("c3", "query_cohorts", "z" * 4000)
+    ]
+
+
+def test_history_within_budget_is_untouched():
+    messages = history()
+    kept, report = ContextBudget(max_tokens=100000).apply(messages)
+    assert kept == messages
+    assert report.tokens_saved == 0 and report.affected_call_ids == ()
+
+
+def test_stale_results_are_summarized_oldest_first():
+    messages = history()
+    budget = sum(estimate_tokens(message) for message in messages) - 500
+    kept, report = ContextBudget(max_tokens=budget).apply(messages)
+    assert report.elided_results == 1 and report.dropped_turns == 0
+    assert report.affected_call_ids == ("c1",)
+    assert kept[3].content.startswith("[list_patients result (4000 chars) elided")
+    assert report.tokens_after <= budget
+    assert messages[3].content == "x" * 4000
+
+
+def test_whole_turns_are_dropped_but_the_latest_turn_is_kept():
+    kept, report = ContextBudget(max_tokens=50).apply(history())
+    assert report.dropped_turns == 2
+    assert set(report.affected_call_ids) == {"c1", "c2"}
+    assert [type(message).__name__ for message in kept] == [
+        "SystemMessage", "HumanMessage", "AIMessage", "ToolMessage"
+    ]
+    assert kept[-1].tool_call_id == "c3" and kept[-1].content == "z" * 4000
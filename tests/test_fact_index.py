@@ -0,0 +1,43 @@
+import pytest
+
+from agent_outreach.tools.fact_index import FACT_FIELDS, FactIndex, normalize_text
+from agent_outreach.tools.mock_data import PATIENTS
+
+
+def linear_scan(patients, term):
+    term = normalize_text(term)
+    ids = set()
+    for patient in patients:
+        for field in FACT_FIELDS:
+            raw = patient.get(field) or []
+            if any(term in normalize_text(value) for value in ([raw] if isinstance(raw, str) else raw)):
+                ids.add(patient["patient_id"])
+    return ids
+
+
+@pytest.mark.parametrize("term", ["diabetes", "Type 2", "apnea", "cancer", "metformin", "ob", "xyz", "colon-cancer"])
+def test_matches_agree_with_a_linear_substring_scan(term):
+    index = FactIndex()
+    for patient in PATIENTS:
+        index.add(patient)
+    assert set(index.match(term)) == linear_scan(PATIENTS, term)
+
+
+def test_results_rank_by_terms_matched_then_whole_word_score():
+    index = FactIndex()
+    index.add({"patient_id": 1, "supporting_facts": ["Type 2 Diabetes", "Sleep Apnea"]})
+    index.add({"patient_id": 2, "supporting_facts": ["Prediabetes"]})
+    index.add({"patient_id": 3, "supporting_facts": ["Diabetes"]})
+    assert index.search(["diabetes", "apnea"]) == [(1, 4.0), (3, 2.0), (2, 1.0)]
+    assert index.search(["diabetes", "apnea"], match_all=True) == [(1, 4.0)]
+
+
+def test_reindexing_and_removal_update_postings():
+    index = FactIndex()
+    index.add({"patient_id": 1, "supporting_facts": ["Hypertension"]})
+    index.add({"patient_id": 1, "supporting_facts": ["Asthma"]})
+    assert index.match("hypertension") == {}
+    assert set(index.match("asthma")) == {1}
+    index.remove(1)
+    assert index.match("asthma") == {}
+    assert len(index) == 0
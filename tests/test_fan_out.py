@@ -0,0 +1,19 @@
+from agent_outreach.executor.workflow_executor import DEFAULT_FAN_OUT_CONCURRENCY, WorkflowExecutor
+from agent_outreach.graph.graph_builder import GraphBuilder
+from agent_outreach.tools.patient_repository import get_patient_repository
+
+
+def test_dispatch_sends_patient_id_batches_in_scan_order():
+    builder = GraphBuilder()
+    builder.batch_size = 4
+    sends = builder._dispatch_patient_batches({})
+    batches = [send.arg["patient_ids"] for send in sends]
+    expected = [patient["patient_id"] for patient in get_patient_repository().scan()]
+    assert [pid for batch in batches for pid in batch] == expected
+    assert all(len(batch) == 4 for batch in batches[:-1])
+
+
+def test_fan_out_concurrency_is_bounded_by_default():
+    assert WorkflowExecutor(mode="fan_out").max_concurrency == DEFAULT_FAN_OUT_CONCURRENCY
+    assert WorkflowExecutor(mode="fan_out", max_concurrency=2).max_concurrency == 2
+    assert WorkflowExecutor(mode="hybrid").max_concurrency is None
@@ -0,0 +1,98 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from agent_outreach.executor.workflow_executor import WorkflowExecutor
+from agent_outreach.tools.intervention_rules import InterventionRuleEngine
+from agent_outreach.tools.patient_repository import get_patient_repository
+from agent_outreach.tools.results_store import ResultsStore, get_results_store, set_results_store
+from agent_outreach.tools.triage import LLM_REVIEW, REUSED_RESULT
+
+AS_OF = date(2025, 1, 1)
+
+
+class ReviewingLLM:
+    """Sends one reminder for patient 2 on its first turn, then finishes."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        if messages[-1].type == "tool" or self.calls > 1:
+            return AIMessage(content="done")
+        return AIMessage(content="", tool_calls=[
+            {"name": "fire_reminder", "args": {"patient_id": 2, "reminder_type": "glucose_monitoring"}, "id": "r2"}
+        ])
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+@pytest.fixture
+def results_store(tmp_path):
+    previous = get_results_store()
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    set_results_store(store)
+    yield store
+    set_results_store(previous)
+
+
+def run_incremental():
+    executor = WorkflowExecutor(mode="incremental", planning="off")
+    executor.initialize()
+    llm = ReviewingLLM()
+    executor.graph_builder.nodes.llm = executor.graph_builder.nodes.llm_with_tools = llm
+    return executor.execute_workflow(), llm
+
+
+def test_second_run_over_unchanged_patients_reuses_them(results_store):
+    panel_size = len(get_patient_repository())
+    first, first_llm = run_incremental()
+    assert first_llm.calls > 0
+    assert len(first["incremental_run"]["results"]) == panel_size
+
+    second, second_llm = run_incremental()
+    assert second_llm.calls == 0
+    assert second["path_counts"][REUSED_RESULT] == panel_size
+    assert second["incremental_run"]["results"] == {}
+    assert len(results_store.load_results()) == panel_size
+
+
+def test_llm_reviewed_outcomes_are_persisted(results_store):
+    run_incremental()
+    stored = results_store.load_results()["2"]["result"]
+    assert stored["path"] == LLM_REVIEW
+    assert stored["llm_review"] == {"reminder_type": "glucose_monitoring"}
+
+
+def test_results_stay_valid_until_a_days_since_threshold_is_crossed():
+    definitions = {
+        "screening": {
+            "intervention_criteria": ["Overdue"],
+            "intervention_rules": [{
+                "criterion": "Overdue",
+                "conditions": [{"metric": "days_since_last_screening", "op": ">", "value": 365}]
+            }]
+        }
+    }
+    engine = InterventionRuleEngine(definitions)
+    assert engine.valid_until({"days_since_last_screening": 360.0}, ["screening"], AS_OF) == AS_OF + timedelta(days=6)
+    assert engine.valid_until({"days_since_last_screening": 400.0}, ["screening"], AS_OF) is None
+    assert engine.valid_until({"days_since_last_screening": None}, ["screening"], AS_OF) is None
+
+
+def test_legacy_rows_are_valid_only_on_their_evaluation_date(tmp_path):
+    path = str(tmp_path / "legacy.sqlite")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE patient_results (patient_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL,"
+        " definitions_version TEXT NOT NULL, run_id TEXT NOT NULL, result TEXT NOT NULL,"
+        " updated_at REAL NOT NULL, as_of TEXT);"
+        "INSERT INTO patient_results VALUES ('1', 'h', 'v', 'r', '{}', 0, '2025-01-01');"
+    )
+    conn.commit()
+    conn.close()
+    assert ResultsStore(path).load_results()["1"]["valid_until"] == "2025-01-02"
@@ -0,0 +1,68 @@
+from datetime import date
+
+from agent_outreach.tools.cohort_definitions import COHORT_DEFINITIONS
+from agent_outreach.tools.intervention_rules import (
+    INTERVENE, NO_INTERVENTION, UNDETERMINED, InterventionRuleEngine, extract_metrics
+)
+
+AS_OF = date(2025, 1, 1)
+
+FULLY_COVERED = {
+    "glucose": {
+        "name": "Glucose",
+        "intervention_criteria": ["HbA1c above 7"],
+        "intervention_rules": [
+            {"criterion": "HbA1c above 7", "conditions": [{"metric": "hba1c", "op": ">", "value": 7}],
+             "intervention": "routine_followup"}
+        ],
+        "decisive_metrics": ["hba1c"]
+    }
+}
+
+
+def test_intervenes_when_a_rule_holds():
+    engine = InterventionRuleEngine(COHORT_DEFINITIONS)
+    decision = engine.decide({"hba1c": 8.2, "fasting_glucose": 110, "facts": ""}, "diabetic")
+    assert decision.decision == INTERVENE
+    assert decision.recommended_intervention == "routine_followup"
+    assert decision.matched_criteria == ["HbA1c > 7.0% indicates need for better glucose control"]
+
+
+def test_missing_decisive_metric_is_undetermined():
+    engine = InterventionRuleEngine(FULLY_COVERED)
+    decision = engine.decide({"hba1c": None, "facts": ""}, "glucose")
+    assert decision.decision == UNDETERMINED
+    assert decision.missing_metrics == ["hba1c"]
+
+
+def test_no_intervention_only_when_every_criterion_has_a_rule():
+    decision = InterventionRuleEngine(FULLY_COVERED).decide({"hba1c": 6.1, "facts": ""}, "glucose")
+    assert decision.decision == NO_INTERVENTION
+    assert decision.unchecked_criteria == []
+
+    # The diabetic cohort has criteria no rule checks, so the rules alone cannot rule out an intervention
+    decision = InterventionRuleEngine(COHORT_DEFINITIONS).decide(
+        {"hba1c": 6.1, "fasting_glucose": 100, "facts": ""}, "diabetic"
+    )
+    assert decision.decision == UNDETERMINED
+    assert "Poor glucose monitoring compliance" in decision.unchecked_criteria
+
+
+def test_unknown_cohort_is_undetermined():
+    decision = InterventionRuleEngine(FULLY_COVERED).decide({}, "unknown")
+    assert decision.decision == UNDETERMINED
+    assert decision.unchecked_criteria == []
+
+
+def test_facts_come_from_clinical_text_only():
+    patient = {
+        "patient_id": 900,
+        "name": "Joint Pain",
+        "email": "sleep.apnea@example.com",
+        "supporting_facts": ["Hypertension"],
+        "medications": ["Lisinopril"],
+        "family_history": ["Colon cancer"]
+    }
+    facts = extract_metrics(patient, {}, AS_OF)["facts"]
+    assert "hypertension" in facts and "lisinopril" in facts and "colon cancer" in facts
+    assert "joint pain" not in facts and "sleep" not in facts
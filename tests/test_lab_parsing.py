@@ -0,0 +1,47 @@
+import pytest
+
+from agent_outreach.tools.lab_parsing import BloodPressure, LabValueParser, Measurement, measurement_value
+
+
+@pytest.mark.parametrize("field, raw, expected", [
+    ("last_hba1c", "8.2%", Measurement(8.2, "%")),
+    ("last_hba1c", " 7 ", Measurement(7.0, "%")),
+    ("fasting_glucose", "185 mg/dL", Measurement(185.0, "mg/dL")),
+    ("fasting_glucose", "7 mmol/L", Measurement(126.11, "mg/dL")),
+    ("bmi", ">35", Measurement(35.0, "kg/m2", ">")),
+    ("weight", "220 lbs", Measurement(99.79, "kg")),
+    ("height", "5'10\"", Measurement(177.8, "cm")),
+    ("height", "1.8 m", Measurement(180.0, "cm")),
+    ("blood_pressure", "140/90", BloodPressure(140.0, 90.0))
+])
+def test_values_are_parsed_into_normalized_units(field, raw, expected):
+    assert LabValueParser().parse(field, raw) == expected
+
+
+def test_malformed_values_are_counted_not_raised():
+    parser = LabValueParser()
+    assert parser.parse("last_hba1c", "pending") is None
+    assert parser.parse("fasting_glucose", "185 stones") is None
+    assert parser.get_stats()["malformed"] == {"last_hba1c": 1, "fasting_glucose": 1}
+
+
+def test_missing_and_unknown_fields_are_skipped():
+    parser = LabValueParser()
+    assert parser.parse("last_hba1c", None) is None
+    assert parser.parse("name", "Alice") is None
+    assert parser.get_stats()["malformed"] == {}
+
+
+def test_repeated_raw_values_are_parsed_once():
+    parser = LabValueParser()
+    parser.parse_patient({"last_hba1c": "8.2%", "bmi": 31})
+    parser.parse_patient({"last_hba1c": "8.2%", "bmi": 31})
+    stats = parser.get_stats()
+    assert (stats["cache_misses"], stats["cache_hits"]) == (2, 2)
+
+
+def test_measurement_value_ignores_non_scalar_readings():
+    measurements = LabValueParser().parse_patient({"bmi": "31.5", "blood_pressure": "120/80"})
+    assert measurement_value(measurements, "bmi") == 31.5
+    assert measurement_value(measurements, "blood_pressure") is None
+    assert measurement_value(measurements, "last_hba1c") is None
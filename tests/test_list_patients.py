@@ -0,0 +1,58 @@
+import pytest
+
+from agent_outreach.tools import access_patient_data
+from agent_outreach.tools.access_patient_data import MAX_PAGE_SIZE, list_patients
+from agent_outreach.tools.patient_repository import (
+    InMemoryPatientRepository, get_patient_repository, set_patient_repository
+)
+
+
+@pytest.fixture
+def panel():
+    previous = get_patient_repository()
+    set_patient_repository(InMemoryPatientRepository(
+        {"patient_id": patient_id, "name": f"Patient {patient_id}", "age": 20 + patient_id % 50}
+        for patient_id in range(1, 501)
+    ))
+    yield
+    set_patient_repository(previous)
+
+
+def page_through(**filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = list_patients(cursor=cursor, fields=["patient_id"], **filters)
+        ids.extend(record["patient_id"] for record in page["patients"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+def test_limit_is_capped_at_the_maximum_page_size(panel):
+    page = list_patients(fields=["patient_id"], limit=10 * MAX_PAGE_SIZE)
+    assert len(page["patients"]) == MAX_PAGE_SIZE
+    assert page["next_cursor"] is not None
+
+
+def test_cursor_pages_cover_every_patient_exactly_once(panel):
+    ids, pages = page_through(limit=75)
+    assert ids == list(range(1, 501))
+    assert pages == 7
+
+
+def test_filters_apply_across_pages(panel):
+    ids, _ = page_through(min_age=60, max_age=61, limit=10)
+    assert ids == [patient_id for patient_id in range(1, 501) if 60 <= 20 + patient_id % 50 <= 61]
+
+
+def test_pages_stop_at_the_encoded_size_bound(panel, monkeypatch):
+    monkeypatch.setattr(access_patient_data, "PAGE_MAX_CHARS", 100)
+    page = list_patients(fields=["patient_id", "name"], limit=50)
+    assert 0 < len(page["patients"]) < 50
+    assert page["next_cursor"] is not None
+
+
+def test_invalid_cursor_is_rejected(panel):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        list_patients(cursor="not-a-cursor")
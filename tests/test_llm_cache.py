@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from agent_outreach.config import llm_cache
+from agent_outreach.config.llm_cache import InMemoryLLMCache, SQLiteLLMCache, cache_key
+from agent_outreach.config.tool_registry import ToolRegistry
+
+LLM_STRING = "gpt-3.5-turbo|tools=[]"
+
+
+def prompt(*messages):
+    return json.dumps([{"kwargs": message} for message in messages])
+
+
+def generations(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "sqlite":
+            return SQLiteLLMCache(str(tmp_path / "cache.sqlite"), **kwargs)
+        return InMemoryLLMCache(**kwargs)
+    return make
+
+
+def test_cache_key_ignores_volatile_message_fields():
+    first = prompt({"content": "hi", "id": "run-1", "usage_metadata": {"input_tokens": 3}})
+    second = prompt({"content": "hi", "id": "run-2", "response_metadata": {"system_fingerprint": "fp"}})
+    assert cache_key(first, LLM_STRING) == cache_key(second, LLM_STRING)
+    assert cache_key(first, LLM_STRING) != cache_key(prompt({"content": "hello"}), LLM_STRING)
+    assert cache_key(first, LLM_STRING) != cache_key(first, "gpt-4|tools=[]")
+
+
+def test_lookup_hits_after_update(make_cache):
+    cache = make_cache()
+    assert cache.lookup(prompt({"content": "hi"}), LLM_STRING) is None
+    cache.update(prompt({"content": "hi", "id": "a"}), LLM_STRING, generations("hello"))
+    cached = cache.lookup(prompt({"content": "hi", "id": "b"}), LLM_STRING)
+    assert cached[0].message.content == "hello"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire_after_ttl(make_cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = make_cache(ttl_seconds=60)
+    cache.update(prompt({"content": "hi"}), LLM_STRING, generations("hello"))
+    now[0] += 30
+    assert cache.lookup(prompt({"content": "hi"}), LLM_STRING) is not None
+    now[0] += 31
+    assert cache.lookup(prompt({"content": "hi"}), LLM_STRING) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted(make_cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = make_cache(max_entries=2)
+    for text in ("a", "b"):
+        now[0] += 1
+        cache.update(prompt({"content": text}), LLM_STRING, generations(text))
+    now[0] += 1
+    cache.lookup(prompt({"content": "a"}), LLM_STRING)
+    now[0] += 1
+    cache.update(prompt({"content": "c"}), LLM_STRING, generations("c"))
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.lookup(prompt({"content": "b"}), LLM_STRING) is None
+    assert cache.lookup(prompt({"content": "a"}), LLM_STRING) is not None
+
+
+def test_get_llm_keeps_an_explicitly_passed_empty_cache():
+    cache = InMemoryLLMCache()
+    assert len(cache) == 0
+    assert ToolRegistry.get_llm(cache=cache).cache is cache
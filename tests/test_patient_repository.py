@@ -0,0 +1,85 @@
+import pytest
+
+from agent_outreach.tools.patient_repository import InMemoryPatientRepository, PatientRepository
+
+
+def patient(patient_id, **fields):
+    return {"patient_id": patient_id, "name": f"Patient {patient_id}", **fields}
+
+
+def by_cohort(record):
+    return ["diabetic"] if "Type 2 Diabetes" in record.get("supporting_facts", []) else []
+
+
+def ids(patients):
+    return [record["patient_id"] for record in patients]
+
+
+def test_repository_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        PatientRepository()
+
+
+def test_primary_key_and_keyset_scan():
+    repository = InMemoryPatientRepository([patient(3), patient(1), patient(2)])
+    assert repository.get(2)["name"] == "Patient 2"
+    assert repository.get(9) is None
+    assert len(repository) == 3
+    assert ids(repository.scan()) == [1, 2, 3]
+    assert ids(repository.scan(after_id=1)) == [2, 3]
+    assert ids(repository.all()) == [3, 1, 2]
+
+
+def test_phone_and_email_lookups_are_normalized():
+    repository = InMemoryPatientRepository([patient(1, phone="(555) 010-1", email="Alice@Example.com ")])
+    assert repository.find_by_phone("555-0101")["patient_id"] == 1
+    assert repository.find_by_email("alice@example.com")["patient_id"] == 1
+    assert repository.find_by_phone("555-0199") is None
+
+
+def test_upsert_moves_patient_between_secondary_indexes():
+    repository = InMemoryPatientRepository(
+        [patient(1, age=50, supporting_facts=["Type 2 Diabetes"])], cohort_classifier=by_cohort
+    )
+    version = repository.version
+    repository.upsert(patient(1, age=51, supporting_facts=[]))
+    assert repository.version == version + 1
+    assert repository.find_by_age(50) == []
+    assert ids(repository.find_by_age(51)) == [1]
+    assert repository.find_by_cohort("diabetic") == []
+    assert repository.get_cohorts(1) == []
+
+
+def test_remove_drops_patient_from_every_index():
+    repository = InMemoryPatientRepository(
+        [patient(1, age=50, phone="555-0101", supporting_facts=["Type 2 Diabetes"]), patient(2, age=50)],
+        cohort_classifier=by_cohort
+    )
+    assert repository.remove(1)["patient_id"] == 1
+    assert repository.remove(1) is None
+    assert ids(repository.scan()) == [2]
+    assert ids(repository.find_by_age(50)) == [2]
+    assert repository.find_by_cohort("diabetic") == []
+    assert repository.find_by_phone("555-0101") is None
+
+
+def test_unindexing_keeps_a_phone_reassigned_to_another_patient():
+    repository = InMemoryPatientRepository([patient(1, phone="555-0101", email="shared@example.com")])
+    repository.upsert(patient(2, phone="555-0101", email="shared@example.com"))
+    repository.remove(1)
+    assert repository.find_by_phone("555-0101")["patient_id"] == 2
+    assert repository.find_by_email("shared@example.com")["patient_id"] == 2
+
+
+def test_cohort_lookups_follow_the_definitions_version():
+    version = ["v1"]
+    repository = InMemoryPatientRepository(
+        [patient(1, supporting_facts=["Type 2 Diabetes"])],
+        cohort_classifier=lambda record: by_cohort(record) if version[0] == "v1" else [],
+        cohort_version=lambda: version[0]
+    )
+    assert ids(repository.find_by_cohort("diabetic")) == [1]
+    version[0] = "v2"
+    assert repository.find_by_cohort("diabetic") == []
+    repository.reindex_cohorts()
+    assert repository.get_cohorts(1) == []
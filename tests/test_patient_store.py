@@ -0,0 +1,32 @@
+from datetime import date
+
+from agent_outreach.tools.intervention_rules import INTERVENE, UNDETERMINED
+from agent_outreach.tools.mock_data import PATIENTS
+from agent_outreach.tools.patient_store import ColumnarPatientStore
+from agent_outreach.tools.triage import triage_patient
+
+AS_OF = date(2025, 1, 1)
+
+
+def test_store_masks_match_triage_on_the_mock_panel():
+    store = ColumnarPatientStore(PATIENTS, as_of=AS_OF)
+    evaluated = store.evaluate_all()
+    for patient in PATIENTS:
+        patient_id = patient["patient_id"]
+        triage = triage_patient(patient, as_of=AS_OF)
+        for cohort_name, selected in evaluated.items():
+            decision = triage.decisions.get(cohort_name)
+            assert (patient_id in selected["members"]) == (cohort_name in triage.cohorts)
+            assert (patient_id in selected["needs_intervention"]) == (
+                decision is not None and decision.decision == INTERVENE
+            )
+            assert (patient_id in selected["undetermined"]) == (
+                decision is not None and decision.decision == UNDETERMINED
+            )
+
+
+def test_unchecked_criteria_leave_non_intervening_members_undetermined():
+    store = ColumnarPatientStore(PATIENTS, as_of=AS_OF)
+    well_controlled = next(patient for patient in PATIENTS if patient["patient_id"] == 2)
+    assert triage_patient(well_controlled, as_of=AS_OF).decisions["diabetic"].unchecked_criteria
+    assert 2 in store.select(store.undetermined_mask("diabetic"))
@@ -0,0 +1,30 @@
+from agent_outreach.tools.result_encoding import ResultEncoder, compact_record
+
+RECORDS = [{"patient_id": index, "name": f"Patient {index}", "notes": "x" * 40} for index in range(20)]
+
+
+def test_compact_record_projects_fields_and_drops_empty_values():
+    record = {"patient_id": 1, "name": "A", "email": None, "facts": []}
+    assert compact_record(record) == {"patient_id": 1, "name": "A"}
+    assert compact_record(record, ["name", "patient_id"]) == {"name": "A", "patient_id": 1}
+
+
+def test_table_format_emits_one_header_row():
+    encoded = ResultEncoder("table").encode(RECORDS[:2], fields=["patient_id", "name"])
+    assert encoded.splitlines() == ["patient_id|name", "0|Patient 0", "1|Patient 1"]
+
+
+def test_truncated_records_point_at_the_producing_tool():
+    encoder = ResultEncoder("json", max_chars=300)
+    listed = encoder.encode(RECORDS, tool_name="get_all_patients")
+    searched = encoder.encode(RECORDS, tool_name="search_patients_by_supporting_facts")
+    assert "of 20; page through all of them with list_patients" in listed
+    assert "list_patients" not in searched.splitlines()[-1]
+    assert "more specific search_terms" in searched
+    assert "call find_patient with narrower arguments" in encoder.encode(RECORDS, tool_name="find_patient")
+
+
+def test_truncated_cohort_query_names_its_own_continuation():
+    result = {"expression": "diabetic", "count": 500, "patient_ids": list(range(500)), "truncated": False}
+    encoded = ResultEncoder("json", max_chars=200).encode(result, tool_name="query_cohorts")
+    assert encoded.endswith("narrow the expression or lower limit; list_patients with a cohort filter pages through members]")
@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+import pytest
+
+from agent_outreach.tools import result_memo
+from agent_outreach.tools.cohort_catalog import CohortCatalog, get_active_cohort_catalog, set_cohort_catalog
+from agent_outreach.tools.cohort_definitions import COHORT_DEFINITIONS
+from agent_outreach.tools.result_memo import ResultMemo
+
+
+@pytest.fixture(autouse=True)
+def restore_catalog():
+    catalog = get_active_cohort_catalog()
+    yield
+    set_cohort_catalog(catalog)
+
+
+def counting_tool():
+    calls = []
+
+    def tool(patient_data, *args, **kwargs):
+        calls.append(patient_data["patient_id"])
+        return {"patient_id": patient_data["patient_id"], "facts": list(patient_data["supporting_facts"])}
+    return tool, calls
+
+
+def patient(**fields):
+    return {"patient_id": 901, "name": "Memo Patient", "supporting_facts": ["Type 2 Diabetes"], **fields}
+
+
+def test_unchanged_content_hits_and_changed_content_misses():
+    memo = ResultMemo()
+    tool, calls = counting_tool()
+    first = memo.call("tool", tool, patient())
+    assert memo.call("tool", tool, patient()) is first
+    memo.call("tool", tool, patient(supporting_facts=["Hypertension"]))
+    assert calls == [901, 901]
+    assert memo.get_stats()["by_function"]["tool"]["hits"] == 1
+
+
+def test_extra_arguments_are_part_of_the_key():
+    memo = ResultMemo()
+    tool, calls = counting_tool()
+    memo.call("tool", tool, patient(), "diabetic")
+    memo.call("tool", tool, patient(), "diabetic")
+    memo.call("tool", tool, patient(), "cardiac")
+    assert len(calls) == 2
+
+
+def test_catalog_swap_invalidates_results():
+    memo = ResultMemo()
+    tool, calls = counting_tool()
+    memo.call("tool", tool, patient())
+    definitions = {**COHORT_DEFINITIONS}
+    name = next(iter(definitions))
+    definitions[name] = {**definitions[name], "priority": definitions[name].get("priority", 0) + 1}
+    set_cohort_catalog(CohortCatalog(definitions))
+    memo.call("tool", tool, patient())
+    assert len(calls) == 2
+
+
+def test_change_of_day_invalidates_results(monkeypatch):
+    memo = ResultMemo()
+    tool, calls = counting_tool()
+    memo.call("tool", tool, patient())
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+
+    monkeypatch.setattr(result_memo, "date", Tomorrow)
+    memo.call("tool", tool, patient())
+    assert len(calls) == 2
+
+
+def test_sqlite_backend_persists_across_instances(tmp_path):
+    path = str(tmp_path / "memo.sqlite")
+    tool, calls = counting_tool()
+    ResultMemo(path=path).call("tool", tool, patient())
+    memo = ResultMemo(path=path)
+    assert memo.call("tool", tool, patient()) == {"patient_id": 901, "facts": ["Type 2 Diabetes"]}
+    assert calls == [901]
+    assert memo.get_stats()["by_function"]["tool"]["disk_hits"] == 1
+
+
+def test_invalidate_and_lru_eviction(tmp_path):
+    memo = ResultMemo(max_entries=2, path=str(tmp_path / "memo.sqlite"), max_disk_entries=2)
+    tool, calls = counting_tool()
+    for patient_id in (1, 2, 3):
+        memo.call("tool", tool, patient(patient_id=patient_id))
+    assert len(memo) == 2
+    assert memo.evictions == 1
+    assert memo._disk_size() == 2
+
+    memo.invalidate()
+    assert len(memo) == 0
+    memo.call("tool", tool, patient(patient_id=3))
+    assert calls == [1, 2, 3, 3]
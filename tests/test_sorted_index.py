@@ -0,0 +1,37 @@
+from datetime import date
+
+from agent_outreach.tools.patient_repository import InMemoryPatientRepository
+from agent_outreach.tools.sorted_index import SortedIndex
+
+
+def test_range_yields_ids_in_value_order_with_inclusive_bounds():
+    index = SortedIndex()
+    for value, patient_id in [(30.0, 1), (25.0, 2), (35.2, 3), (30.0, 4)]:
+        index.add(value, patient_id)
+    assert list(index.range(30, 35.2)) == [1, 4, 3]
+    assert list(index.range(high=30)) == [2, 1, 4]
+    assert list(index.range(low=36)) == []
+    assert index.count(30, 30) == 2
+
+
+def test_remove_only_drops_the_matching_entry():
+    index = SortedIndex()
+    index.add(30.0, 1)
+    index.add(30.0, 2)
+    index.remove(30.0, 1)
+    index.remove(31.0, 2)
+    assert list(index.range()) == [2]
+
+
+def test_repository_range_queries_follow_updates():
+    repository = InMemoryPatientRepository([
+        {"patient_id": 1, "bmi": "31.5", "last_visit": "2024-12-01"},
+        {"patient_id": 2, "bmi": 28, "last_visit": "2024-06-01"},
+        {"patient_id": 3, "last_visit": "not a date"}
+    ])
+    ids = lambda patients: [patient["patient_id"] for patient in patients]
+    assert ids(repository.find_in_range("bmi", low=30)) == [1]
+    repository.upsert({"patient_id": 2, "bmi": 33})
+    assert ids(repository.find_in_range("bmi", low=30)) == [1, 2]
+    assert ids(repository.find_in_range("days_since_last_visit", low=90, as_of=date(2025, 1, 1))) == []
+    assert ids(repository.find_in_range("days_since_last_visit", high=90, as_of=date(2025, 1, 1))) == [1]
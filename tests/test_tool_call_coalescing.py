@@ -0,0 +1,82 @@
+from langchain_core.messages import AIMessage, ToolMessage
+
+from agent_outreach.nodes.tool_call_log import ToolCallLog, ToolCallLogs, call_key, conversation_key
+from agent_outreach.nodes.workflow_nodes import WorkflowNodes
+
+CONFIG = {"configurable": {"thread_id": "coalescing-test"}}
+QUERY = {"name": "query_cohorts", "args": {"expression": "diabetic AND NOT contacted_in_30_days"}}
+
+
+def tool_call(call, call_id):
+    return {**call, "id": call_id}
+
+def run_tools(nodes, *tool_calls, config=CONFIG):
+    update = nodes.enhanced_tool_node({"messages": [AIMessage(content="", tool_calls=list(tool_calls))]}, config)
+    return [message.content for message in update["messages"]]
+
+
+def test_call_key_ignores_argument_order():
+    assert call_key("find_patient", {"a": 1, "b": 2}) == call_key("find_patient", {"b": 2, "a": 1})
+
+
+def test_conversation_key_separates_subgraph_reviews():
+    main = conversation_key({"configurable": {"thread_id": "t", "checkpoint_ns": "llm:1"}})
+    review = conversation_key({"configurable": {"thread_id": "t", "checkpoint_ns": "review:2|llm:3"}})
+    assert main == "t|" and review == "t|review:2"
+    assert conversation_key({}) is None
+
+
+def test_log_invalidates_reads_and_releases_ids():
+    log = ToolCallLog()
+    log.record("read", "a")
+    log.record("write", "b", read_only=False)
+    assert log.invalidate_reads() == 1
+    assert log.earlier("read") is None and log.earlier("write") == "b"
+    assert log.release_ids(["b"]) == 1
+    assert log.earlier("write") is None
+
+
+def test_logs_are_bounded_per_conversation():
+    logs = ToolCallLogs(max_conversations=2)
+    first = logs.for_config({"configurable": {"thread_id": "1"}})
+    logs.for_config({"configurable": {"thread_id": "2"}})
+    logs.for_config({"configurable": {"thread_id": "3"}})
+    assert logs.for_config({"configurable": {"thread_id": "1"}}) is not first
+
+
+def test_repeated_read_only_call_refers_to_the_earlier_result():
+    nodes = WorkflowNodes()
+    first = run_tools(nodes, tool_call(QUERY, "q1"), tool_call(QUERY, "q2"))
+    assert first[0].startswith("{") and "call q1" in first[1]
+    assert "call q1" in run_tools(nodes, tool_call(QUERY, "q3"))[0]
+
+
+def test_side_effecting_call_invalidates_read_only_results():
+    nodes = WorkflowNodes()
+    run_tools(nodes, tool_call(QUERY, "q1"))
+    reminder = {"name": "fire_reminder", "args": {"patient_id": 1, "reminder_type": "routine_followup"}}
+    assert run_tools(nodes, tool_call(reminder, "r1"))[0].startswith("Reminder sent")
+    assert run_tools(nodes, tool_call(QUERY, "q2"))[0].startswith("{")
+    assert run_tools(nodes, tool_call(reminder, "r2"))[0].startswith("Duplicate call not executed")
+
+
+def test_same_turn_repeat_of_a_failed_call_gets_its_error():
+    nodes = WorkflowNodes()
+    bad_query = {"name": "query_cohorts", "args": {"expression": "no_such_cohort"}}
+    first, repeat = run_tools(nodes, tool_call(bad_query, "b1"), tool_call(bad_query, "b2"))
+    assert "call b1" not in repeat
+    assert repeat == first
+    # Failed calls are not recorded, so the next identical call runs again
+    assert run_tools(nodes, tool_call(bad_query, "b3"))[0] == first
+
+
+def test_elided_results_are_released():
+    nodes = WorkflowNodes(context_token_budget=300)
+    run_tools(nodes, tool_call(QUERY, "q1"))
+    history = [
+        AIMessage(content="", tool_calls=[tool_call(QUERY, "q1")]),
+        ToolMessage(content="x" * 4000, tool_call_id="q1"),
+        AIMessage(content="", tool_calls=[tool_call(QUERY, "q2")]),
+    ]
+    nodes._build_llm_messages({"messages": history}, CONFIG)
+    assert run_tools(nodes, tool_call(QUERY, "q3"))[0].startswith("{")
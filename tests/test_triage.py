@@ -0,0 +1,59 @@
+from datetime import date
+
+from agent_outreach.nodes.workflow_nodes import WorkflowNodes
+from agent_outreach.tools.cohort_catalog import CohortCatalog, pinned_cohort_catalog
+from agent_outreach.tools.mock_data import PATIENTS
+from agent_outreach.tools.triage import (
+    LLM_REVIEW, RULES_REMINDER, RULES_REMINDER_REVIEW, by_priority, triage_patient
+)
+
+AS_OF = date(2025, 1, 1)
+
+
+def test_by_priority_orders_by_definition_priority_then_name():
+    definitions = {
+        "b": {"name": "B", "priority": 2},
+        "a": {"name": "A", "priority": 2},
+        "c": {"name": "C", "priority": 1},
+        "d": {"name": "D"}
+    }
+    with pinned_cohort_catalog(CohortCatalog(definitions)):
+        assert by_priority(["d", "b", "a", "c"]) == ["c", "a", "b", "d"]
+
+
+def test_triage_reminds_for_highest_priority_cohort_and_reports_the_others():
+    patient = {
+        "patient_id": 901,
+        "supporting_facts": ["Type 2 Diabetes", "Obesity", "Sleep Apnea"],
+        "last_hba1c": "9.1%",
+        "fasting_glucose": "190 mg/dL",
+        "bmi": 37.0,
+        "age": 50
+    }
+    triage = triage_patient(patient, as_of=AS_OF)
+    assert {"diabetic", "obesity"} <= set(triage.cohorts)
+    assert triage.path == RULES_REMINDER
+    assert triage.cohort == "diabetic"
+    assert triage.reminder_type == "routine_followup"
+    assert {"cohort": "obesity", "reminder_type": "weight_management"} in triage.other_interventions
+    assert triage.evidence()["rule_recommendation"]["cohort"] == "diabetic"
+
+
+def test_triage_leaves_unchecked_criteria_to_the_llm():
+    well_controlled = next(patient for patient in PATIENTS if patient["patient_id"] == 2)
+    triage = triage_patient(well_controlled, as_of=AS_OF)
+    assert triage.path == LLM_REVIEW
+    assert triage.cohort is None
+    assert triage.evidence()["rule_decisions"]["diabetic"]["unchecked_criteria"]
+
+
+def test_routing_counts_rule_decided_reminders_held_for_validation_separately():
+    triaged = [(patient, triage_patient(patient, as_of=AS_OF)) for patient in PATIENTS]
+    rule_decided = sum(triage.path == RULES_REMINDER for _, triage in triaged)
+    assert rule_decided
+    update = WorkflowNodes()._pre_classification_update(triaged, [])
+    counts = update["path_counts"]
+    assert counts[RULES_REMINDER] == 0
+    assert counts[RULES_REMINDER_REVIEW] == rule_decided
+    assert counts[LLM_REVIEW] == len(PATIENTS) - rule_decided
+    assert len(update["review_queue"]) == len(PATIENTS)